@@ -0,0 +1,9 @@
+"""
+Offline micro-benchmarks for the backend's hot paths.
+
+    python -m benchmarks run [--filter parse] [--output results.json]
+    python -m benchmarks compare [--baseline benchmarks/baseline.json] [--threshold 0.25]
+    python -m benchmarks update-baseline
+
+Run from api/backend. No network access or credentials are needed.
+"""
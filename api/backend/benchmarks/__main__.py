@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Settings are validated on import; benchmarks never talk to Trello, GitHub or the LLM
+for _name in ("TRELLO_API_KEY", "TRELLO_TOKEN", "GITHUB_TOKEN", "LLM_MODEL"):
+    os.environ.setdefault(_name, "benchmark")
+os.environ.setdefault("CARD_STORE_ENABLED", "false")
+os.environ.setdefault("BOARD_REFRESH_ENABLED", "false")
+
+from .runner import compare_results, load_results, print_comparison, run_benchmarks, save_results  # noqa: E402
+from .suites import all_benchmarks  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Backend micro-benchmarks")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    run = subcommands.add_parser("run", help="Run the benchmarks and print timings")
+    compare = subcommands.add_parser("compare", help="Fail if any benchmark regressed against the baseline")
+    update = subcommands.add_parser("update-baseline", help="Run the benchmarks and overwrite the baseline")
+    for sub in (run, compare, update):
+        sub.add_argument("--filter", help="Only run benchmarks whose name contains this string")
+        sub.add_argument("--repeat", type=int, default=5, help="Samples per benchmark (default: 5)")
+    run.add_argument("--output", help="Write results as JSON to this path")
+    compare.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline results (default: benchmarks/baseline.json)")
+    compare.add_argument("--current", help="Compare this results file instead of running the benchmarks")
+    compare.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown as a fraction (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare" and args.current:
+        current = load_results(args.current)
+    else:
+        current = run_benchmarks(all_benchmarks(), name_filter=args.filter, repeat=args.repeat)
+
+    if args.command == "run":
+        if args.output:
+            save_results(current, args.output)
+        return 0
+    if args.command == "update-baseline":
+        save_results(current, str(BASELINE_PATH))
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    rows = compare_results(load_results(args.baseline), current, args.threshold)
+    print_comparison(rows, args.threshold)
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
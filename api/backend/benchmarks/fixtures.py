@@ -0,0 +1,74 @@
+import random
+from typing import Any, Dict, List
+
+# Fixed seed: every run benchmarks exactly the same inputs
+SEED = 20240601
+
+CARD_COUNTS = {"10": 10, "1k": 1_000, "50k": 50_000}
+DESCRIPTION_SIZES = {"short": 200, "10kb": 10_000, "100kb": 100_000}
+
+_WORDS = (
+    "customer onboarding pipeline latency report dashboard export invoice "
+    "migration schema warehouse ingestion retry token budget cache refresh "
+    "stakeholder approval compliance audit release rollout metric alert"
+).split()
+_NOISE = ["​", " ", "\t", "  ", "\n\n\n", "’", "ﬁ", "\x07"]
+_LISTS = ["Backlog", "To Do", "Doing", "Review"]
+_TYPES = ["Feature", "Bug", "Chore", "Research"]
+_PRIORITIES = ["Critical", "High", "Medium", "Low"]
+
+
+def make_text(size: int, rng: random.Random) -> str:
+    """Prose of roughly `size` characters, sprinkled with the artifacts clean_text strips."""
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        if rng.random() < 0.05:
+            word += rng.choice(_NOISE)
+        if rng.random() < 0.01:
+            word = f"https://example.com/{word}"
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)[:size]
+
+
+def make_description(size: int, rng: random.Random, index: int) -> str:
+    """A card description in the documented Trello card format."""
+    return (
+        "### Essential info\n\n"
+        f"- **Project:** Project {index % 17}\n"
+        f"- **Due Date:** 2024-{index % 12 + 1:02d}-15\n"
+        f"- **Effort:** {rng.choice(['S', 'M', 'L', 'XL'])}\n"
+        f"- **Relevant repo:** https://github.com/example/repo-{index % 29}\n"
+        f"- **Impacted assets:** service-{index % 7}, db-{index % 3}, ui\n"
+        f"- **Relevant stakeholders:** Team {index % 5}, Ops, Finance\n\n"
+        "#### Description:\n"
+        f"{make_text(size, rng)}"
+    )
+
+
+def make_raw_cards(count: int, description_size: int = DESCRIPTION_SIZES["short"]) -> List[Dict[str, Any]]:
+    """Raw Trello card JSON, as returned by boards/{id}/cards."""
+    rng = random.Random(SEED + count + description_size)
+    return [
+        {
+            "id": f"card{i:06d}",
+            "name": f"Card {i}: {make_text(40, rng)}",
+            "idList": f"list{i % len(_LISTS)}",
+            "idBoard": f"board{i % 3}",
+            "closed": False,
+            "due": None,
+            "dateLastActivity": "2024-05-01T12:00:00.000Z",
+            "desc": make_description(description_size, rng, i),
+            "labels": [
+                {"name": f"Type: {rng.choice(_TYPES)}"},
+                {"name": f"Priority: {rng.choice(_PRIORITIES)}"},
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def list_name(card_data: Dict[str, Any]) -> str:
+    return _LISTS[int(card_data["idList"][len("list"):])]
@@ -0,0 +1,107 @@
+import json
+import platform
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A benchmark is a name and a setup function returning the zero-argument callable to time
+Benchmark = Tuple[str, Callable[[], Callable[[], Any]]]
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, min_time: float = 0.05) -> Dict[str, float]:
+    """
+    Time `fn` timeit-style: calibrate a loop count so one sample takes at least
+    `min_time`, then take `repeat` samples. `min` is the figure compared against
+    the baseline since it is the least sensitive to scheduler noise.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(benchmarks: List[Benchmark], name_filter: Optional[str] = None, repeat: int = 5) -> Dict[str, Any]:
+    results = {}
+    for name, setup in benchmarks:
+        if name_filter and name_filter not in name:
+            continue
+        fn = setup()
+        results[name] = measure(fn, repeat=repeat)
+        print(f"{name:<32} {_format_seconds(results[name]['min']):>12}  (median {_format_seconds(results[name]['median'])})")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare per-benchmark `min` times. Returns one row per benchmark present in
+    both runs, flagged as a regression when current/baseline exceeds 1 + threshold.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["min"] / base["min"] if base["min"] else float("inf")
+        rows.append({
+            "name": name,
+            "baseline": base["min"],
+            "current": result["min"],
+            "ratio": ratio,
+            "regressed": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float) -> None:
+    print(f"\n{'benchmark':<32} {'baseline':>12} {'current':>12} {'change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['name']:<32} {_format_seconds(row['baseline']):>12} {_format_seconds(row['current']):>12} "
+            f"{(row['ratio'] - 1) * 100:>+8.1f}%{flag}"
+        )
+    regressions = sum(row["regressed"] for row in rows)
+    print(f"\n{regressions} of {len(rows)} benchmarks regressed by more than {threshold:.0%}")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
@@ -0,0 +1,87 @@
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+from src.models.card import TrelloCard
+from src.services.brd_service import BRDService
+from src.services.llm_service import LLMService
+from src.services.trello_service import TrelloService
+from src.utils.text_cleaner import clean_text
+
+from .fixtures import CARD_COUNTS, DESCRIPTION_SIZES, list_name, make_raw_cards, make_text
+from .runner import Benchmark
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _parse(raw_cards):
+    pairs = [(card_data, list_name(card_data)) for card_data in raw_cards]
+    return lambda: [TrelloCard.from_trello_json(card_data, name) for card_data, name in pairs]
+
+
+def _parsed(raw_cards) -> List[TrelloCard]:
+    return [TrelloCard.from_trello_json(card_data, list_name(card_data)) for card_data in raw_cards]
+
+
+def parse_benchmarks() -> List[Benchmark]:
+    """TrelloCard.from_trello_json over whole boards and over single large descriptions."""
+    benchmarks = [
+        (f"parse_cards_{label}", lambda count=count: _parse(make_raw_cards(count)))
+        for label, count in CARD_COUNTS.items()
+    ]
+    benchmarks += [
+        (f"parse_card_desc_{label}", lambda size=size: _parse(make_raw_cards(1, size)))
+        for label, size in DESCRIPTION_SIZES.items()
+    ]
+    return benchmarks
+
+
+def clean_benchmarks() -> List[Benchmark]:
+    def setup(size: int):
+        text = make_text(size, random.Random(size))
+        return lambda: clean_text(text)
+    return [(f"clean_text_{label}", lambda size=size: setup(size)) for label, size in DESCRIPTION_SIZES.items()]
+
+
+def export_benchmarks() -> List[Benchmark]:
+    def setup(count: int):
+        service = TrelloService()
+        cards = _parsed(make_raw_cards(count))
+        return lambda: service.export_cards_data(cards, format="json")
+    return [(f"export_json_{label}", lambda count=count: setup(count)) for label, count in CARD_COUNTS.items()]
+
+
+def prompt_benchmarks() -> List[Benchmark]:
+    """Card cleaning plus chat payload construction, as done per card before an LLM call."""
+    def setup(size: int):
+        llm_service = LLMService()
+        card = _parsed(make_raw_cards(1, size))[0]
+        return lambda: llm_service.build_payload(*BRDService.build_llm_inputs(card))
+    return [(f"prompt_build_{label}", lambda size=size: setup(size)) for label, size in DESCRIPTION_SIZES.items()]
+
+
+def startup_benchmarks() -> List[Benchmark]:
+    """
+    Cold start in a fresh interpreter: importing the app, and importing it plus
+    serving the first request. Includes interpreter start-up (about 20 ms).
+    """
+    scripts = {
+        "startup_import_app": "import src.main",
+        "startup_first_request": (
+            "from fastapi.testclient import TestClient\n"
+            "from src.main import app\n"
+            "assert TestClient(app).get('/api/v1/health').status_code == 200"
+        ),
+    }
+
+    def setup(script: str):
+        env = {**os.environ, "WARMUP_ENABLED": "false"}
+        return lambda: subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, check=True)
+    return [(name, lambda script=script: setup(script)) for name, script in scripts.items()]
+
+
+def all_benchmarks() -> List[Benchmark]:
+    return parse_benchmarks() + clean_benchmarks() + export_benchmarks() + prompt_benchmarks() + startup_benchmarks()
@@ -1,10 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List
+import asyncio
 
 from ..models.card import TrelloCard
 from ..services.brd_service import BRDService, get_brd_service
-from ..services.llm_service import LLMService, get_llm_service
+from ..services.llm_service import LLMService, LLMTimeoutError, get_llm_service
+from ..services.llm_scheduler import LLMScheduler, get_llm_scheduler
+from ..services.brd_cache import get_brd_cache, get_brd_section_store
+from ..services.brd_prefetcher import get_brd_prefetcher
+from ..services.brd_dedup import get_brd_deduplicator
+from ..config.core import settings
+from ..utils.cancellation import CancellationToken, GenerationCancelledError
+from ..utils.metrics import metrics
+from .middleware import json_response
 import logging
 
 router = APIRouter()
@@ -15,22 +25,78 @@ logger = logging.getLogger(__name__)
 class GenerateBRDRequest(BaseModel):
     cards: List[TrelloCard]
 
+DISCONNECT_POLL_SECONDS = 0.5
+
+async def _cancel_on_disconnect(http_request: Request, cancel_token: CancellationToken):
+    """Cancel the token as soon as the HTTP client goes away."""
+    while not cancel_token.cancelled:
+        if await http_request.is_disconnected():
+            cancel_token.cancel("client disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
 # --- BRD Endpoints ---
 
 @router.post("/generate")
 async def generate_brd(
     request: GenerateBRDRequest,
+    http_request: Request,
     brd_service: BRDService = Depends(get_brd_service),
     llm_service: LLMService = Depends(get_llm_service)
 ):
-    """Generate Business Requirement Document (BRD) for a list of cards."""
+    """
+    Generate Business Requirement Document (BRD) for a list of cards.
+    Generation runs off the event loop and is aborted if the client disconnects.
+    """
     if not llm_service.is_available():
         raise HTTPException(status_code=503, detail="LLM service is not available.")
     if not request.cards:
         raise HTTPException(status_code=400, detail="No card data provided for BRD generation.")
-    
+
+    cancel_token = CancellationToken()
+    watcher = asyncio.create_task(_cancel_on_disconnect(http_request, cancel_token))
     try:
-        return brd_service.generate_brd_for_cards(request.cards)
+        user = http_request.headers.get("X-User-Id") or (http_request.client.host if http_request.client else "anonymous")
+        results = await run_in_threadpool(
+            brd_service.generate_brd_for_cards, request.cards, cancel_token=cancel_token, user=user
+        )
+        metrics.increment("brd_requests_total", outcome="ok")
+        return json_response(results)
+    except GenerationCancelledError as e:
+        metrics.increment("brd_requests_total", outcome="cancelled")
+        logger.info("BRD request cancelled: %s", e)
+        # Nobody is listening any more; 499 is the conventional "client closed request"
+        raise HTTPException(status_code=499, detail="BRD generation cancelled.")
+    except LLMTimeoutError as e:
+        metrics.increment("brd_requests_total", outcome="timeout")
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
-        logger.error(f"Error generating BRD: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Failed to generate BRD.") 
\ No newline at end of file
+        logger.error("Error generating BRD: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to generate BRD.")
+    finally:
+        watcher.cancel()
+
+@router.get("/queue")
+async def get_queue_status(scheduler: LLMScheduler = Depends(get_llm_scheduler)):
+    """Current LLM queue depth and wait times by request class and priority."""
+    return scheduler.stats()
+
+@router.get("/cache/status")
+async def get_brd_cache_status():
+    """BRD result cache size and hit/miss counts, speculative pre-generation progress, near-duplicate grouping and section-level updates."""
+    prefetcher = get_brd_prefetcher()
+    return {
+        "cache": get_brd_cache().stats() if settings.BRD_CACHE_ENABLED else None,
+        "requests": {
+            result: metrics.get_counter("brd_cache_requests_total", result=result) for result in ("hit", "miss")
+        },
+        "pregeneration": prefetcher.stats() if prefetcher is not None else None,
+        "dedup": get_brd_deduplicator().stats() if settings.BRD_DEDUP_ENABLED else None,
+        "incremental": {
+            **get_brd_section_store().stats(),
+            "updates": {
+                mode: metrics.get_counter("brd_incremental_updates_total", mode=mode) for mode in ("partial", "unchanged", "full")
+            },
+            "sections_regenerated": metrics.get_counter("brd_sections_regenerated_total"),
+        } if settings.BRD_INCREMENTAL_ENABLED and settings.BRD_CACHE_ENABLED else None,
+    }
@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import JSONResponse
+from ..utils.metrics import metrics
 import logging
 
 router = APIRouter()
@@ -9,14 +11,30 @@ async def health_check():
     """Check if the API is running."""
     return {"status": "ok"}
 
+@router.get("/ready", tags=["Health"])
+async def readiness_check(request: Request):
+    """Ready once startup warm-up has finished (or timed out); 503 until then. /health only reports liveness."""
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        return {"status": "ready", "warmup": None}
+    stats = warmup.stats()
+    if not stats["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": stats})
+    return {"status": "ready", "warmup": stats}
+
+@router.get("/metrics", tags=["Health"])
+async def get_metrics():
+    """Snapshot of in-process counters, gauges and timing summaries."""
+    return metrics.snapshot()
+
 @router.post("/debug/log-selected-cards", tags=["Debug"])
 async def log_selected_cards(request: Request):
     """Logs the selected card IDs from a request for debugging purposes."""
     try:
         data = await request.json()
         selected_card_ids = data.get("selectedCardIds", "No Data")
-        logger.info(f"Debug - Selected Card IDs: {selected_card_ids}")
+        logger.info("Debug - Selected Card IDs: %s", selected_card_ids)
         return {"message": "Logged successfully"}
     except Exception as e:
-        logger.error(f"Error in debug logging endpoint: {e}", exc_info=True)
+        logger.error("Error in debug logging endpoint: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process debug log request.") 
\ No newline at end of file
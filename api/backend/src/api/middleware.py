@@ -0,0 +1,106 @@
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .. import PROJECT_ROOT
+from ..config.core import settings
+from ..utils.tracing import SamplingProfiler, Trace, span, start_trace
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = b"x-trace"
+PROFILE_HEADER = b"x-profile"
+
+def _header_flag(scope: Scope, name: bytes) -> bool:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.strip().lower() in (b"1", b"true", b"yes")
+    return False
+
+def _trace_dir() -> Path:
+    path = Path(settings.TRACE_DIR)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+def _export_trace(trace: Trace, profiler: Optional[SamplingProfiler]) -> None:
+    """Write a request's trace (and profile), then drop the oldest files beyond TRACE_MAX_FILES."""
+    directory = _trace_dir()
+    try:
+        trace.export(str(directory))
+        if profiler is not None:
+            profiler.export(str(directory))
+        files = [path for pattern in ("*.trace.json", "*.folded") for path in directory.glob(pattern)]
+        if len(files) > settings.TRACE_MAX_FILES:
+            files.sort(key=lambda path: path.stat().st_mtime_ns, reverse=True)
+            for path in files[settings.TRACE_MAX_FILES:]:
+                path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.error("Failed to write trace %s: %s", trace.trace_id, e)
+
+def json_response(content: Any) -> JSONResponse:
+    """Serialize a response body explicitly so the cost shows up as its own span."""
+    with span("response.serialize"):
+        return JSONResponse(content=jsonable_encoder(content))
+
+class ClientCORSMiddleware(CORSMiddleware):
+    """
+    CORS for CLIENT_ORIGIN. Starlette builds middleware when the app first
+    handles a request or lifespan event, so settings are read then and not
+    when the app module is imported.
+    """
+
+    def __init__(self, app: ASGIApp):
+        super().__init__(
+            app,
+            allow_origins=[settings.CLIENT_ORIGIN, "http://localhost:8000"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+class TracingMiddleware:
+    """
+    Traces a request when TRACE_ENABLED is set, or when TRACE_ALLOW_HEADERS is
+    set and the client sends `X-Trace: 1`. `X-Profile: 1` additionally runs the
+    sampling profiler for that one request. Output goes to TRACE_DIR and the
+    file names are returned in X-Trace-File / X-Profile-File response headers.
+    When neither applies the request passes straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not (settings.TRACE_ENABLED or settings.TRACE_ALLOW_HEADERS):
+            await self.app(scope, receive, send)
+            return
+
+        profile = settings.TRACE_ALLOW_HEADERS and _header_flag(scope, PROFILE_HEADER)
+        if not (settings.TRACE_ENABLED or profile or (settings.TRACE_ALLOW_HEADERS and _header_flag(scope, TRACE_HEADER))):
+            await self.app(scope, receive, send)
+            return
+
+        with start_trace(f"{scope['method']} {scope['path']}") as trace:
+            profiler = SamplingProfiler(trace, settings.TRACE_PROFILE_INTERVAL).start() if profile else None
+
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-trace-file", f"{trace.file_stem}.trace.json".encode()))
+                    if profiler is not None:
+                        headers.append((b"x-profile-file", f"{trace.file_stem}.folded".encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+        # File writes stay off the event loop
+        await run_in_threadpool(_export_trace, trace, profiler)
@@ -1,9 +1,16 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Dict, Any, Optional, Set
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 
-from ..services.trello_service import TrelloService, get_trello_service, TrelloCardNotFoundError
+from ..services.trello_service import TrelloService, get_trello_service, TrelloCardNotFoundError, TrelloRateLimitError
+from ..services.tenants import get_tenant_registry
+from ..services.card_store import CardStore, get_card_store
+from ..services.board_cache import BoardCache, get_board_cache
+from ..services.board_refresher import BoardRefresher, get_board_refresher
 from ..models.card import TrelloCard
+from .middleware import json_response
+from ..config.core import settings
 import logging
 
 router = APIRouter()
@@ -18,30 +25,87 @@ class ExportRequest(BaseModel):
     board_ids: List[str]
     format: str = "json"
 
+class CardPageResponse(BaseModel):
+    cards: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    limit: int
+
+class CardSearchResponse(BaseModel):
+    total: int
+    results: List[TrelloCard]
+    sync: Dict[str, Any]
+
+def _rate_limited(e: TrelloRateLimitError) -> HTTPException:
+    logger.warning("%s", e)
+    return HTTPException(status_code=429, detail="Trello call budget exhausted; retry shortly.", headers={"Retry-After": "10"})
+
 # --- Trello Endpoints ---
+# Routes that call Trello are plain `def`: waiting for call budget blocks, so they must run in the threadpool
 
 @router.get("/boards", response_model=List[Dict[str, Any]])
-async def get_boards(trello_service: TrelloService = Depends(get_trello_service)):
+def get_boards(trello_service: TrelloService = Depends(get_trello_service)):
     """Get all Trello boards for the authenticated user."""
     try:
         return trello_service.get_boards()
+    except TrelloRateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
-        logger.error(f"Error fetching boards: {e}", exc_info=True)
+        logger.error("Error fetching boards: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch Trello boards.")
 
+def _parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    try:
+        return TrelloCard.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _project(cards: List[TrelloCard], fields: Optional[Set[str]]) -> List[Dict[str, Any]]:
+    return [card.model_dump(include=fields) for card in cards]
+
 @router.get("/boards/{board_id}/cards", response_model=List[TrelloCard])
-async def get_board_cards(board_id: str, trello_service: TrelloService = Depends(get_trello_service)):
+def get_board_cards(
+    board_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated card fields to return, e.g. id,name,list_name,priority"),
+    trello_service: TrelloService = Depends(get_trello_service)
+):
     """Get all cards from a specific Trello board."""
+    projection = _parse_fields(fields)
     try:
-        cards = trello_service.get_board_cards(board_id)
-        logger.info(f"Returning {len(cards)} cards for board {board_id}")
-        return cards
+        if projection is None:
+            cards = trello_service.get_board_cards(board_id)
+            logger.info("Returning %s cards for board %s", len(cards), board_id)
+            return json_response(cards)
+        cards = trello_service.get_board_cards(board_id, fields=projection)
+        logger.info("Returning %s cards (%s) for board %s", len(cards), ",".join(sorted(projection)), board_id)
+        return json_response(_project(cards, projection))
+    except TrelloRateLimitError as e:
+        raise _rate_limited(e)
+    except Exception as e:
+        logger.error("Error fetching cards for board %s: %s", board_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch cards for board {board_id}.")
+
+@router.get("/boards/{board_id}/cards/page", response_model=CardPageResponse)
+def get_board_cards_page(
+    board_id: str,
+    limit: Optional[int] = Query(None, ge=1, description="Page size (default TRELLO_PAGE_SIZE)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated card fields to return"),
+    trello_service: TrelloService = Depends(get_trello_service)
+):
+    """Get one page of a board's cards, newest first. Follow next_cursor until it is null."""
+    projection = _parse_fields(fields)
+    limit = min(limit or settings.TRELLO_PAGE_SIZE, settings.TRELLO_MAX_PAGE_SIZE)
+    try:
+        cards, next_cursor = trello_service.get_board_cards_page(board_id, limit, cursor=cursor, fields=projection)
+        return json_response({"cards": _project(cards, projection), "next_cursor": next_cursor, "limit": limit})
+    except TrelloRateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
-        logger.error(f"Error fetching cards for board {board_id}: {e}", exc_info=True)
+        logger.error("Error fetching a page of cards for board %s: %s", board_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch cards for board {board_id}.")
 
 @router.post("/cards", response_model=List[TrelloCard])
-async def get_cards_by_id(request: GetCardsRequest, trello_service: TrelloService = Depends(get_trello_service)):
+def get_cards_by_id(request: GetCardsRequest, trello_service: TrelloService = Depends(get_trello_service)):
     """Get detailed information for a list of card IDs."""
     if not request.card_ids:
         raise HTTPException(status_code=400, detail="No card IDs provided.")
@@ -49,14 +113,16 @@ async def get_cards_by_id(request: GetCardsRequest, trello_service: TrelloServic
         cards = [trello_service.get_card_details(card_id) for card_id in request.card_ids]
         return cards
     except TrelloCardNotFoundError as e:
-        logger.warning(f"Failed to find a card: {e}")
+        logger.warning("Failed to find a card: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
+    except TrelloRateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
-        logger.error(f"Error retrieving cards by ID: {e}", exc_info=True)
+        logger.error("Error retrieving cards by ID: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve card details.")
 
 @router.post("/cards/export")
-async def export_cards(
+def export_cards(
     request: ExportRequest,
     trello_service: TrelloService = Depends(get_trello_service)
 ):
@@ -64,6 +130,74 @@ async def export_cards(
     try:
         cards = trello_service.get_cards_from_multiple_boards(request.board_ids)
         return trello_service.export_cards_data(cards, request.format)
+    except TrelloRateLimitError as e:
+        raise _rate_limited(e)
+    except Exception as e:
+        logger.error("Error exporting cards: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to export cards.")
+
+@router.get("/cards/search", response_model=CardSearchResponse)
+async def search_cards(
+    q: Optional[str] = Query(None, description="Full-text query over name, description, project and stakeholders"),
+    board_id: Optional[str] = None,
+    project: Optional[str] = None,
+    priority: Optional[str] = None,
+    type: Optional[str] = None,
+    list_name: Optional[str] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    card_store: CardStore = Depends(get_card_store)
+):
+    """Search and filter cards from the local mirror without calling Trello."""
+    try:
+        found = card_store.search(
+            query=q, board_id=board_id, project=project, priority=priority, type=type,
+            list_name=list_name, due_after=due_after, due_before=due_before,
+            limit=limit, offset=offset
+        )
+        return {**found, "sync": card_store.get_sync_status(board_id)}
+    except Exception as e:
+        logger.error("Error searching cards: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to search cards.")
+
+@router.get("/store/status")
+async def get_store_status(card_store: CardStore = Depends(get_card_store)):
+    """Report how fresh the local card mirror is for each board."""
+    return card_store.get_sync_status()
+
+@router.get("/cache/status")
+async def get_cache_status(
+    board_cache: BoardCache = Depends(get_board_cache),
+    refresher: BoardRefresher = Depends(get_board_refresher)
+):
+    """Report cached board ages and background refresher activity."""
+    boards = {board_id: board_cache.age(board_id) for board_id in board_cache.board_ids()}
+    return {
+        "ttl_seconds": board_cache.ttl_seconds,
+        "stale_ttl_seconds": board_cache.stale_ttl_seconds,
+        "backend": board_cache.backend.stats(),
+        "boards": {board_id: round(age, 3) for board_id, age in boards.items() if age is not None},
+        "hot_boards": refresher.hot_boards(),
+        "refresher": refresher.stats(),
+        "tenants": get_tenant_registry().stats(),
+    }
+
+@router.post("/boards/{board_id}/sync")
+def sync_board(
+    board_id: str,
+    trello_service: TrelloService = Depends(get_trello_service),
+    card_store: CardStore = Depends(get_card_store)
+):
+    """Refresh the local mirror for a board from Trello."""
+    if not trello_service.tenant.is_default:
+        raise HTTPException(status_code=400, detail="The local card store only mirrors the default tenant.")
+    try:
+        trello_service.get_board_cards(board_id, force_refresh=True)
+        return card_store.get_sync_status(board_id)
+    except TrelloRateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
-        logger.error(f"Error exporting cards: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Failed to export cards.") 
\ No newline at end of file
+        logger.error("Error syncing board %s: %s", board_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to sync board {board_id}.")
@@ -0,0 +1,73 @@
+from typing import List, Dict, Any
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+
+from ..config.core import settings
+from ..services.webhook_service import WebhookService, WebhookSignatureError, get_webhook_service
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _callback_url(request: Request) -> str:
+    """The URL Trello signs with: the configured public URL, else the URL we were called on."""
+    return settings.TRELLO_WEBHOOK_CALLBACK_URL or str(request.url_for("receive_webhook"))
+
+# --- Webhook Endpoints ---
+
+@router.head("/callback")
+async def verify_webhook_callback():
+    """Trello sends a HEAD request when a webhook is created to check the callback exists."""
+    return Response(status_code=200)
+
+@router.post("/callback", name="receive_webhook")
+async def receive_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    webhook_service: WebhookService = Depends(get_webhook_service)
+):
+    """Receive a Trello webhook, verify its signature and apply it to the local caches."""
+    body = await request.body()
+    try:
+        webhook_service.verify_signature(body, request.headers.get("X-Trello-Webhook"), _callback_url(request))
+    except WebhookSignatureError as e:
+        logger.warning("Rejected webhook: %s", e)
+        raise HTTPException(status_code=401, detail="Invalid webhook signature.")
+
+    payload = await request.json()
+    # Acknowledge immediately; the card re-fetch happens after the response is sent
+    background_tasks.add_task(webhook_service.apply_action, payload)
+    return {"status": "accepted"}
+
+@router.get("", response_model=List[Dict[str, Any]])
+def list_webhooks(webhook_service: WebhookService = Depends(get_webhook_service)):
+    """List webhooks registered for the configured Trello token."""
+    try:
+        return webhook_service.trello_service.list_webhooks()
+    except Exception as e:
+        logger.error("Error listing webhooks: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to list webhooks.")
+
+@router.put("/boards/{board_id}")
+def register_board_webhook(
+    board_id: str,
+    request: Request,
+    webhook_service: WebhookService = Depends(get_webhook_service)
+):
+    """Register (idempotently) a webhook that pushes a board's card changes to us."""
+    try:
+        return webhook_service.register_board(board_id, _callback_url(request))
+    except Exception as e:
+        logger.error("Error registering webhook for board %s: %s", board_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to register webhook for board {board_id}.")
+
+@router.delete("/boards/{board_id}")
+def unregister_board_webhook(
+    board_id: str,
+    webhook_service: WebhookService = Depends(get_webhook_service)
+):
+    """Remove every webhook registered for a board."""
+    try:
+        return {"deleted": webhook_service.unregister_board(board_id)}
+    except Exception as e:
+        logger.error("Error unregistering webhooks for board %s: %s", board_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to unregister webhooks for board {board_id}.")
@@ -0,0 +1,36 @@
+"""
+Cache backends shared by the board and BRD caches.
+
+CACHE_BACKEND selects the store: "memory" keeps a separate LRU in each worker
+process, "sqlite" shares one file between the workers on a host, and "redis"
+shares a Redis-protocol server between replicas.
+"""
+from functools import lru_cache
+from pathlib import Path
+
+from .. import PROJECT_ROOT
+from ..config.core import settings
+from .base import CacheBackend, CacheNamespace, decode, encode
+from .memory import MemoryBackend
+
+__all__ = ['CacheBackend', 'CacheNamespace', 'MemoryBackend', 'get_cache_backend', 'encode', 'decode']
+
+
+@lru_cache(maxsize=1)
+def get_cache_backend() -> CacheBackend:
+    """Dependency injector for the process-wide cache backend."""
+    backend = settings.CACHE_BACKEND.strip().lower()
+    if backend == "memory":
+        return MemoryBackend()
+    if backend == "sqlite":
+        from .sqlite import SQLiteBackend
+        db_path = settings.CACHE_SQLITE_PATH
+        if db_path != ":memory:" and not Path(db_path).is_absolute():
+            db_path = str(PROJECT_ROOT / db_path)
+        return SQLiteBackend(db_path, compress_min_bytes=settings.CACHE_COMPRESS_MIN_BYTES)
+    if backend == "redis":
+        from .redis import RedisBackend
+        return RedisBackend(
+            settings.CACHE_REDIS_URL, prefix=settings.CACHE_KEY_PREFIX, compress_min_bytes=settings.CACHE_COMPRESS_MIN_BYTES
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
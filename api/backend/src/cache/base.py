@@ -0,0 +1,273 @@
+import json
+import threading
+import zlib
+import logging
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# One-byte header telling decode() how the rest of the value is stored
+_PLAIN = b"j"
+_ZLIB = b"z"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def encode(value: Any, compress_min_bytes: int = 1024) -> bytes:
+    """Compact JSON, zlib-compressed once it is large enough for that to pay off."""
+    data = json.dumps(value, separators=(",", ":"), default=_json_default).encode("utf-8")
+    if len(data) >= compress_min_bytes:
+        return _ZLIB + zlib.compress(data, 6)
+    return _PLAIN + data
+
+
+def decode(blob: bytes) -> Any:
+    header, data = blob[:1], blob[1:]
+    if header == _ZLIB:
+        data = zlib.decompress(data)
+    elif header != _PLAIN:
+        raise ValueError(f"Unknown cache value header: {header!r}")
+    return json.loads(data)
+
+
+class CacheBackend(ABC):
+    """
+    Key-value store behind the board and BRD caches. Keys live in namespaces
+    (one per cached resource) that carry their own TTL and size limit; see
+    namespace(). Backend errors are logged and treated as misses, so an
+    unavailable cache slows requests down but never fails them.
+
+    Values must be JSON-serialisable (pydantic models are dumped). Shared
+    backends return them as plain JSON types; the memory backend returns the
+    stored objects themselves.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._stats: Counter = Counter()
+
+    # --- Implemented by each backend ---
+
+    @abstractmethod
+    def _get(self, namespace: str, key: str, touch: bool) -> Optional[Any]:
+        """Return the live value or None; `touch` marks it recently used."""
+
+    @abstractmethod
+    def _set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float], max_entries: Optional[int]) -> None:
+        ...
+
+    @abstractmethod
+    def _delete(self, namespace: str, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def _compare_and_set(self, namespace: str, key: str, expected: Any, value: Any, ttl_seconds: Optional[float]) -> bool:
+        """Atomically replace the live value of `key` with `value` if it still equals `expected`."""
+
+    @abstractmethod
+    def _keys(self, namespace: str) -> List[str]:
+        ...
+
+    def _get_many(self, namespace: str, keys: List[str]) -> List[Optional[Any]]:
+        return [self._get(namespace, key, touch=True) for key in keys]
+
+    def _set_many(self, namespace: str, items: Dict[str, Any], ttl_seconds: Optional[float], max_entries: Optional[int]) -> None:
+        for key, value in items.items():
+            self._set(namespace, key, value, ttl_seconds, max_entries)
+
+    def _backend_stats(self) -> Dict[str, Any]:
+        return {}
+
+    # --- Shared behaviour ---
+
+    def namespace(self, name: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None) -> "CacheNamespace":
+        return CacheNamespace(self, name, ttl_seconds, max_entries)
+
+    def _record(self, namespace: str, result: str, count: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[(namespace, result)] += count
+        if result in ("eviction", "expired"):
+            metrics.increment("cache_evictions_total", count, backend=self.name, namespace=namespace, reason=result)
+        else:
+            metrics.increment("cache_requests_total", count, backend=self.name, namespace=namespace, result=result)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        try:
+            value = self._get(namespace, key, touch=True)
+        except Exception as e:
+            logger.warning("%s cache read of %s/%s failed: %s", self.name, namespace, key, e)
+            self._record(namespace, "error")
+            return None
+        self._record(namespace, "miss" if value is None else "hit")
+        return value
+
+    def peek(self, namespace: str, key: str) -> Optional[Any]:
+        """Like get(), but without counting a hit or miss or refreshing LRU order."""
+        try:
+            return self._get(namespace, key, touch=False)
+        except Exception as e:
+            logger.warning("%s cache read of %s/%s failed: %s", self.name, namespace, key, e)
+            return None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            self.delete(namespace, key)
+            return
+        try:
+            self._set(namespace, key, value, ttl_seconds, max_entries)
+        except Exception as e:
+            logger.warning("%s cache write of %s/%s failed: %s", self.name, namespace, key, e)
+            self._record(namespace, "error")
+
+    def get_many(self, namespace: str, keys: List[str]) -> List[Optional[Any]]:
+        """Values for `keys` in order (None for each miss), in one round trip where the backend allows it."""
+        if not keys:
+            return []
+        try:
+            values = self._get_many(namespace, keys)
+        except Exception as e:
+            logger.warning("%s cache read of %s keys from %s failed: %s", self.name, len(keys), namespace, e)
+            self._record(namespace, "error")
+            return [None] * len(keys)
+        hits = sum(value is not None for value in values)
+        if hits:
+            self._record(namespace, "hit", hits)
+        if hits < len(values):
+            self._record(namespace, "miss", len(values) - hits)
+        return values
+
+    def set_many(self, namespace: str, items: Dict[str, Any], ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        if not items:
+            return
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            for key in items:
+                self.delete(namespace, key)
+            return
+        try:
+            self._set_many(namespace, items, ttl_seconds, max_entries)
+        except Exception as e:
+            logger.warning("%s cache write of %s keys to %s failed: %s", self.name, len(items), namespace, e)
+            self._record(namespace, "error")
+
+    def compare_and_set(self, namespace: str, key: str, expected: Any, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Replace the value of `key` only if it still equals `expected`, so
+        read-modify-write updates from several workers cannot overwrite each
+        other. Returns False if the entry changed, expired or the write failed;
+        callers re-read and retry.
+        """
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            return False
+        try:
+            return self._compare_and_set(namespace, key, expected, value, ttl_seconds)
+        except Exception as e:
+            logger.warning("%s cache compare-and-set of %s/%s failed: %s", self.name, namespace, key, e)
+            self._record(namespace, "error")
+            return False
+
+    def delete(self, namespace: str, key: str) -> bool:
+        try:
+            return self._delete(namespace, key)
+        except Exception as e:
+            logger.warning("%s cache delete of %s/%s failed: %s", self.name, namespace, key, e)
+            return False
+
+    def keys(self, namespace: str) -> List[str]:
+        try:
+            return self._keys(namespace)
+        except Exception as e:
+            logger.warning("%s cache key listing of %s failed: %s", self.name, namespace, e)
+            return []
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits, misses, evictions and expirations seen by this process, per namespace."""
+        with self._stats_lock:
+            counts = dict(self._stats)
+        namespaces: Dict[str, Dict[str, int]] = {}
+        for (namespace, result), count in counts.items():
+            namespaces.setdefault(namespace, {})[result] = count
+        totals: Counter = Counter()
+        for (_, result), count in counts.items():
+            totals[result] += count
+        hits, misses = totals["hit"], totals["miss"]
+        try:
+            backend_stats = self._backend_stats()
+        except Exception as e:
+            logger.warning("%s cache stats failed: %s", self.name, e)
+            backend_stats = {}
+        return {
+            "backend": self.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "evictions": totals["eviction"],
+            "expired": totals["expired"],
+            "errors": totals["error"],
+            "namespaces": namespaces,
+            **backend_stats,
+        }
+
+    def release(self, namespace: str) -> None:
+        """
+        Forget a namespace this process no longer uses. Shared backends keep
+        its entries (other workers may still use them) and let them expire.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class CacheNamespace:
+    """One cached resource in a backend, with its own TTL and size limit."""
+
+    def __init__(self, backend: CacheBackend, name: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.backend = backend
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.backend.get(self.name, key)
+
+    def peek(self, key: str) -> Optional[Any]:
+        return self.backend.peek(self.name, key)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store `value`; `ttl_seconds` overrides the namespace TTL for this entry."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.backend.set(self.name, key, value, ttl, self.max_entries)
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return self.backend.get_many(self.name, keys)
+
+    def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.backend.set_many(self.name, items, ttl, self.max_entries)
+
+    def compare_and_set(self, key: str, expected: Any, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        return self.backend.compare_and_set(self.name, key, expected, value, ttl)
+
+    def delete(self, key: str) -> bool:
+        return self.backend.delete(self.name, key)
+
+    def keys(self) -> List[str]:
+        return self.backend.keys(self.name)
+
+    def __contains__(self, key: str) -> bool:
+        return self.peek(key) is not None
+
+    def __len__(self) -> int:
+        return len(self.keys())
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import CacheBackend
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Per-process LRU. Values are kept as the objects that were stored (no
+    serialisation), so this is the fastest backend but each worker has its own.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        # namespace -> key -> (value, expires_at or None), least recently used first
+        self._namespaces: Dict[str, "OrderedDict[str, Tuple[Any, Optional[float]]]"] = {}
+
+    def _get(self, namespace: str, key: str, touch: bool) -> Optional[Any]:
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del entries[key]
+                expired = True
+            else:
+                expired = False
+                if touch:
+                    entries.move_to_end(key)
+        if expired:
+            self._record(namespace, "expired")
+            return None
+        return value
+
+    def _set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float], max_entries: Optional[int]) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds is not None else None
+        evicted = 0
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            entries[key] = (value, expires_at)
+            entries.move_to_end(key)
+            while max_entries is not None and len(entries) > max_entries:
+                entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._record(namespace, "eviction", evicted)
+
+    def _compare_and_set(self, namespace: str, key: str, expected: Any, value: Any, ttl_seconds: Optional[float]) -> bool:
+        now = time.time()
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None or (entry[1] is not None and now >= entry[1]) or entry[0] != expected:
+                return False
+            entries[key] = (value, now + ttl_seconds if ttl_seconds is not None else None)
+            entries.move_to_end(key)
+        return True
+
+    def _delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            return entries is not None and entries.pop(key, None) is not None
+
+    def _keys(self, namespace: str) -> List[str]:
+        now = time.time()
+        with self._lock:
+            entries = self._namespaces.get(namespace) or {}
+            return [key for key, (_, expires_at) in entries.items() if expires_at is None or expires_at > now]
+
+    def release(self, namespace: str) -> None:
+        with self._lock:
+            self._namespaces.pop(namespace, None)
+
+    def _backend_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": {namespace: len(entries) for namespace, entries in self._namespaces.items()}}
@@ -0,0 +1,91 @@
+import math
+from typing import Any, Dict, List, Optional
+
+from .base import CacheBackend, decode, encode
+
+try:
+    from redis.exceptions import WatchError
+except ImportError:  # redis is optional; RedisBackend reports it when it needs to connect
+    class WatchError(Exception):
+        """Raised by a transaction whose watched key changed."""
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache on a Redis-protocol server, shared by every replica. Keys are
+    `<prefix>:<namespace>:<key>` and expire server-side. Namespace size limits
+    are not enforced here: configure the server with maxmemory and an LRU
+    eviction policy instead; its eviction count is reported in stats().
+    Needs the optional `redis` package.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "k2brd", compress_min_bytes: int = 1024, client=None):
+        super().__init__()
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis needs the redis package: pip install redis") from e
+            client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self._client = client
+        self.prefix = prefix
+        self.compress_min_bytes = compress_min_bytes
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _get(self, namespace: str, key: str, touch: bool) -> Optional[Any]:
+        blob = self._client.get(self._key(namespace, key))
+        return decode(blob) if blob is not None else None
+
+    def _set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float], max_entries: Optional[int]) -> None:
+        expires_ms = math.ceil(ttl_seconds * 1000) if ttl_seconds is not None else None
+        self._client.set(self._key(namespace, key), encode(value, self.compress_min_bytes), px=expires_ms)
+
+    def _get_many(self, namespace: str, keys: List[str]) -> List[Optional[Any]]:
+        blobs = self._client.mget([self._key(namespace, key) for key in keys])
+        return [decode(blob) if blob is not None else None for blob in blobs]
+
+    def _set_many(self, namespace: str, items: Dict[str, Any], ttl_seconds: Optional[float], max_entries: Optional[int]) -> None:
+        expires_ms = math.ceil(ttl_seconds * 1000) if ttl_seconds is not None else None
+        with self._client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(self._key(namespace, key), encode(value, self.compress_min_bytes), px=expires_ms)
+            pipe.execute()
+
+    def _compare_and_set(self, namespace: str, key: str, expected: Any, value: Any, ttl_seconds: Optional[float]) -> bool:
+        name = self._key(namespace, key)
+        expires_ms = math.ceil(ttl_seconds * 1000) if ttl_seconds is not None else None
+        with self._client.pipeline() as pipe:
+            pipe.watch(name)
+            blob = pipe.get(name)
+            if blob is None or decode(blob) != expected:
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.set(name, encode(value, self.compress_min_bytes), px=expires_ms)
+            try:
+                pipe.execute()
+            except WatchError:
+                return False
+        return True
+
+    def _delete(self, namespace: str, key: str) -> bool:
+        return self._client.delete(self._key(namespace, key)) > 0
+
+    def _keys(self, namespace: str) -> List[str]:
+        prefix = self._key(namespace, "")
+        keys = []
+        for raw in self._client.scan_iter(match=f"{prefix}*", count=500):
+            key = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+            keys.append(key[len(prefix):])
+        return keys
+
+    def _backend_stats(self) -> Dict[str, Any]:
+        info = self._client.info("stats")
+        return {"server_evicted_keys": info.get("evicted_keys"), "server_expired_keys": info.get("expired_keys")}
+
+    def close(self) -> None:
+        self._client.close()
@@ -0,0 +1,171 @@
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .base import CacheBackend, decode, encode
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_stored ON cache_entries(namespace, stored_at);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at);
+"""
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache in a local SQLite file (WAL mode), shared by every worker process on
+    the host. Namespaces over their size limit drop their oldest-stored
+    entries; reads do not write, so eviction order is FIFO rather than LRU.
+    Expired rows are purged every `purge_every` writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str = ":memory:", compress_min_bytes: int = 1024, purge_every: int = 500):
+        super().__init__()
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.compress_min_bytes = compress_min_bytes
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        # The timeout covers other worker processes holding the write lock
+        self._conn = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+        with self._lock, self._conn:
+            if db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def _get(self, namespace: str, key: str, touch: bool) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and time.time() >= expires_at:
+            with self._lock, self._conn:
+                deleted = self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at = ?", (namespace, key, expires_at)
+                ).rowcount
+            if deleted:
+                self._record(namespace, "expired")
+            return None
+        return decode(value)
+
+    def _get_many(self, namespace: str, keys: List[str]) -> List[Optional[Any]]:
+        # Expired rows read as misses here and are left to the periodic purge
+        found: Dict[str, bytes] = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM cache_entries WHERE namespace = ? AND key IN ({', '.join('?' * len(chunk))}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    (namespace, *chunk, now),
+                ).fetchall()
+                found.update(rows)
+        return [decode(found[key]) if key in found else None for key in keys]
+
+    def _set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float], max_entries: Optional[int]) -> None:
+        self._set_many(namespace, {key: value}, ttl_seconds, max_entries)
+
+    def _set_many(self, namespace: str, items: Dict[str, Any], ttl_seconds: Optional[float], max_entries: Optional[int]) -> None:
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+        rows = [(namespace, key, encode(value, self.compress_min_bytes), now, expires_at) for key, value in items.items()]
+        evicted = 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            if max_entries is not None:
+                evicted = self._conn.execute(
+                    """
+                    DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                        SELECT key FROM cache_entries WHERE namespace = ?
+                        ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (namespace, namespace, max_entries),
+                ).rowcount
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                purged = self._conn.execute(
+                    "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+                ).rowcount
+                logger.debug("Purged %s expired cache entries", purged)
+        if evicted:
+            self._record(namespace, "eviction", evicted)
+
+    def _compare_and_set(self, namespace: str, key: str, expected: Any, value: Any, ttl_seconds: Optional[float]) -> bool:
+        blob = encode(value, self.compress_min_bytes)
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+        with self._lock:
+            # IMMEDIATE takes the database write lock before the read, so no
+            # other worker process can write the entry in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                live = row is not None and (row[1] is None or row[1] > now)
+                if not live or decode(row[0]) != expected:
+                    self._conn.rollback()
+                    return False
+                self._conn.execute(
+                    "UPDATE cache_entries SET value = ?, stored_at = ?, expires_at = ? WHERE namespace = ? AND key = ?",
+                    (blob, now, expires_at, namespace, key),
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return True
+
+    def _delete(self, namespace: str, key: str) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).rowcount > 0
+
+    def _keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM cache_entries WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time()),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _backend_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT namespace, COUNT(*), SUM(LENGTH(value)) FROM cache_entries GROUP BY namespace"
+            ).fetchall()
+        return {
+            "path": self.db_path,
+            "entries": {namespace: count for namespace, count, _ in rows},
+            "bytes": {namespace: size or 0 for namespace, _, size in rows},
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
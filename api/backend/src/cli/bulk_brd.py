@@ -0,0 +1,214 @@
+"""
+Bulk BRD runner: generate BRDs for every open card on one or more boards, or
+for a list of card IDs, writing one Markdown file per card.
+
+    python -m src.cli.bulk_brd --board <board_id> [--board <board_id> ...] --out brds/
+    python -m src.cli.bulk_brd --cards-file card_ids.txt --out brds/ --concurrency 4
+
+Completed cards are appended to <out>/checkpoint.jsonl as they finish, so an
+interrupted run picks up where it stopped when started again with the same
+--out directory. Failed cards are retried on the next run.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO
+
+from ..config.core import settings
+from ..config.logging_config import setup_logging
+from ..models.card import TrelloCard
+from ..services.brd_service import BRDService
+from ..services.llm_scheduler import LLMScheduler
+from ..services.llm_service import LLMService
+from ..services.trello_service import TrelloService
+from ..utils.cancellation import CancellationToken, GenerationCancelledError
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+
+class Checkpoint:
+    """Append-only JSONL record of finished cards; the last entry per card wins."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write can leave a torn last line
+                        continue
+                    self.entries[entry["card_id"]] = entry
+        self._file: Optional[TextIO] = None
+
+    def completed(self) -> Set[str]:
+        return {card_id for card_id, entry in self.entries.items() if entry["status"] == "ok"}
+
+    def record(self, card_id: str, status: str, **details) -> None:
+        entry = {"card_id": card_id, "status": status, "at": datetime.now(timezone.utc).isoformat(), **details}
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        self.entries[card_id] = entry
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Progress:
+    """Throughput and ETA over the cards processed in this run."""
+
+    def __init__(self, total: int, already_done: int = 0, stream: TextIO = sys.stderr, clock=time.monotonic):
+        self.total = total
+        self.already_done = already_done
+        self.done = 0
+        self.failed = 0
+        self.stream = stream
+        self._clock = clock
+        self._started = clock()
+
+    def update(self, ok: bool) -> None:
+        self.done += 1
+        if not ok:
+            self.failed += 1
+        self.stream.write(self.render() + "\n")
+        self.stream.flush()
+
+    def render(self) -> str:
+        elapsed = max(self._clock() - self._started, 1e-9)
+        rate = self.done / elapsed
+        remaining = self.total - self.done
+        eta = _format_duration(remaining / rate) if rate else "?"
+        position = self.already_done + self.done
+        overall = self.already_done + self.total
+        return (
+            f"[{position}/{overall}] {rate * 60:.1f} cards/min, "
+            f"elapsed {_format_duration(elapsed)}, ETA {eta}, failed {self.failed}"
+        )
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _slug(text: str, limit: int = 60) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug[:limit].rstrip("-") or "card"
+
+
+def render_markdown(card: TrelloCard, brd: str) -> str:
+    details = [
+        ("Card", f"[{card.name}](https://trello.com/c/{card.id})"),
+        ("List", card.list_name),
+        ("Project", card.project),
+        ("Type", card.type),
+        ("Priority", card.priority),
+        ("Effort", card.effort),
+        ("Repo", card.github_repo),
+    ]
+    header = "\n".join(f"- **{label}:** {value}" for label, value in details if value)
+    return f"# {card.name}\n\n{header}\n\n---\n\n{brd.strip()}\n"
+
+
+def load_card_ids(path: Path) -> List[str]:
+    """One card ID (or card URL) per line; blank lines and #-comments are ignored."""
+    card_ids = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        match = re.search(r"trello\.com/c/([^/\s]+)", line)
+        card_ids.append(match.group(1) if match else line)
+    return list(dict.fromkeys(card_ids))
+
+
+def collect_cards(trello_service: TrelloService, board_ids: Iterable[str], card_ids: Iterable[str]) -> List[TrelloCard]:
+    cards = trello_service.get_cards_from_multiple_boards(list(board_ids)) if board_ids else []
+    for card_id in card_ids:
+        cards.append(trello_service.get_card_details(card_id))
+    # A card listed both ways is generated once
+    return list({card.id: card for card in cards}.values())
+
+
+def run_bulk(
+    cards: List[TrelloCard],
+    brd_service: BRDService,
+    out_dir: Path,
+    cancel_token: Optional[CancellationToken] = None,
+    progress_stream: TextIO = sys.stderr,
+) -> Dict[str, int]:
+    """Generate and write BRDs for every card not already checkpointed as done."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint = Checkpoint(out_dir / CHECKPOINT_FILE)
+    done = checkpoint.completed()
+    pending = [card for card in cards if card.id not in done]
+    skipped = len(cards) - len(pending)
+    if skipped:
+        logger.info("Resuming: %s of %s cards already done", skipped, len(cards))
+
+    progress = Progress(len(pending), already_done=skipped, stream=progress_stream)
+    try:
+        for card, result, error in brd_service.generate_brd_as_completed(pending, cancel_token=cancel_token, user="bulk-cli"):
+            if error is not None:
+                logger.error("BRD generation failed for card %s: %s", card.id, error)
+                checkpoint.record(card.id, "error", error=str(error))
+            else:
+                path = out_dir / f"{card.id}-{_slug(card.name)}.md"
+                path.write_text(render_markdown(card, result["brd"]), encoding="utf-8")
+                checkpoint.record(card.id, "ok", file=path.name)
+            progress.update(ok=error is None)
+    finally:
+        checkpoint.close()
+    return {"total": len(cards), "skipped": skipped, "generated": progress.done - progress.failed, "failed": progress.failed}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.cli.bulk_brd", description="Generate BRDs for many Trello cards")
+    parser.add_argument("--board", action="append", default=[], dest="boards", help="Board ID (repeatable)")
+    parser.add_argument("--cards-file", type=Path, help="File with one card ID or URL per line")
+    parser.add_argument("--out", type=Path, required=True, help="Output directory (also holds the checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=settings.LLM_MAX_CONCURRENCY, help="Concurrent LLM calls")
+    args = parser.parse_args(argv)
+    if not args.boards and not args.cards_file:
+        parser.error("pass at least one --board or a --cards-file")
+
+    setup_logging()
+    trello_service = TrelloService()
+    card_ids = load_card_ids(args.cards_file) if args.cards_file else []
+    cards = collect_cards(trello_service, args.boards, card_ids)
+    logger.info("Collected %s cards", len(cards))
+
+    scheduler = LLMScheduler(max_concurrency=args.concurrency)
+    brd_service = BRDService(trello_service, LLMService(), scheduler)
+    cancel_token = CancellationToken()
+    try:
+        summary = run_bulk(cards, brd_service, args.out, cancel_token=cancel_token)
+    except KeyboardInterrupt:
+        cancel_token.cancel("interrupted")
+        print("Interrupted; re-run with the same --out to resume.", file=sys.stderr)
+        return 130
+    except GenerationCancelledError:
+        return 130
+    finally:
+        scheduler.stop()
+
+    print(json.dumps(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Optional
 import os
 
 # Construct the path to the .env file
@@ -15,22 +17,136 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "K2BRD"
     DEV_MODE: bool = False
 
+    # Logging
+    LOG_ASYNC: bool = True # Hand records to a background writer thread
+    LOG_CARD_DEBUG_SAMPLE_RATE: float = 0.05 # Fraction of cards whose parse steps are debug-logged
+    LOG_MAX_PAYLOAD_CHARS: int = 2000 # Truncation for LLM payload/response debug dumps
+    TRACE_ENABLED: bool = False # Record span traces for every request
+    TRACE_ALLOW_HEADERS: bool = False # Honour per-request X-Trace / X-Profile headers
+    TRACE_DIR: str = "traces" # Chrome trace-event JSON and folded-stack profiles are written here
+    TRACE_PROFILE_INTERVAL: float = 0.005 # Sampling profiler interval in seconds
+    TRACE_MAX_FILES: int = 200 # Newest trace and profile files kept in TRACE_DIR; older ones are deleted
+
     # Trello Config
     TRELLO_API_KEY: str
     TRELLO_TOKEN: str
     TRELLO_BASE_URL: str = "https://api.trello.com/1"
+    TRELLO_API_SECRET: Optional[str] = None # Used to verify webhook callback signatures
+    TRELLO_WEBHOOK_CALLBACK_URL: Optional[str] = None # Public URL of /api/v1/trello/webhooks/callback
+    TRELLO_STREAM_CARDS: bool = False # Decode board card listings incrementally (lower peak memory)
+    TRELLO_STREAM_CHUNK_SIZE: int = 65536
+    TRELLO_PAGE_SIZE: int = 100 # Default page size of the paginated board card listing
+    TRELLO_MAX_PAGE_SIZE: int = 1000 # Trello returns at most 1000 cards per request
+    PARSE_POOL_THRESHOLD: int = 2000 # Parse batches this large on the process pool (0 disables)
+    PARSE_POOL_WORKERS: int = 0 # 0 = one per CPU, minus one for the server
+    PARSE_POOL_CHUNK_SIZE: int = 250
+    TRELLO_TENANTS_FILE: Optional[str] = None # JSON object mapping X-Tenant-Id values to {"api_key": ..., "token": ..., "secret": ...}
+    TRELLO_ALLOW_CALLER_CREDENTIALS: bool = True # Accept X-Trello-Key / X-Trello-Token request headers
+    TRELLO_TENANT_IDLE_TTL: int = 900 # Seconds before an unused tenant's connection pool and budget are dropped
+    TRELLO_POOL_SIZE: int = 10 # Pooled connections per tenant
+    TRELLO_CALLS_PER_10S: int = 100 # Per-tenant call budget; Trello allows 100 requests per 10s per token
+    TRELLO_RATE_WAIT: float = 2 # Seconds a call may wait for budget before failing with 429
+    WEB_CONCURRENCY: int = 1 # Server worker processes (uvicorn reads it too); they split TRELLO_CALLS_PER_10S between them
+    BOARD_CACHE_TTL: int = 300 # Seconds a fetched board is served from the board cache
+    BOARD_CACHE_STALE_TTL: int = 900 # Extra seconds a stale board may be served while it revalidates
+
+    # Background board refresher (stale-while-revalidate for hot boards)
+    BOARD_REFRESH_ENABLED: bool = True
+    BOARD_REFRESH_INTERVAL: float = 15 # Seconds between scans for boards due a refresh
+    BOARD_REFRESH_AHEAD: float = 0.8 # Refresh hot boards once this fraction of the TTL has passed
+    BOARD_REFRESH_HOT_WINDOW: int = 900 # Seconds over which board accesses are counted
+    BOARD_REFRESH_MIN_HITS: float = 2 # Accesses within the window that make a board hot
+    BOARD_REFRESH_CONCURRENCY: int = 2
+    BOARD_REFRESH_CALLS_PER_MINUTE: int = 60 # Trello call budget for background refreshes
 
     # GitHub Config
     GITHUB_TOKEN: str
+    GITHUB_API_URL: str = "https://api.github.com" # Point at a stand-in server for tests
+    GITHUB_ENRICH_ENABLED: bool = True # Add repository metadata to BRD contexts
+    GITHUB_CACHE_TTL: int = 3600 # Seconds before a cached repository is revalidated
+    GITHUB_BATCH_SIZE: int = 50 # Repositories per GraphQL query
+    GITHUB_TIMEOUT: float = 10
+    GITHUB_FAILURE_COOLDOWN: int = 300 # Seconds before a failed repository lookup is retried
 
     # LLM Config
     LLM_HOST: str = "http://localhost:1234" # Or the Docker service name, e.g., http://lm_studio:1234
     LLM_MODEL: str
-    MAX_TOKENS: int = 2500
+    MAX_TOKENS: int = 2500 # Budget until enough BRDs of a card type/effort have been seen
+    LLM_ADAPTIVE_MAX_TOKENS: bool = True # Size max_tokens from observed completion lengths
+    LLM_MIN_TOKENS: int = 512
+    LLM_MAX_TOKENS_CEILING: int = 4096 # Upper bound, also for retries of truncated BRDs
+    LLM_TOKEN_HEADROOM: float = 1.3
+    LLM_TOKEN_MIN_SAMPLES: int = 5
+    LLM_LENGTH_RETRIES: int = 1 # Retries with a larger budget when a BRD hits max_tokens
+    LLM_EARLY_STOP: bool = True # Stop a stream at the first new H1/H2 heading after "## Stakeholders" and the open questions
+    LLM_STREAM: bool = True # Stream completions so they can be aborted mid-generation
+    LLM_CONNECT_TIMEOUT: float = 5
+    LLM_FIRST_TOKEN_TIMEOUT: float = 60 # Also the longest allowed gap between streamed chunks
+    LLM_TOTAL_TIMEOUT: float = 300
+    LLM_MAX_CONCURRENCY: int = 1 # Generations sent to the LLM server at once
+    LLM_INTERACTIVE_MAX_CARDS: int = 5 # Larger requests are scheduled as bulk work
+
+    # Cache backend shared by the board and BRD caches
+    CACHE_BACKEND: str = "memory" # memory (per process), sqlite (shared by the workers on one host) or redis
+    CACHE_SQLITE_PATH: str = "cache/shared_cache.db" # Relative paths resolve against the backend/ directory
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0" # Any Redis-protocol server (Redis, Valkey, KeyDB)
+    CACHE_KEY_PREFIX: str = "k2brd"
+    CACHE_COMPRESS_MIN_BYTES: int = 1024 # Larger values are zlib-compressed by the shared backends
+
+    # BRD result cache and speculative pre-generation
+    BRD_CACHE_ENABLED: bool = True
+    BRD_CACHE_TTL: int = 86400
+    BRD_CACHE_MAX_ENTRIES: int = 1000
+    BRD_INCREMENTAL_ENABLED: bool = True # Rewrite only the sections affected by a card edit
+    BRD_SECTION_MAX_TOKENS: int = 400 # Budget per rewritten section
+    BRD_DEDUP_ENABLED: bool = True # Generate one BRD per group of near-duplicate cards
+    BRD_DEDUP_THRESHOLD: float = 0.8 # Estimated Jaccard similarity of card inputs that makes a near-duplicate
+    BRD_DEDUP_REUSE_THRESHOLD: float = 1.0 # Reuse a BRD verbatim at this similarity (1.0: identical inputs only), else adapt it
+    BRD_DEDUP_NUM_PERM: int = 64 # MinHash signature length
+    BRD_DEDUP_BANDS: int = 16 # LSH bands (NUM_PERM must be divisible by it)
+    BRD_DEDUP_MAX_ENTRIES: int = 10000 # Past results remembered for matching
+    BRD_DEDUP_ADAPT_MAX_TOKENS: int = 1200 # Budget for the follow-up that adapts a BRD to a near-duplicate
+    PREGEN_ENABLED: bool = False # Pre-generate BRDs for hot cards while the LLM is idle
+    PREGEN_PRIORITIES: str = "Critical,High" # Comma-separated card priorities worth pre-generating
+    PREGEN_RECENT_HOURS: int = 72 # Only cards active within this window
+    PREGEN_MAX_PER_BOARD: int = 10
+    PREGEN_MAX_PENDING: int = 50
+
+    # Local card store (SQLite mirror of Trello boards)
+    CARD_STORE_ENABLED: bool = True
+    CARD_STORE_PATH: str = "cache/cards.db" # Relative paths resolve against the backend/ directory
+
+    # Startup warm-up (gates /api/v1/ready)
+    WARMUP_ENABLED: bool = True
+    WARMUP_BOARD_IDS: str = "" # Comma-separated boards to pre-fetch into the board cache
+    WARMUP_CONNECT_TIMEOUT: float = 5 # Per pre-opened connection
+    WARMUP_TIMEOUT: float = 60 # Report ready after this long even if warm-up is still running
 
     # CORS
     CLIENT_ORIGIN: str = "http://localhost:5173"
 
 
-# Create a single, importable instance
-settings = Settings() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """The process-wide Settings, read from the environment and .env on first use."""
+    return Settings()
+
+
+class _LazySettings:
+    """
+    Stands in for the Settings instance so importing a module does not read
+    and validate the environment; that happens on the first attribute access.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(get_settings(), name)
+
+
+# A single, importable instance
+settings = _LazySettings()
@@ -15,7 +15,7 @@ def load_config() -> LabelConfig:
         logger.warning("label_config.json not found, using default config.")
         return LabelConfig.default_config()
     
-    logger.info(f"Loading label configuration from {config_path}")
+    logger.info("Loading label configuration from %s", config_path)
     with open(config_path) as f:
         data = json.load(f)
         return LabelConfig.model_validate(data)
@@ -23,6 +23,6 @@ def load_config() -> LabelConfig:
 def save_config(config: LabelConfig):
     """Saves label configuration to JSON."""
     config_path = Path(__file__).parent / "label_config.json"
-    logger.info(f"Saving label configuration to {config_path}")
+    logger.info("Saving label configuration to %s", config_path)
     with open(config_path, 'w') as f:
         json.dump(config.model_dump(), f, indent=2) 
\ No newline at end of file
@@ -1,10 +1,57 @@
+import atexit
+import itertools
 import logging
 import logging.config
+import logging.handlers
+import queue
+import threading
+from functools import lru_cache
+from typing import Optional
 from ..config.core import settings
 
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+    The stock handler also applies the formatter and renders tracebacks in
+    `prepare()` on the calling thread. Records only ever cross threads in this
+    process, so only the message args are merged here: the caller may mutate
+    them (e.g. a dict it logged) as soon as the logging call returns.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class LogSampler:
+    """Keeps one in every round(1 / rate) events; rate 1.0 keeps everything, 0 nothing."""
+
+    def __init__(self, rate: float):
+        self.every = 0 if rate <= 0 else max(1, round(1 / rate))
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def sample(self) -> bool:
+        if self.every == 0:
+            return False
+        with self._lock:
+            return next(self._counter) % self.every == 0
+
+
+@lru_cache(maxsize=1)
+def get_card_debug_sampler() -> LogSampler:
+    """Sampler for per-card parse debug logs; built on first use so importing needs no settings."""
+    return LogSampler(settings.LOG_CARD_DEBUG_SAMPLE_RATE)
+
+
 def setup_logging():
+    global _listener
     log_level = "DEBUG" if settings.DEV_MODE else "INFO"
-    
+
     # Base configuration
     config = {
         "version": 1,
@@ -27,7 +74,7 @@ def setup_logging():
             "handlers": ["console"]
         }
     }
-    
+
     # Add JSON formatter for non-dev environments
     if not settings.DEV_MODE:
         config["formatters"]["json"] = {
@@ -36,4 +83,27 @@ def setup_logging():
         }
         config["handlers"]["console"]["formatter"] = "json"
 
-    logging.config.dictConfig(config) 
\ No newline at end of file
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    logging.config.dictConfig(config)
+
+    if settings.LOG_ASYNC:
+        # Request threads only enqueue records; a background thread formats and writes them
+        root = logging.getLogger()
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+        root.handlers = [DeferredQueueHandler(log_queue)]
+        _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -3,5 +3,6 @@ Models package for K2BRD
 Contains Pydantic models for data validation and serialization
 """
 from .card import TrelloCard
+from .repository import GitHubRepository
 
-__all__ = ['TrelloCard']
+__all__ = ['TrelloCard', 'GitHubRepository']
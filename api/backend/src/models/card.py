@@ -1,18 +1,43 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Set
 import logging
 import re
 from datetime import datetime
 from ..config.label_mapping import LabelConfig
+from ..config.logging_config import get_card_debug_sampler
+from ..utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Trello card fields each TrelloCard field is parsed from (see from_trello_json)
+TRELLO_SOURCE_FIELDS: Dict[str, Set[str]] = {
+    "id": set(),
+    "name": {"name"},
+    "description": {"desc"},
+    "raw_description": {"desc"},
+    "list_name": {"idList"},
+    "board_id": {"idBoard"},
+    "project": {"desc"},
+    "due_date": {"due", "desc"},
+    "effort": {"desc"},
+    "github_repo": {"desc"},
+    "impacted_assets": {"desc"},
+    "stakeholders": {"desc"},
+    "labels": {"labels"},
+    "type": {"labels"},
+    "priority": {"labels"},
+    "last_activity": {"dateLastActivity"},
+}
+# Needed to decide whether a card is listed at all (closed, list header cards)
+_LISTING_FIELDS = {"name", "closed", "idList"}
+
 class TrelloCard(BaseModel):
     id: str
     name: str
     description: str
     raw_description: Optional[str] = None
     list_name: Optional[str] = None
+    board_id: Optional[str] = None
     project: Optional[str] = None
     due_date: Optional[datetime] = None
     effort: Optional[str] = None
@@ -22,14 +47,43 @@ class TrelloCard(BaseModel):
     labels: List[str] = Field(default_factory=list)
     type: Optional[str] = None
     priority: Optional[str] = None
+    last_activity: Optional[datetime] = None
+
+    @classmethod
+    def parse_fields(cls, fields: Optional[str]) -> Optional[Set[str]]:
+        """
+        Parse a comma-separated `fields` projection into TrelloCard field names
+        (always including "id"); None means every field. Raises ValueError for
+        unknown names.
+        """
+        if fields is None or not fields.strip():
+            return None
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = names - set(cls.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown card fields: {', '.join(sorted(unknown))}")
+        return names | {"id"}
+
+    @staticmethod
+    def trello_fields(fields: Optional[Iterable[str]]) -> str:
+        """The Trello `fields` parameter needed to populate `fields` (None: all)."""
+        if fields is None:
+            return "all"
+        needed = set(_LISTING_FIELDS)
+        for name in fields:
+            needed |= TRELLO_SOURCE_FIELDS[name]
+        return ",".join(sorted(needed))
 
     @classmethod
+    @traced("card.from_trello_json")
     def from_trello_json(cls, json_data: Dict[str, Any], list_name_override: Optional[str] = None) -> "TrelloCard":
         parsed_data = {
             "id": json_data["id"],
             "name": json_data["name"],
             "list_name": list_name_override or json_data.get("list", {}).get("name"),
+            "board_id": json_data.get("idBoard"),
             "due_date": json_data.get("due"),
+            "last_activity": json_data.get("dateLastActivity"),
             "labels": [label["name"] for label in json_data.get("labels", [])]
         }
         
@@ -45,8 +99,11 @@ class TrelloCard(BaseModel):
             metadata_part = full_description_text
             description_part = ""
 
-        logger.debug(f"--- PARSING CARD: {parsed_data['name']} ---")
-        logger.debug(f"METADATA PART:\n{metadata_part}")
+        # Per-card debug output is sampled so large boards do not flood the log
+        debug = logger.isEnabledFor(logging.DEBUG) and get_card_debug_sampler().sample()
+        if debug:
+            logger.debug("--- PARSING CARD: %s ---", parsed_data['name'])
+            logger.debug("METADATA PART:\n%s", metadata_part)
         
         parsed_data["description"] = description_part.strip()
 
@@ -70,7 +127,8 @@ class TrelloCard(BaseModel):
             if match:
                 key = match.group(1).strip().lower()
                 value = match.group(2).strip()
-                logger.debug(f"Found Key: '{key}', Value: '{value}'")
+                if debug:
+                    logger.debug("Found Key: '%s', Value: '%s'", key, value)
 
                 if 'project' in key and not parsed_data.get('project'):
                     parsed_data['project'] = value
@@ -89,8 +147,9 @@ class TrelloCard(BaseModel):
                 elif 'stakeholders' in key and not parsed_data.get('stakeholders'):
                     parsed_data['stakeholders'] = [sh.strip() for sh in value.split(',') if sh.strip()]
         
-        logger.debug(f"FINAL PARSED DATA for '{parsed_data['name']}': {parsed_data}")
-        logger.debug("--- END PARSING ---")
+        if debug:
+            logger.debug("FINAL PARSED DATA for '%s': %s", parsed_data['name'], parsed_data)
+            logger.debug("--- END PARSING ---")
 
         # Parse labels for type and priority
         for label in parsed_data["labels"]:
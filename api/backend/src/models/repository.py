@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+
+
+class GitHubRepository(BaseModel):
+    name_with_owner: str
+    url: str
+    description: Optional[str] = None
+    default_branch: Optional[str] = None
+    languages: List[str] = Field(default_factory=list)
+    open_issues: int = 0
+    stars: int = 0
+    archived: bool = False
+    pushed_at: Optional[datetime] = None
+
+    @classmethod
+    def from_graphql(cls, node: Dict[str, Any]) -> "GitHubRepository":
+        return cls(
+            name_with_owner=node["nameWithOwner"],
+            url=node["url"],
+            description=node.get("description"),
+            default_branch=(node.get("defaultBranchRef") or {}).get("name"),
+            languages=[language["name"] for language in (node.get("languages") or {}).get("nodes", [])],
+            open_issues=(node.get("issues") or {}).get("totalCount", 0),
+            stars=node.get("stargazerCount", 0),
+            archived=node.get("isArchived", False),
+            pushed_at=node.get("pushedAt"),
+        )
+
+    def to_context(self) -> Dict[str, Any]:
+        """
+        The subset of repository metadata worth giving the LLM. It is part of the
+        BRD cache key, so counters that move all the time (issues, stars) stay out.
+        """
+        context = {
+            "name": self.name_with_owner,
+            "description": self.description,
+            "default_branch": self.default_branch,
+            "languages": self.languages,
+            "archived": self.archived or None,
+        }
+        return {key: value for key, value in context.items() if value not in (None, "", [])}
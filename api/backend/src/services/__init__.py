@@ -3,7 +3,7 @@ Services package for K2BRD
 Contains business logic and external service integrations
 """
 from .trello_service import TrelloService
-# from .github_service import GitHubService
+from .github_service import GitHubService
 from .llm_service import LLMService
 
 __all__ = ['TrelloService', 'GitHubService', 'LLMService']
@@ -0,0 +1,140 @@
+import time
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..cache import CacheBackend, MemoryBackend, get_cache_backend
+from ..config.core import settings
+from ..models.card import TrelloCard
+
+logger = logging.getLogger(__name__)
+
+
+def _card_from(entry: Dict[str, Any]) -> TrelloCard:
+    # Shared backends hand back plain JSON; the memory backend keeps the models
+    card = entry["card"]
+    return card if isinstance(card, TrelloCard) else TrelloCard.model_validate(card)
+
+
+class BoardCache:
+    """
+    Cache of parsed board cards, kept in a CacheBackend so it can be shared
+    between worker processes.
+    Each board is an index entry (when it was fetched and which cards it held)
+    and each card is its own entry, so a push update rewrites one card instead
+    of the whole board and concurrent updates from other workers are not lost.
+    Entries are fresh for `ttl_seconds` and may then be served stale for a
+    further `stale_ttl_seconds` while a revalidation runs.
+    """
+
+    # Attempts at adding a card to a board index before giving up on the entry
+    INDEX_RETRIES = 3
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        stale_ttl_seconds: float = 0,
+        backend: Optional[CacheBackend] = None,
+        namespace: str = "boards"
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.backend = backend or MemoryBackend()
+        self._boards = self.backend.namespace(namespace, ttl_seconds=ttl_seconds + stale_ttl_seconds)
+        # Not under the boards prefix: Redis lists a namespace by key prefix, so
+        # "boards:acme-cards" would show up among the default cache's board_ids()
+        self._cards = self.backend.namespace(f"cards:{namespace}", ttl_seconds=ttl_seconds + stale_ttl_seconds)
+
+    def get_with_age(self, board_id: str) -> Optional[Tuple[List[TrelloCard], float]]:
+        """Return (cards, age in seconds) while the entry is fresh or still servable stale."""
+        index = self._boards.get(board_id)
+        if index is None:
+            return None
+        age = time.time() - index["stored_at"]
+        if age > self.ttl_seconds + self.stale_ttl_seconds:
+            return None
+        entries = self._cards.get_many(index["card_ids"])
+        if any(entry is None for entry in entries):
+            # A card entry was evicted: the board can no longer be served whole
+            return None
+        # Skip removed cards and cards that have since moved to another board
+        return [_card_from(entry) for entry in entries if entry["card"] is not None and entry["board_id"] == board_id], age
+
+    def get(self, board_id: str) -> Optional[List[TrelloCard]]:
+        """Return the cached cards for a board, or None if missing or expired."""
+        found = self.get_with_age(board_id)
+        if found is None or found[1] > self.ttl_seconds:
+            return None
+        return found[0]
+
+    def age(self, board_id: str) -> Optional[float]:
+        """Seconds since the board was last stored, or None if it is not cached."""
+        index = self._boards.peek(board_id)
+        return None if index is None else time.time() - index["stored_at"]
+
+    def board_ids(self) -> List[str]:
+        return self._boards.keys()
+
+    def put(self, board_id: str, cards: List[TrelloCard]) -> None:
+        # Cards first, so a reader never finds the new index without its cards
+        self._cards.set_many({card.id: {"board_id": board_id, "card": card} for card in cards})
+        self._boards.set(board_id, {"stored_at": time.time(), "card_ids": [card.id for card in cards]})
+
+    def invalidate(self, board_id: str) -> None:
+        self._boards.delete(board_id)
+
+    def release(self) -> None:
+        """Drop this cache's entries from a per-process backend (e.g. when its tenant goes idle)."""
+        self.backend.release(self._boards.name)
+        self.backend.release(self._cards.name)
+
+    def _add_to_index(self, board_id: str, card_id: str) -> bool:
+        """Add a card to a cached board's index. Returns False if the board is not cached."""
+        for _ in range(self.INDEX_RETRIES):
+            index = self._boards.peek(board_id)
+            if index is None:
+                return False
+            if card_id in index["card_ids"]:
+                return True
+            # Keep the original expiry: adding a card does not make the board freshly fetched
+            remaining = index["stored_at"] + self.ttl_seconds + self.stale_ttl_seconds - time.time()
+            updated = {"stored_at": index["stored_at"], "card_ids": [*index["card_ids"], card_id]}
+            if self._boards.compare_and_set(board_id, index, updated, ttl_seconds=remaining):
+                return True
+        # Still contended (or the write keeps failing): re-fetch the board rather than miss the card
+        logger.info("Could not add card %s to cached board %s; invalidating it", card_id, board_id)
+        self.invalidate(board_id)
+        return False
+
+    def upsert_card(self, card: TrelloCard) -> bool:
+        """
+        Patch a single card into the cache, adding it to its board if that board
+        is cached. A card moved away from another cached board stops being
+        served there. Returns True if a cached board changed.
+        """
+        previous = self._cards.peek(card.id)
+        board_id = card.board_id or (previous or {}).get("board_id")
+        if board_id is None or (previous is None and self._boards.peek(board_id) is None):
+            return False
+        # Write the card before indexing it, so the index never names a missing card
+        self._cards.set(card.id, {"board_id": board_id, "card": card})
+        added = self._add_to_index(board_id, card.id)
+        return added or previous is not None
+
+    def remove_card(self, card_id: str) -> bool:
+        """Stop serving a card from any cached board. Returns True if it was cached."""
+        previous = self._cards.peek(card_id)
+        if previous is None or previous["card"] is None:
+            return False
+        self._cards.set(card_id, {"board_id": previous["board_id"], "card": None})
+        return True
+
+
+@lru_cache(maxsize=1)
+def get_board_cache() -> BoardCache:
+    """Dependency injector for the process-wide BoardCache."""
+    return BoardCache(
+        ttl_seconds=settings.BOARD_CACHE_TTL,
+        stale_ttl_seconds=settings.BOARD_CACHE_STALE_TTL,
+        backend=get_cache_backend(),
+    )
@@ -0,0 +1,178 @@
+import math
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Any, Optional, Set
+
+from ..config.core import settings
+from ..utils.rate_limiter import TokenBucket
+from .board_cache import BoardCache, get_board_cache
+
+logger = logging.getLogger(__name__)
+
+# A full board refresh costs one call for lists and one for cards
+CALLS_PER_BOARD_REFRESH = 2
+
+
+class BoardRefresher:
+    """
+    Keeps hot boards warm in the BoardCache.
+    Board accesses are tracked as an exponentially decaying score; boards whose
+    score reaches `min_hits` are refreshed in the background once `refresh_ahead`
+    of their TTL has elapsed, so readers rarely wait on Trello. Stale entries
+    served to readers are revalidated on demand. All refreshes share a Trello
+    call budget and a bounded worker pool.
+    """
+
+    def __init__(
+        self,
+        refresh_fn: Callable[[str], Any],
+        board_cache: BoardCache,
+        interval: float = 15,
+        refresh_ahead: float = 0.8,
+        hot_window: float = 900,
+        min_hits: float = 2,
+        concurrency: int = 2,
+        calls_per_minute: int = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh_fn = refresh_fn
+        self.board_cache = board_cache
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.hot_window = hot_window
+        self.min_hits = min_hits
+        self.budget = TokenBucket(capacity=calls_per_minute, refill_per_second=calls_per_minute / 60, clock=clock)
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="board-refresh")
+        self._lock = threading.Lock()
+        self._scores: Dict[str, float] = {}
+        self._last_access: Dict[str, float] = {}
+        self._in_flight: Set[str] = set()
+        self._stats = {"refreshed": 0, "failed": 0, "skipped_budget": 0, "revalidations": 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Access tracking ---
+
+    def _decayed_score(self, board_id: str, now: float) -> float:
+        score = self._scores.get(board_id, 0.0)
+        elapsed = now - self._last_access.get(board_id, now)
+        return score * math.exp(-elapsed / self.hot_window)
+
+    def record_access(self, board_id: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._scores[board_id] = self._decayed_score(board_id, now) + 1
+            self._last_access[board_id] = now
+
+    def hot_boards(self) -> List[str]:
+        """Boards accessed often enough recently to be worth keeping warm, hottest first."""
+        now = self._clock()
+        with self._lock:
+            scores = {board_id: self._decayed_score(board_id, now) for board_id in self._scores}
+            # Forget boards nobody has looked at for a long time
+            for board_id, score in scores.items():
+                if score < 0.01:
+                    self._scores.pop(board_id, None)
+                    self._last_access.pop(board_id, None)
+        hot = [board_id for board_id, score in scores.items() if score >= self.min_hits]
+        return sorted(hot, key=lambda board_id: scores[board_id], reverse=True)
+
+    def due_boards(self) -> List[str]:
+        """Hot boards that are missing from the cache or past the refresh-ahead point."""
+        due = []
+        for board_id in self.hot_boards():
+            age = self.board_cache.age(board_id)
+            if age is None or age >= self.board_cache.ttl_seconds * self.refresh_ahead:
+                due.append(board_id)
+        return due
+
+    # --- Refreshing ---
+
+    def revalidate(self, board_id: str) -> bool:
+        """
+        Schedule a background refresh of a board unless one is already running
+        or the call budget is spent. Returns True if a refresh was scheduled.
+        """
+        with self._lock:
+            if board_id in self._in_flight:
+                return False
+            if not self.budget.try_acquire(CALLS_PER_BOARD_REFRESH):
+                self._stats["skipped_budget"] += 1
+                return False
+            self._in_flight.add(board_id)
+            self._stats["revalidations"] += 1
+        self._executor.submit(self._refresh, board_id)
+        return True
+
+    def _refresh(self, board_id: str) -> None:
+        try:
+            self.refresh_fn(board_id)
+            with self._lock:
+                self._stats["refreshed"] += 1
+            logger.debug("Background refresh completed for board %s", board_id)
+        except Exception as e:
+            with self._lock:
+                self._stats["failed"] += 1
+            logger.warning("Background refresh failed for board %s: %s", board_id, e)
+        finally:
+            with self._lock:
+                self._in_flight.discard(board_id)
+
+    def run_once(self) -> List[str]:
+        """Schedule refreshes for every due board. Returns the boards scheduled."""
+        return [board_id for board_id in self.due_boards() if self.revalidate(board_id)]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Board refresher loop error: %s", e, exc_info=True)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="board-refresher", daemon=True)
+        self._thread.start()
+        logger.info("Board refresher started")
+
+    def stop(self, wait: bool = False) -> None:
+        self._stop.set()
+        self._executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "in_flight": sorted(self._in_flight),
+                "tracked_boards": len(self._scores),
+                "budget_available": round(self.budget.available, 2),
+            }
+
+
+def _refresh_board(board_id: str) -> None:
+    # Imported here: the Trello service module itself depends on this one
+    from .trello_service import create_trello_service
+    create_trello_service().get_board_cards(board_id, force_refresh=True)
+
+
+@lru_cache(maxsize=1)
+def get_board_refresher() -> BoardRefresher:
+    """Dependency injector for the process-wide BoardRefresher (started on first use)."""
+    refresher = BoardRefresher(
+        refresh_fn=_refresh_board,
+        board_cache=get_board_cache(),
+        interval=settings.BOARD_REFRESH_INTERVAL,
+        refresh_ahead=settings.BOARD_REFRESH_AHEAD,
+        hot_window=settings.BOARD_REFRESH_HOT_WINDOW,
+        min_hits=settings.BOARD_REFRESH_MIN_HITS,
+        concurrency=settings.BOARD_REFRESH_CONCURRENCY,
+        calls_per_minute=settings.BOARD_REFRESH_CALLS_PER_MINUTE,
+    )
+    refresher.start()
+    return refresher
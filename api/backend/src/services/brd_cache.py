@@ -0,0 +1,138 @@
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from ..cache import CacheBackend, MemoryBackend, get_cache_backend
+from ..config.core import settings
+from .brd_sections import card_inputs, split_sections
+
+logger = logging.getLogger(__name__)
+
+
+class BRDCache:
+    """
+    LRU cache of generated BRD text, keyed by a hash of everything that went
+    into the LLM request (see LLMService.cache_key). A card edit changes the
+    key, so entries never need explicit invalidation; they age out after
+    `ttl_seconds` or when the cache is full. With a shared backend, a BRD
+    generated by one worker is served by all of them.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400,
+        backend: Optional[CacheBackend] = None,
+        namespace: str = "brd"
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend or MemoryBackend()
+        self._entries = self.backend.namespace(namespace, ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._entries.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        # A membership check is not a lookup: it must not skew hit rates or LRU order
+        return key in self._entries
+
+    def put(self, key: str, text: str) -> None:
+        self._entries.set(key, text)
+
+    def release(self) -> None:
+        self.backend.release(self._entries.name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "backend": self.backend.stats(),
+        }
+
+
+class BRDSectionStore:
+    """
+    The latest BRD of each card, split into its "## " sections, plus the
+    inputs it was generated from. When the card changes, comparing inputs
+    tells which sections need rewriting (see brd_sections.affected_sections).
+    Shares the BRD cache's backend, TTL and size limit.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400,
+        backend: Optional[CacheBackend] = None,
+        namespace: str = "brd_sections"
+    ):
+        self.backend = backend or MemoryBackend()
+        self._entries = self.backend.namespace(namespace, ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    def get(self, card_id: str) -> Optional[Dict[str, Any]]:
+        """{"key", "inputs", "preamble", "sections": [{"heading", "text"}]} for the card, if known."""
+        return self._entries.get(card_id)
+
+    def put(self, card_id: str, key: str, description: str, context: Dict[str, Any], brd_text: str) -> None:
+        preamble, sections = split_sections(brd_text)
+        self._entries.set(card_id, {
+            "key": key,
+            "inputs": card_inputs(description, context),
+            "preamble": preamble,
+            "sections": [
+                {"heading": heading, "text": block}
+                for heading, block in sections
+            ],
+        })
+
+    @staticmethod
+    def text(entry: Dict[str, Any], headings: Optional[List[str]] = None) -> str:
+        """Reassemble a stored BRD, or only the sections named in `headings`."""
+        blocks = [section["text"] for section in entry["sections"] if headings is None or section["heading"] in headings]
+        preamble = entry["preamble"] if headings is None else ""
+        return (preamble + "\n".join(blocks)).rstrip()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cards": len(self._entries)}
+
+    def release(self) -> None:
+        self.backend.release(self._entries.name)
+
+
+@lru_cache(maxsize=1)
+def get_brd_cache() -> BRDCache:
+    """Dependency injector for the process-wide BRDCache."""
+    return BRDCache(max_entries=settings.BRD_CACHE_MAX_ENTRIES, ttl_seconds=settings.BRD_CACHE_TTL, backend=get_cache_backend())
+
+
+@lru_cache(maxsize=1)
+def get_brd_section_store() -> BRDSectionStore:
+    """Dependency injector for the process-wide BRDSectionStore."""
+    return BRDSectionStore(max_entries=settings.BRD_CACHE_MAX_ENTRIES, ttl_seconds=settings.BRD_CACHE_TTL, backend=get_cache_backend())
+
+
+def create_brd_cache(tenant_id: str) -> BRDCache:
+    """
+    The result cache of a tenant other than the default, in its own
+    "brd:<tenant>" namespace: a BRD generated from one tenant's cards is
+    never served to another.
+    """
+    return BRDCache(
+        max_entries=settings.BRD_CACHE_MAX_ENTRIES, ttl_seconds=settings.BRD_CACHE_TTL,
+        backend=get_cache_backend(), namespace=f"brd:{tenant_id}"
+    )
+
+
+def create_brd_section_store(tenant_id: str) -> BRDSectionStore:
+    """The section store of a tenant other than the default (see create_brd_cache)."""
+    return BRDSectionStore(
+        max_entries=settings.BRD_CACHE_MAX_ENTRIES, ttl_seconds=settings.BRD_CACHE_TTL,
+        backend=get_cache_backend(), namespace=f"brd_sections:{tenant_id}"
+    )
+
+
+def release_tenant_brds(tenant_id: str) -> None:
+    """Drop an idle tenant's BRDs from a per-process backend."""
+    create_brd_cache(tenant_id).release()
+    create_brd_section_store(tenant_id).release()
@@ -0,0 +1,258 @@
+import hashlib
+import random
+import re
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config.core import settings
+from ..utils.metrics import metrics
+from .tenants import DEFAULT_TENANT
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[int, ...]
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """Word `size`-grams of the lower-cased text (the whole text when it is shorter)."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def card_text(description: str, context: Dict[str, Any]) -> str:
+    """Flatten the LLM inputs of a card (see BRDService.build_llm_inputs) into one text."""
+    parts = [description or ""]
+    for key in sorted(context):
+        value = context[key]
+        if isinstance(value, dict):
+            value = " ".join(f"{k} {v}" for k, v in sorted(value.items()))
+        elif isinstance(value, list):
+            value = " ".join(map(str, value))
+        parts.append(f"{key} {value}")
+    return "\n".join(parts)
+
+
+class MinHasher:
+    """MinHash signatures: the fraction of equal positions estimates Jaccard similarity."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, items: set) -> Optional[Signature]:
+        if not items:
+            return None
+        # Stable across processes, unlike hash()
+        hashes = [int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big") for item in items]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures: signatures are cut into
+    `bands` and two items become candidates when any band matches exactly, so
+    a lookup only compares against likely matches. Holds at most `max_entries`
+    items, forgetting the oldest first.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, max_entries: Optional[int] = None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.max_entries = max_entries
+        self._buckets: List[Dict[Signature, set]] = [{} for _ in range(bands)]
+        self._items: "OrderedDict[str, Tuple[Signature, Any]]" = OrderedDict()
+
+    def _bands(self, signature: Signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, item_id: str, signature: Signature, value: Any) -> None:
+        if item_id in self._items:
+            self.remove(item_id)
+        self._items[item_id] = (signature, value)
+        for band, key in self._bands(signature):
+            self._buckets[band].setdefault(key, set()).add(item_id)
+        while self.max_entries is not None and len(self._items) > self.max_entries:
+            self.remove(next(iter(self._items)))
+
+    def remove(self, item_id: str) -> None:
+        entry = self._items.pop(item_id, None)
+        if entry is None:
+            return
+        for band, key in self._bands(entry[0]):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def query(self, signature: Signature, threshold: float) -> List[Tuple[str, Any, float]]:
+        """Items at or above `threshold` estimated similarity, most similar first."""
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates |= self._buckets[band].get(key, set())
+        matches = []
+        for item_id in candidates:
+            other, value = self._items[item_id]
+            score = similarity(signature, other)
+            if score >= threshold:
+                matches.append((item_id, value, score))
+        matches.sort(key=lambda match: -match[2])
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+@dataclass
+class DedupDecision:
+    """How to produce a near-duplicate card's BRD from another one."""
+    source_key: str  # BRD cache key of the source
+    source_card_id: str
+    similarity: float
+    reuse: bool  # Use the source BRD verbatim rather than adapting it
+    source_index: Optional[int] = None  # Position of the source in the batch; None for a past result
+
+
+class BRDDeduplicator:
+    """
+    Groups cards whose LLM inputs are near-identical (templated tasks, copies
+    across boards) so only one BRD per group is generated. The others reuse it
+    (identical inputs) or adapt it with a short follow-up prompt. Past results
+    are remembered by cache key, so a later batch can start from a BRD that is
+    still in the result cache. They are only matched within the tenant that
+    generated them.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        reuse_threshold: float = 1.0,
+        num_perm: int = 64,
+        bands: int = 16,
+        max_entries: int = 10000
+    ):
+        self.threshold = threshold
+        self.reuse_threshold = reuse_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self._hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self._past = NearDuplicateIndex(num_perm, bands, max_entries)
+        self._stats = {"batches": 0, "clusters": 0, "past_matches": 0, "reused": 0, "adapted": 0}
+
+    def signature(self, description: str, context: Dict[str, Any]) -> Optional[Signature]:
+        return self._hasher.signature(shingles(card_text(description, context)))
+
+    def _decision(self, key: str, match: Tuple[str, Any, float], source_index: Optional[int]) -> DedupDecision:
+        source_key, source_card_id, score = match
+        # An identical cache key means identical LLM inputs, whatever the estimate says
+        reuse = source_key == key or (self.reuse_threshold < 1 and score >= self.reuse_threshold)
+        return DedupDecision(source_key, source_card_id, score, reuse, source_index)
+
+    def plan(
+        self,
+        items: Sequence[Tuple[str, str, Optional[Signature]]],
+        is_available: Callable[[str], bool],
+        tenant_id: str = DEFAULT_TENANT
+    ) -> List[Optional[DedupDecision]]:
+        """
+        For each (cache key, card id, signature) decide whether the card can be
+        derived from a past result of `tenant_id` (whose key `is_available`) or
+        from an earlier card in the batch; None means generate it in full. A
+        card without a signature is always generated.
+        """
+        batch = NearDuplicateIndex(self.num_perm, self.bands)
+        decisions: List[Optional[DedupDecision]] = []
+        sources = set()
+        past_matches = 0
+        for index, (key, card_id, signature) in enumerate(items):
+            if signature is None:
+                decisions.append(None)
+                continue
+            with self._lock:
+                past = self._past.query(signature, self.threshold)
+            # The card's own earlier version is left to section-level regeneration
+            past = next((
+                (source_key, source_card_id, score)
+                for _, (tenant, source_key, source_card_id), score in past
+                if tenant == tenant_id and source_card_id != card_id and is_available(source_key)
+            ), None)
+            if past is not None:
+                decisions.append(self._decision(key, past, None))
+                sources.add(past[0])
+                past_matches += 1
+                continue
+            in_batch = batch.query(signature, self.threshold)
+            if in_batch:
+                source_key, (source_index, source_card_id), score = in_batch[0]
+                decisions.append(self._decision(key, (source_key, source_card_id, score), source_index))
+                sources.add(source_key)
+                continue
+            batch.add(key, signature, (index, card_id))
+            decisions.append(None)
+
+        derived = sum(1 for decision in decisions if decision is not None)
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["clusters"] += len(sources)
+            self._stats["past_matches"] += past_matches
+        if sources:
+            metrics.increment("brd_dedup_clusters_total", len(sources))
+            logger.info("Found %s near-duplicate group(s); %s of %s card(s) derive their BRD", len(sources), derived, len(items))
+        return decisions
+
+    def remember(self, key: str, card_id: str, signature: Optional[Signature], tenant_id: str = DEFAULT_TENANT) -> None:
+        """Index a BRD that is now in `tenant_id`'s result cache under `key`."""
+        if signature is None:
+            return
+        with self._lock:
+            self._past.add(f"{tenant_id}:{key}", signature, (tenant_id, key, card_id))
+
+    def record_derived(self, reused: bool) -> None:
+        mode = "reused" if reused else "adapted"
+        with self._lock:
+            self._stats[mode] += 1
+        metrics.increment("brd_dedup_derived_total", mode=mode)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            indexed = len(self._past)
+        return {
+            **stats,
+            "threshold": self.threshold,
+            "reuse_threshold": self.reuse_threshold,
+            "indexed": indexed,
+            # Reused BRDs cost no LLM call; adapted ones a short follow-up instead of a full generation
+            "llm_calls_saved": stats["reused"],
+            "full_generations_saved": stats["reused"] + stats["adapted"],
+        }
+
+
+@lru_cache(maxsize=1)
+def get_brd_deduplicator() -> BRDDeduplicator:
+    """Dependency injector for the process-wide BRDDeduplicator."""
+    return BRDDeduplicator(
+        threshold=settings.BRD_DEDUP_THRESHOLD,
+        reuse_threshold=settings.BRD_DEDUP_REUSE_THRESHOLD,
+        num_perm=settings.BRD_DEDUP_NUM_PERM,
+        bands=settings.BRD_DEDUP_BANDS,
+        max_entries=settings.BRD_DEDUP_MAX_ENTRIES,
+    )
@@ -0,0 +1,144 @@
+import threading
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config.core import settings
+from ..models.card import TrelloCard
+from ..utils.cancellation import CancellationToken, GenerationCancelledError
+from ..utils.metrics import metrics
+from .llm_scheduler import SPECULATIVE, LLMScheduler, get_llm_scheduler, priority_rank
+
+logger = logging.getLogger(__name__)
+
+
+class BRDPrefetcher:
+    """
+    Speculatively generates BRDs for cards people are likely to ask about next:
+    high-priority cards with recent activity on boards that were just fetched.
+    Jobs go to the scheduler's speculative class, so they only use an idle LLM
+    and are cancelled the moment real work arrives; a pre-empted card is
+    retried the next time its board is fetched. Results land in the BRD cache
+    through `generate_fn`, turning later interactive requests into cache hits.
+    """
+
+    def __init__(
+        self,
+        generate_fn: Callable[[TrelloCard, CancellationToken], Any],
+        is_cached_fn: Callable[[TrelloCard], bool],
+        scheduler: LLMScheduler,
+        priorities: List[str],
+        recent_hours: float = 72,
+        max_per_board: int = 10,
+        max_pending: int = 50,
+        prepare_fn: Optional[Callable[[List[TrelloCard]], None]] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.generate_fn = generate_fn
+        self.is_cached_fn = is_cached_fn
+        self.prepare_fn = prepare_fn
+        self.scheduler = scheduler
+        self.priorities = {priority.strip().lower() for priority in priorities if priority.strip()}
+        self.recent = timedelta(hours=recent_hours)
+        self.max_per_board = max_per_board
+        self.max_pending = max_pending
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending: Dict[str, CancellationToken] = {}
+        self._stats = {"queued": 0, "generated": 0, "preempted": 0, "failed": 0, "already_cached": 0}
+        # Cache checks may need network lookups, so they stay off the board-fetch path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="brd-prefetch")
+
+    def candidates(self, cards: List[TrelloCard]) -> List[TrelloCard]:
+        """Recently active cards with a pre-generation priority, most important and most recent first."""
+        cutoff = self._clock() - self.recent
+        selected = [
+            card for card in cards
+            if card.priority and card.priority.strip().lower() in self.priorities
+            and card.last_activity is not None and card.last_activity >= cutoff
+        ]
+        selected.sort(key=lambda card: (priority_rank(card.priority), -card.last_activity.timestamp()))
+        return selected[:self.max_per_board]
+
+    def observe_board(self, board_id: str, cards: List[TrelloCard]) -> Future:
+        """
+        Consider a freshly fetched board for speculative generation. Candidates
+        are queued in the background; the returned future resolves to the
+        number of cards queued.
+        """
+        return self._executor.submit(self._queue_candidates, board_id, self.candidates(cards))
+
+    def _queue_candidates(self, board_id: str, candidates: List[TrelloCard]) -> int:
+        if candidates and self.prepare_fn is not None:
+            self.prepare_fn(candidates)
+        queued = 0
+        for card in candidates:
+            with self._lock:
+                if card.id in self._pending or len(self._pending) >= self.max_pending:
+                    continue
+            if self.is_cached_fn(card):
+                with self._lock:
+                    self._stats["already_cached"] += 1
+                continue
+            token = CancellationToken()
+            with self._lock:
+                self._pending[card.id] = token
+                self._stats["queued"] += 1
+            future = self.scheduler.submit(
+                self.generate_fn, card, token,
+                priority=card.priority, request_class=SPECULATIVE, user="prefetch", cancel_token=token
+            )
+            future.add_done_callback(lambda done, card_id=card.id: self._finished(card_id, done))
+            queued += 1
+        if queued:
+            logger.debug("Queued %s speculative BRDs for board %s", queued, board_id)
+        return queued
+
+    def _finished(self, card_id: str, future: Future) -> None:
+        error = future.exception()
+        if error is None:
+            outcome = "generated"
+        elif isinstance(error, GenerationCancelledError):
+            outcome = "preempted"
+        else:
+            outcome = "failed"
+            logger.warning("Speculative BRD generation failed for card %s: %s", card_id, error)
+        with self._lock:
+            self._pending.pop(card_id, None)
+            self._stats[outcome] += 1
+        metrics.increment("brd_pregen_total", outcome=outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "pending": len(self._pending)}
+
+    def stop(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=1)
+def get_brd_prefetcher() -> Optional[BRDPrefetcher]:
+    """Process-wide BRDPrefetcher, or None when pre-generation or the BRD cache is off."""
+    if not (settings.PREGEN_ENABLED and settings.BRD_CACHE_ENABLED):
+        return None
+    # Imported here: the BRD service depends on the Trello service, which depends on this module
+    from .brd_cache import get_brd_cache
+    from .brd_service import BRDService
+    from .github_service import get_github_service
+    from .llm_service import LLMService
+    from .trello_service import TrelloService
+
+    github_service = get_github_service() if settings.GITHUB_ENRICH_ENABLED else None
+    brd_service = BRDService(TrelloService(), LLMService(), get_llm_scheduler(), get_brd_cache(), github_service)
+    return BRDPrefetcher(
+        generate_fn=brd_service.generate_card,
+        is_cached_fn=brd_service.is_cached,
+        prepare_fn=brd_service.prefetch_repositories,
+        scheduler=get_llm_scheduler(),
+        priorities=settings.PREGEN_PRIORITIES.split(","),
+        recent_hours=settings.PREGEN_RECENT_HOURS,
+        max_per_board=settings.PREGEN_MAX_PER_BOARD,
+        max_pending=settings.PREGEN_MAX_PENDING,
+    )
@@ -0,0 +1,84 @@
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
+
+# "## Heading" lines; deeper headings stay inside their section
+_H2 = re.compile(r"^##(?!#)[ \t]*(.+?)[ \t]*#*[ \t]*$", re.MULTILINE)
+
+# The card inputs (BRDService.build_llm_inputs context keys, plus "description")
+# each section of the brd.requirements prompt is written from
+SECTION_FIELDS: Dict[str, FrozenSet[str]] = {
+    "overview": frozenset({"description", "project", "type", "priority", "effort"}),
+    "requirements": frozenset({"description"}),
+    "technical requirements": frozenset({"description", "github_repo_url", "github_repo", "impacted_assets_list"}),
+    "success criteria": frozenset({"description"}),
+    "timeline": frozenset({"description", "effort"}),
+    "stakeholders": frozenset({"stakeholders"}),
+}
+# Sections the prompt does not name (e.g. open questions) follow the free text
+DEFAULT_SECTION_FIELDS = frozenset({"description"})
+
+
+def _normalise(heading: str) -> str:
+    return " ".join(heading.strip().strip("*").split()).lower()
+
+
+def split_sections(text: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Split a BRD into the text before its first H2 heading and a list of
+    (heading, block) pairs, where each block starts with its heading line.
+    """
+    matches = list(_H2.finditer(text))
+    if not matches:
+        return text, []
+    sections = []
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        sections.append((match.group(1).strip(), text[match.start():end].rstrip() + "\n"))
+    return text[:matches[0].start()], sections
+
+
+def merge_sections(base: str, updates: str) -> str:
+    """
+    Replace the sections of `base` that `updates` has a section for (headings
+    compared case-insensitively), keeping everything else and its order.
+    Sections `base` does not have are appended.
+    """
+    preamble, sections = split_sections(base)
+    _, replacements = split_sections(updates)
+    pending: Dict[str, str] = {_normalise(heading): block for heading, block in replacements}
+    merged = []
+    for heading, block in sections:
+        replacement = pending.pop(_normalise(heading), None)
+        if replacement is not None:
+            # Keep the original heading line, so the document's headings stay consistent
+            block = block.split("\n", 1)[0] + "\n" + replacement.split("\n", 1)[1]
+        merged.append(block)
+    merged.extend(pending.values())
+    return (preamble + "\n".join(merged)).rstrip()
+
+
+def incomplete_sections(text: str, headings: Iterable[str]) -> List[str]:
+    """The headings, in order, that `text` has no section for or only an empty one."""
+    _, sections = split_sections(text)
+    written = {_normalise(heading) for heading, block in sections if block.split("\n", 1)[1].strip()}
+    return [heading for heading in headings if _normalise(heading) not in written]
+
+
+def section_fields(heading: str) -> FrozenSet[str]:
+    """The card inputs a section is written from."""
+    return SECTION_FIELDS.get(_normalise(heading), DEFAULT_SECTION_FIELDS)
+
+
+def card_inputs(description: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    """One flat mapping of everything a BRD is generated from."""
+    return {"description": description, **context}
+
+
+def changed_fields(previous: Dict[str, Any], current: Dict[str, Any]) -> Set[str]:
+    """Input names whose value differs, including ones added or removed."""
+    return {name for name in previous.keys() | current.keys() if previous.get(name) != current.get(name)}
+
+
+def affected_sections(headings: Iterable[str], changed: Set[str]) -> List[str]:
+    """The headings, in order, of the sections that depend on any changed input."""
+    return [heading for heading in headings if section_fields(heading) & changed]
@@ -1,46 +1,459 @@
 from .trello_service import TrelloService, get_trello_service
+from .tenants import DEFAULT_TENANT
 from .llm_service import LLMService, get_llm_service
 from ..models.card import TrelloCard
-from typing import Dict, Any, List
+from .llm_scheduler import LLMScheduler, get_llm_scheduler
+from .brd_cache import (
+    BRDCache, BRDSectionStore, create_brd_cache, create_brd_section_store, get_brd_cache, get_brd_section_store
+)
+from .github_service import GitHubService, get_github_service
+from .brd_dedup import BRDDeduplicator, DedupDecision, get_brd_deduplicator
+from .brd_sections import affected_sections, card_inputs, changed_fields, merge_sections, section_fields
+from ..models.repository import GitHubRepository
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from concurrent.futures import Future, as_completed
 from fastapi import Depends
+import functools
+import logging
+from ..config.core import settings
 from ..utils.text_cleaner import clean_text
+from ..utils.cancellation import CancellationToken, GenerationCancelledError
+from ..utils.metrics import metrics
+from ..utils.tracing import span
+
+logger = logging.getLogger(__name__)
 
 class BRDService:
-    def __init__(self, trello_service: TrelloService, llm_service: LLMService):
+    def __init__(
+        self,
+        trello_service: TrelloService,
+        llm_service: LLMService,
+        scheduler: Optional[LLMScheduler] = None,
+        brd_cache: Optional[BRDCache] = None,
+        github_service: Optional[GitHubService] = None,
+        deduplicator: Optional[BRDDeduplicator] = None,
+        section_store: Optional[BRDSectionStore] = None,
+        tenant_id: str = DEFAULT_TENANT
+    ):
         self.trello_service = trello_service
         self.llm_service = llm_service
+        self.scheduler = scheduler
+        self.brd_cache = brd_cache
+        self.github_service = github_service
+        self.deduplicator = deduplicator
+        self.section_store = section_store
+        # Near-duplicate matching against past results stays within the tenant
+        self.tenant_id = tenant_id
 
-    def generate_brd_for_cards(self, cards: List[TrelloCard]) -> List[Dict[str, Any]]:
-        """Generate BRD for a list of cards."""
-        results = []
-        for card in cards:
-            # Clean all string-based inputs before sending to LLM
-            cleaned_description = clean_text(card.description)
-            
-            context = {
-                "project": clean_text(card.project),
-                "effort": clean_text(card.effort),
-                "stakeholders": [clean_text(s) for s in card.stakeholders if isinstance(s, str)],
-                "github_repo_url": clean_text(card.github_repo),
-                "impacted_assets_list": [clean_text(a) for a in card.impacted_assets if isinstance(a, str)],
-                "type": clean_text(card.type),
-                "priority": clean_text(card.priority),
+    @staticmethod
+    def build_llm_inputs(card: TrelloCard, repository: Optional[GitHubRepository] = None) -> Tuple[str, Dict[str, Any]]:
+        """Clean a card (and its repository's metadata, if known) into the (description, context) pair sent to the LLM."""
+        # Clean all string-based inputs before sending to LLM
+        cleaned_description = clean_text(card.description)
+        
+        context = {
+            "project": clean_text(card.project),
+            "effort": clean_text(card.effort),
+            "stakeholders": [clean_text(s) for s in card.stakeholders if isinstance(s, str)],
+            "github_repo_url": clean_text(card.github_repo),
+            "impacted_assets_list": [clean_text(a) for a in card.impacted_assets if isinstance(a, str)],
+            "type": clean_text(card.type),
+            "priority": clean_text(card.priority),
+        }
+        if repository is not None:
+            context["github_repo"] = {
+                key: clean_text(value) if isinstance(value, str) else value
+                for key, value in repository.to_context().items()
             }
-            
-            # Remove keys with None or empty values to keep the prompt clean
-            cleaned_context = {k: v for k, v in context.items() if v is not None and v != '' and v != []}
+        
+        # Remove keys with None or empty values to keep the prompt clean
+        cleaned_context = {k: v for k, v in context.items() if v is not None and v != '' and v != []}
+        return cleaned_description, cleaned_context
 
-            brd_text = self.llm_service.generate_brd(cleaned_description, cleaned_context)
-            
-            results.append({
+    def generate_card(self, card: TrelloCard, cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """Generate (or fetch from the result cache) the BRD for one card, in the calling thread."""
+        with span("brd.card", card_id=card.id):
+            cleaned_description, cleaned_context = self.build_llm_inputs(card, self._repository_for(card))
+            brd_text = self._generate_text(card, cleaned_description, cleaned_context, cancel_token)
+            self._remember(card, cleaned_description, cleaned_context)
+            return {
                 "card": card.model_dump(),
                 "brd": brd_text
-            })
+            }
+
+    def derive_card(
+        self,
+        card: TrelloCard,
+        base_brd: str,
+        decision: DedupDecision,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """
+        Produce a near-duplicate card's BRD from its group's BRD: verbatim when
+        the inputs are identical, otherwise by asking the LLM for just the
+        sections that differ and merging them in.
+        """
+        mode = "reused" if decision.reuse else "adapted"
+        with span("brd.derive", card_id=card.id, mode=mode):
+            description, context = self.build_llm_inputs(card, self._repository_for(card))
+            if decision.reuse:
+                brd_text = base_brd
+            else:
+                updates = self.llm_service.adapt_brd(base_brd, description, context, cancel_token=cancel_token)
+                brd_text = merge_sections(base_brd, updates)
+            if self.brd_cache is not None:
+                key = self.llm_service.cache_key(description, context)
+                self.brd_cache.put(key, brd_text)
+                self._record_sections(card, key, description, context, brd_text)
+            self._remember(card, description, context)
+            self.deduplicator.record_derived(decision.reuse)
+            return {
+                "card": card.model_dump(),
+                "brd": brd_text,
+                "derived_from": {
+                    "card_id": decision.source_card_id,
+                    "similarity": round(decision.similarity, 3),
+                    "mode": mode,
+                },
+            }
+
+    def _generate_follower(
+        self,
+        card: TrelloCard,
+        decision: DedupDecision,
+        base_brd: Optional[str],
+        cancel_token: Optional[CancellationToken]
+    ) -> Dict[str, Any]:
+        """Derive a card from its group's BRD, or generate it in full if that BRD is unavailable."""
+        if base_brd is None and decision.source_index is None and self.brd_cache is not None:
+            base_brd = self.brd_cache.get(decision.source_key)
+        if base_brd is None:
+            return self.generate_card(card, cancel_token)
+        try:
+            return self.derive_card(card, base_brd, decision, cancel_token)
+        except GenerationCancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Adapting the BRD of card %s for card %s failed, generating it in full: %s", decision.source_card_id, card.id, e)
+            return self.generate_card(card, cancel_token)
+
+    def _plan(self, cards: List[TrelloCard]) -> List[Optional[DedupDecision]]:
+        """Dedup decisions per card (None: generate it normally)."""
+        if self.deduplicator is None or self.brd_cache is None or len(cards) < 1:
+            return [None] * len(cards)
+        items = []
+        for card in cards:
+            description, context = self.build_llm_inputs(card, self._repository_for(card))
+            key = self.llm_service.cache_key(description, context)
+            # Cards already in the result cache are served from it as usual
+            signature = None if key in self.brd_cache else self.deduplicator.signature(description, context)
+            items.append((key, card.id, signature))
+        return self.deduplicator.plan(items, lambda key: key in self.brd_cache, self.tenant_id)
+
+    def _remember(self, card: TrelloCard, description: str, context: Dict[str, Any]) -> None:
+        if self.deduplicator is None or self.brd_cache is None:
+            return
+        key = self.llm_service.cache_key(description, context)
+        self.deduplicator.remember(key, card.id, self.deduplicator.signature(description, context), self.tenant_id)
+
+    def _submit_cards(
+        self,
+        cards: List[TrelloCard],
+        batch_token: CancellationToken,
+        request_class: str,
+        user: str
+    ) -> List[Future]:
+        """
+        Queue the cards on the scheduler, returning one Future per card in input
+        order. A near-duplicate card is only queued once its group's BRD is done.
+        """
+        def submit(fn: Callable, card: TrelloCard, *args) -> Future:
+            return self.scheduler.submit(
+                fn, card, *args, priority=card.priority, request_class=request_class, user=user, cancel_token=batch_token
+            )
+
+        futures: List[Future] = []
+        for card, decision in zip(cards, self._plan(cards)):
+            if decision is None:
+                futures.append(submit(self.generate_card, card, batch_token))
+            elif decision.source_index is None:
+                futures.append(submit(self._generate_follower, card, decision, None, batch_token))
+            else:
+                follower: Future = Future()
+                futures[decision.source_index].add_done_callback(
+                    functools.partial(self._on_source_done, card, decision, follower, submit, batch_token)
+                )
+                futures.append(follower)
+        return futures
+
+    def _on_source_done(
+        self,
+        card: TrelloCard,
+        decision: DedupDecision,
+        follower: Future,
+        submit: Callable[..., Future],
+        batch_token: CancellationToken,
+        source: Future
+    ) -> None:
+        error = source.exception()
+        if isinstance(error, GenerationCancelledError):
+            follower.set_exception(error)
+            return
+        # A failed source leaves the follower to be generated in full
+        base_brd = None if error is not None else source.result()["brd"]
+        try:
+            if decision.reuse and base_brd is not None:
+                # No LLM call, so not worth a trip through the queue
+                follower.set_result(self._generate_follower(card, decision, base_brd, batch_token))
+                return
+            job = submit(self._generate_follower, card, decision, base_brd, batch_token)
+        except BaseException as e:
+            follower.set_exception(e)
+            return
+        job.add_done_callback(
+            lambda done: follower.set_exception(done.exception()) if done.exception() is not None
+            else follower.set_result(done.result())
+        )
+
+    def prefetch_repositories(self, cards: List[TrelloCard]) -> None:
+        """Resolve every card's repository in one batched lookup, so per-card lookups hit the cache."""
+        if self.github_service is None:
+            return
+        urls = [card.github_repo for card in cards if card.github_repo]
+        if not urls:
+            return
+        try:
+            self.github_service.get_repositories(urls)
+        except Exception as e:
+            # Enrichment is best effort: BRDs are still generated without it
+            logger.warning("GitHub repository lookup failed: %s", e)
+
+    def _repository_for(self, card: TrelloCard) -> Optional[GitHubRepository]:
+        if self.github_service is None or not card.github_repo:
+            return None
+        try:
+            return self.github_service.get_repository(card.github_repo)
+        except Exception as e:
+            logger.warning("GitHub repository lookup failed for card %s: %s", card.id, e)
+            # The metadata is part of the BRD cache key: keep using what we had rather than dropping it
+            return self.github_service.cached_repository(card.github_repo)
+
+    def _generate_text(
+        self,
+        card: TrelloCard,
+        description: str,
+        context: Dict[str, Any],
+        cancel_token: Optional[CancellationToken]
+    ) -> str:
+        if self.brd_cache is None:
+            return self.llm_service.generate_brd(description, context, cancel_token=cancel_token)
+        key = self.llm_service.cache_key(description, context)
+        cached = self.brd_cache.get(key)
+        if cached is not None:
+            metrics.increment("brd_cache_requests_total", result="hit")
+            return cached
+        metrics.increment("brd_cache_requests_total", result="miss")
+        brd_text = self._regenerate_sections(card, description, context, cancel_token)
+        if brd_text is None:
+            brd_text = self.llm_service.generate_brd(description, context, cancel_token=cancel_token)
+        self.brd_cache.put(key, brd_text)
+        self._record_sections(card, key, description, context, brd_text)
+        return brd_text
+
+    def _regenerate_sections(
+        self,
+        card: TrelloCard,
+        description: str,
+        context: Dict[str, Any],
+        cancel_token: Optional[CancellationToken]
+    ) -> Optional[str]:
+        """
+        Update the card's previous BRD by rewriting only the sections that
+        depend on the inputs that changed. Returns None when a full generation
+        is needed: no previous BRD, every section affected, or the change is
+        outside the card (e.g. a new prompt).
+        """
+        if self.section_store is None:
+            return None
+        previous = self.section_store.get(card.id)
+        if previous is None or not previous["sections"]:
+            return None
+        changed = changed_fields(previous["inputs"], card_inputs(description, context))
+        stale = affected_sections([section["heading"] for section in previous["sections"]], changed)
+        if not changed or len(stale) == len(previous["sections"]):
+            metrics.increment("brd_incremental_updates_total", mode="full")
+            return None
+        if not stale:
+            metrics.increment("brd_incremental_updates_total", mode="unchanged")
+            return BRDSectionStore.text(previous)
+
+        # Send only what the stale sections are written from
+        fields = set().union(*(section_fields(heading) for heading in stale))
+        try:
+            with span("brd.sections", card_id=card.id, sections=len(stale)):
+                updates = self.llm_service.regenerate_sections(
+                    BRDSectionStore.text(previous, stale),
+                    stale,
+                    description if "description" in fields else None,
+                    {name: value for name, value in context.items() if name in fields},
+                    cancel_token=cancel_token,
+                )
+        except GenerationCancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Rewriting sections %s of card %s failed, generating it in full: %s", stale, card.id, e)
+            return None
+        metrics.increment("brd_incremental_updates_total", mode="partial")
+        metrics.increment("brd_sections_regenerated_total", len(stale))
+        logger.info("Card %s changed %s; rewrote %s of %s sections", card.id, sorted(changed), len(stale), len(previous["sections"]))
+        return merge_sections(BRDSectionStore.text(previous), updates)
+
+    def _record_sections(self, card: TrelloCard, key: str, description: str, context: Dict[str, Any], brd_text: str) -> None:
+        if self.section_store is not None:
+            self.section_store.put(card.id, key, description, context, brd_text)
+
+    def is_cached(self, card: TrelloCard) -> bool:
+        """Whether a BRD for the card's current content is already in the result cache."""
+        if self.brd_cache is None:
+            return False
+        return self.llm_service.cache_key(*self.build_llm_inputs(card, self._repository_for(card))) in self.brd_cache
+
+    def generate_brd_for_cards(
+        self,
+        cards: List[TrelloCard],
+        cancel_token: Optional[CancellationToken] = None,
+        user: str = "anonymous",
+        request_class: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate BRD for a list of cards.
+        With a scheduler, cards are queued by priority and request class and
+        may run concurrently; results keep the input order either way.
+        If `cancel_token` fires, the in-flight generation is aborted and the
+        remaining cards are skipped.
+        """
+        self.prefetch_repositories(cards)
+        if self.scheduler is None:
+            return self._generate_serially(cards, cancel_token)
+
+        if request_class is None:
+            request_class = "interactive" if len(cards) <= settings.LLM_INTERACTIVE_MAX_CARDS else "bulk"
+
+        # A private token lets us drop the rest of the batch if one card fails
+        batch_token = CancellationToken()
+        unlink = cancel_token.register(lambda: batch_token.cancel(cancel_token.reason)) if cancel_token else lambda: None
+
+        futures = self._submit_cards(cards, batch_token, request_class, user)
+        results = []
+        try:
+            for future in futures:
+                results.append(future.result())
+        except GenerationCancelledError:
+            self._record_cancelled(len(cards) - len(results), batch_token)
+            raise
+        except Exception:
+            batch_token.cancel("batch failed")
+            raise
+        finally:
+            unlink()
+        return results
+
+    def generate_brd_as_completed(
+        self,
+        cards: List[TrelloCard],
+        cancel_token: Optional[CancellationToken] = None,
+        user: str = "anonymous",
+        request_class: str = "bulk"
+    ) -> Iterator[Tuple[TrelloCard, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Generate BRDs for `cards`, yielding (card, result, error) as each card
+        finishes. Unlike generate_brd_for_cards a failed card does not abort the
+        rest, which suits long unattended runs. Cancellation stops the batch.
+        """
+        self.prefetch_repositories(cards)
+        if self.scheduler is None:
+            results: List[Optional[Dict[str, Any]]] = []
+            for card, decision in zip(cards, self._plan(cards)):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                try:
+                    results.append(self._generate_one(card, decision, results, cancel_token))
+                    yield card, results[-1], None
+                except GenerationCancelledError:
+                    raise
+                except Exception as e:
+                    results.append(None)
+                    yield card, None, e
+            return
+
+        batch_token = CancellationToken()
+        unlink = cancel_token.register(lambda: batch_token.cancel(cancel_token.reason)) if cancel_token else lambda: None
+        futures = dict(zip(self._submit_cards(cards, batch_token, request_class, user), cards))
+        try:
+            for future in as_completed(futures):
+                error = future.exception()
+                if isinstance(error, GenerationCancelledError):
+                    raise error
+                yield futures[future], None if error else future.result(), error
+        finally:
+            # Also reached when the caller stops iterating early
+            batch_token.cancel("batch closed")
+            unlink()
+
+    def _generate_serially(self, cards: List[TrelloCard], cancel_token: Optional[CancellationToken]) -> List[Dict[str, Any]]:
+        results = []
+        for index, (card, decision) in enumerate(zip(cards, self._plan(cards))):
+            if cancel_token is not None and cancel_token.cancelled:
+                self._record_cancelled(len(cards) - index, cancel_token)
+                raise GenerationCancelledError(cancel_token.reason or "cancelled")
+            try:
+                results.append(self._generate_one(card, decision, results, cancel_token))
+            except GenerationCancelledError:
+                self._record_cancelled(len(cards) - index, cancel_token)
+                raise
         return results
 
+    def _generate_one(
+        self,
+        card: TrelloCard,
+        decision: Optional[DedupDecision],
+        results: List[Optional[Dict[str, Any]]],
+        cancel_token: Optional[CancellationToken]
+    ) -> Dict[str, Any]:
+        """Serial counterpart of _submit_cards: `results` holds the earlier cards' results (None if failed)."""
+        if decision is None:
+            return self.generate_card(card, cancel_token)
+        base_brd = None
+        if decision.source_index is not None and results[decision.source_index] is not None:
+            base_brd = results[decision.source_index]["brd"]
+        return self._generate_follower(card, decision, base_brd, cancel_token)
+
+    @staticmethod
+    def _record_cancelled(remaining: int, cancel_token: Optional[CancellationToken]) -> None:
+        reason = cancel_token.reason if cancel_token is not None else "cancelled"
+        metrics.increment("brd_cards_cancelled_total", remaining)
+        logger.info("BRD generation cancelled (%s); %s card(s) not generated", reason, remaining)
+
 def get_brd_service(
     trello_service: TrelloService = Depends(get_trello_service),
-    llm_service: LLMService = Depends(get_llm_service)
+    llm_service: LLMService = Depends(get_llm_service),
+    scheduler: LLMScheduler = Depends(get_llm_scheduler)
 ) -> BRDService:
-    """Dependency injector for BRDService."""
-    return BRDService(trello_service, llm_service) 
\ No newline at end of file
+    """
+    Dependency injector for BRDService, scoped to the calling tenant: other
+    tenants get their own result cache and section store, and no GitHub
+    enrichment, since GITHUB_TOKEN belongs to the default account.
+    """
+    tenant = trello_service.tenant
+    brd_cache = None
+    if settings.BRD_CACHE_ENABLED:
+        brd_cache = get_brd_cache() if tenant.is_default else create_brd_cache(tenant.tenant_id)
+    github_service = get_github_service() if settings.GITHUB_ENRICH_ENABLED and tenant.is_default else None
+    # Derived BRDs are found again through the result cache, so dedup needs it
+    deduplicator = get_brd_deduplicator() if settings.BRD_DEDUP_ENABLED and brd_cache is not None else None
+    section_store = None
+    if settings.BRD_INCREMENTAL_ENABLED and brd_cache is not None:
+        section_store = get_brd_section_store() if tenant.is_default else create_brd_section_store(tenant.tenant_id)
+    return BRDService(
+        trello_service, llm_service, scheduler, brd_cache, github_service, deduplicator, section_store, tenant.tenant_id
+    )
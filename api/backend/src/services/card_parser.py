@@ -0,0 +1,82 @@
+import os
+import threading
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..config.core import settings
+from ..models.card import TrelloCard
+from ..utils.tracing import span
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# (raw Trello card JSON, resolved list name)
+RawCard = Tuple[Dict[str, Any], Optional[str]]
+
+_pool: Optional["ProcessPoolExecutor"] = None
+_pool_lock = threading.Lock()
+
+
+def _parse_chunk(chunk: List[RawCard]) -> List[TrelloCard]:
+    """Worker entry point: parse one shard of raw cards."""
+    return [TrelloCard.from_trello_json(card_data, list_name) for card_data, list_name in chunk]
+
+
+def _worker_count() -> int:
+    return settings.PARSE_POOL_WORKERS or max(1, (os.cpu_count() or 1) - 1)
+
+
+def get_parse_pool() -> "ProcessPoolExecutor":
+    """
+    The persistent worker pool, created on first use.
+    Workers are started with forkserver/spawn rather than fork: the server
+    process runs logging, refresher and scheduler threads that must not be
+    cloned mid-operation.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Imported here: most processes never start the pool
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=_worker_count(), mp_context=context)
+            logger.info("Started card parse pool with %s workers", _worker_count())
+        return _pool
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def parse_cards(raw_cards: List[RawCard], parallel: Optional[bool] = None) -> List[TrelloCard]:
+    """
+    Parse raw Trello cards into TrelloCard models, preserving input order.
+
+    At or above PARSE_POOL_THRESHOLD cards (or when `parallel` is True) the
+    work is sharded into PARSE_POOL_CHUNK_SIZE chunks across the process pool;
+    smaller batches stay on the calling thread where the IPC overhead would
+    outweigh the gain. Results are identical either way.
+    """
+    if parallel is None:
+        parallel = settings.PARSE_POOL_THRESHOLD > 0 and len(raw_cards) >= settings.PARSE_POOL_THRESHOLD
+    if not parallel or not raw_cards:
+        return _parse_chunk(raw_cards)
+
+    chunk_size = max(1, settings.PARSE_POOL_CHUNK_SIZE)
+    chunks = [raw_cards[i:i + chunk_size] for i in range(0, len(raw_cards), chunk_size)]
+    logger.debug("Parsing %s cards in %s chunks on the process pool", len(raw_cards), len(chunks))
+    try:
+        with span("card.parse_pool", cards=len(raw_cards), chunks=len(chunks)):
+            # Executor.map yields results in submission order, so output order is deterministic
+            return [card for parsed in get_parse_pool().map(_parse_chunk, chunks) for card in parsed]
+    except Exception as e:
+        logger.warning("Parallel card parsing failed, falling back to in-process parsing: %s", e)
+        return _parse_chunk(raw_cards)
@@ -0,0 +1,247 @@
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+
+from .. import PROJECT_ROOT
+from ..config.core import settings
+from ..models.card import TrelloCard
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    board_id TEXT,
+    name TEXT NOT NULL,
+    description TEXT,
+    list_name TEXT COLLATE NOCASE,
+    project TEXT COLLATE NOCASE,
+    priority TEXT COLLATE NOCASE,
+    type TEXT COLLATE NOCASE,
+    effort TEXT,
+    github_repo TEXT,
+    due_date TEXT,
+    stakeholders TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cards_board ON cards(board_id);
+CREATE INDEX IF NOT EXISTS idx_cards_project ON cards(project);
+CREATE INDEX IF NOT EXISTS idx_cards_priority ON cards(priority);
+CREATE INDEX IF NOT EXISTS idx_cards_type ON cards(type);
+CREATE INDEX IF NOT EXISTS idx_cards_list ON cards(list_name);
+CREATE INDEX IF NOT EXISTS idx_cards_due ON cards(due_date);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+    card_id UNINDEXED, name, description, project, stakeholders,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS board_sync (
+    board_id TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    card_count INTEGER NOT NULL
+);
+"""
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query: every term quoted, last term prefix-matched."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _utc_iso(value: Optional[datetime]) -> Optional[str]:
+    """Normalise datetimes to UTC ISO strings so they sort correctly as text."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+class CardStore:
+    """
+    Local SQLite mirror of Trello cards.
+    Parsed TrelloCard fields live in indexed columns for filtering, and an
+    FTS5 index covers name, description, project and stakeholders.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            if db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def _write_cards(self, cards: Iterable[TrelloCard], now: float, board_id: Optional[str] = None) -> int:
+        count = 0
+        for card in cards:
+            if card.board_id is None and board_id is not None:
+                card = card.model_copy(update={"board_id": board_id})
+            stakeholders = ", ".join(card.stakeholders)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO cards
+                    (id, board_id, name, description, list_name, project, priority, type,
+                     effort, github_repo, due_date, stakeholders, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    card.id, card.board_id, card.name, card.description, card.list_name,
+                    card.project, card.priority, card.type, card.effort, card.github_repo,
+                    _utc_iso(card.due_date),
+                    stakeholders, card.model_dump_json(), now,
+                ),
+            )
+            self._conn.execute("DELETE FROM cards_fts WHERE card_id = ?", (card.id,))
+            self._conn.execute(
+                "INSERT INTO cards_fts (card_id, name, description, project, stakeholders) VALUES (?, ?, ?, ?, ?)",
+                (card.id, card.name, card.description, card.project or "", stakeholders),
+            )
+            count += 1
+        return count
+
+    def replace_board_cards(self, board_id: str, cards: List[TrelloCard]) -> None:
+        """Mirror a full board snapshot, dropping cards that are no longer on it."""
+        now = time.time()
+        card_ids = {card.id for card in cards}
+        with self._lock, self._conn:
+            stale_ids = [
+                row["id"] for row in self._conn.execute("SELECT id FROM cards WHERE board_id = ?", (board_id,))
+                if row["id"] not in card_ids
+            ]
+            for card_id in stale_ids:
+                self._conn.execute("DELETE FROM cards WHERE id = ?", (card_id,))
+                self._conn.execute("DELETE FROM cards_fts WHERE card_id = ?", (card_id,))
+            self._write_cards(cards, now, board_id)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO board_sync (board_id, synced_at, card_count) VALUES (?, ?, ?)",
+                (board_id, now, len(cards)),
+            )
+        logger.info("Mirrored %s cards for board %s (%s removed)", len(cards), board_id, len(stale_ids))
+
+    def upsert_cards(self, cards: List[TrelloCard]) -> int:
+        """Insert or update individual cards without touching the rest of their board."""
+        with self._lock, self._conn:
+            return self._write_cards(cards, time.time())
+
+    def delete_card(self, card_id: str) -> bool:
+        """Remove a card from the mirror. Returns True if it was present."""
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM cards WHERE id = ?", (card_id,)).rowcount
+            self._conn.execute("DELETE FROM cards_fts WHERE card_id = ?", (card_id,))
+        return deleted > 0
+
+    def get_card(self, card_id: str) -> Optional[TrelloCard]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM cards WHERE id = ?", (card_id,)).fetchone()
+        return TrelloCard.model_validate_json(row["data"]) if row else None
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        board_id: Optional[str] = None,
+        project: Optional[str] = None,
+        priority: Optional[str] = None,
+        type: Optional[str] = None,
+        list_name: Optional[str] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Full-text search and filter over mirrored cards.
+        Results are ranked by FTS relevance when a query is given, otherwise by due date.
+        """
+        joins, where, params = "", [], []
+        fts = _fts_query(query or "")
+        if fts:
+            joins = "JOIN cards_fts ON cards_fts.card_id = cards.id"
+            where.append("cards_fts MATCH ?")
+            params.append(fts)
+        for column, value in (
+            ("board_id", board_id), ("project", project), ("priority", priority),
+            ("type", type), ("list_name", list_name),
+        ):
+            if value is not None:
+                where.append(f"cards.{column} = ?")
+                params.append(value)
+        if due_after is not None:
+            where.append("cards.due_date >= ?")
+            params.append(_utc_iso(due_after))
+        if due_before is not None:
+            where.append("cards.due_date <= ?")
+            params.append(_utc_iso(due_before))
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        order_sql = "ORDER BY bm25(cards_fts)" if fts else "ORDER BY cards.due_date IS NULL, cards.due_date, cards.name"
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM cards {joins} {where_sql}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT cards.data FROM cards {joins} {where_sql} {order_sql} LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+
+        return {
+            "total": total,
+            "results": [TrelloCard.model_validate_json(row["data"]) for row in rows],
+        }
+
+    def get_sync_status(self, board_id: Optional[str] = None) -> Dict[str, Any]:
+        """Report when each mirrored board was last synced so clients can judge freshness."""
+        now = time.time()
+        sql = "SELECT board_id, synced_at, card_count FROM board_sync"
+        params: List[Any] = []
+        if board_id is not None:
+            sql += " WHERE board_id = ?"
+            params.append(board_id)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY synced_at DESC", params).fetchall()
+            total_cards = self._conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+        boards = [
+            {
+                "board_id": row["board_id"],
+                "synced_at": _iso(row["synced_at"]),
+                "age_seconds": round(now - row["synced_at"], 3),
+                "card_count": row["card_count"],
+            }
+            for row in rows
+        ]
+        return {
+            "boards": boards,
+            "total_cards": total_cards,
+            "last_synced_at": boards[0]["synced_at"] if boards else None,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_card_store() -> CardStore:
+    """Dependency injector for the process-wide CardStore."""
+    db_path = settings.CARD_STORE_PATH
+    if db_path != ":memory:" and not Path(db_path).is_absolute():
+        db_path = str(PROJECT_ROOT / db_path)
+    return CardStore(db_path)
@@ -0,0 +1,282 @@
+import re
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from ..config.core import settings
+from ..models.repository import GitHubRepository
+from ..utils.metrics import metrics
+from ..utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+RepoKey = Tuple[str, str]  # (owner, name), lower-cased
+
+_REPO_URL = re.compile(r"https?://(?:www\.)?github\.com/([A-Za-z0-9_.-]+)/([A-Za-z0-9_.-]+)", re.IGNORECASE)
+
+_REPOSITORY_FIELDS = """
+fragment RepositoryFields on Repository {
+  nameWithOwner
+  url
+  description
+  defaultBranchRef { name }
+  languages(first: 5, orderBy: {field: SIZE, direction: DESC}) { nodes { name } }
+  issues(states: OPEN) { totalCount }
+  stargazerCount
+  isArchived
+  pushedAt
+}
+"""
+
+
+class GitHubServiceError(Exception):
+    pass
+
+
+def parse_repo_url(url: Optional[str]) -> Optional[RepoKey]:
+    """Extract (owner, name) from the first github.com repository URL in `url`."""
+    if not url:
+        return None
+    match = _REPO_URL.search(url)
+    if match is None:
+        return None
+    owner, name = match.group(1), match.group(2)
+    if name.endswith(".git"):
+        name = name[:-len(".git")]
+    return owner.lower(), name.lower()
+
+
+@dataclass
+class _CacheEntry:
+    repository: Optional[GitHubRepository]  # None: the repository does not exist or is not visible
+    fetched_at: float
+    etag: Optional[str] = None
+
+
+class GitHubService:
+    """
+    Resolves repository metadata for many cards at once.
+
+    Repositories shared by several cards are looked up once. Unknown
+    repositories are fetched together in aliased GraphQL queries of up to
+    `batch_size`. Cached entries older than `ttl_seconds` are revalidated with
+    a conditional REST request (If-None-Match); a 304 does not count against
+    the rate limit, and only repositories that actually changed are re-queried.
+
+    Failed lookups are cached too: the repositories involved are not asked
+    for again until `failure_cooldown` seconds have passed, so an outage or a
+    bad token costs one timeout rather than one per card.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        token: Optional[str],
+        ttl_seconds: float = 3600,
+        batch_size: int = 50,
+        timeout: float = 10,
+        failure_cooldown: float = 300,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.ttl_seconds = ttl_seconds
+        self.failure_cooldown = failure_cooldown
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "K2BRD",
+        })
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self._lock = threading.Lock()
+        self._cache: Dict[RepoKey, _CacheEntry] = {}
+
+    def get_repositories(self, urls: Iterable[Optional[str]]) -> Dict[str, Optional[GitHubRepository]]:
+        """
+        Map each GitHub repository URL in `urls` to its metadata (None if the
+        repository cannot be seen). URLs that are not GitHub repositories are
+        left out of the result.
+        """
+        keys_by_url = {url: parse_repo_url(url) for url in urls if url}
+        keys_by_url = {url: key for url, key in keys_by_url.items() if key is not None}
+        self._refresh(set(keys_by_url.values()))
+        with self._lock:
+            return {
+                url: self._cache[key].repository if key in self._cache else None
+                for url, key in keys_by_url.items()
+            }
+
+    def get_repository(self, url: str) -> Optional[GitHubRepository]:
+        return self.get_repositories([url]).get(url)
+
+    def cached_repository(self, url: str) -> Optional[GitHubRepository]:
+        """The last metadata fetched for `url`, however old, without calling GitHub (None if never fetched)."""
+        key = parse_repo_url(url)
+        with self._lock:
+            entry = self._cache.get(key) if key is not None else None
+            return entry.repository if entry is not None else None
+
+    # --- Cache maintenance ---
+
+    def _refresh(self, keys: Iterable[RepoKey]) -> None:
+        now = time.time()
+        missing: List[RepoKey] = []
+        stale: List[Tuple[RepoKey, Optional[str]]] = []
+        with self._lock:
+            for key in sorted(keys):
+                entry = self._cache.get(key)
+                if entry is None:
+                    missing.append(key)
+                elif now - entry.fetched_at > self.ttl_seconds:
+                    stale.append((key, entry.etag))
+        hits = len(set(keys)) - len(missing) - len(stale)
+        if hits:
+            metrics.increment("github_cache_requests_total", hits, result="hit")
+
+        changed = []
+        for key, etag in stale:
+            if self._revalidate(key, etag):
+                metrics.increment("github_cache_requests_total", result="revalidated")
+            else:
+                changed.append(key)
+        if missing:
+            metrics.increment("github_cache_requests_total", len(missing), result="miss")
+        to_fetch = missing + changed
+        for start in range(0, len(to_fetch), self.batch_size):
+            try:
+                self._fetch_batch(to_fetch[start:start + self.batch_size])
+            except GitHubServiceError:
+                # GitHub is down or rejecting us; the rest of the batches would fail the same way
+                self._back_off(to_fetch[start:])
+                raise
+
+    def _back_off(self, keys: Iterable[RepoKey]) -> None:
+        """Cache a failed lookup so the repositories are not retried until the cooldown ends."""
+        metrics.increment("github_lookup_failures_total")
+        # Stale again once the cooldown has passed; known repositories keep serving what we have
+        fetched_at = time.time() - self.ttl_seconds + self.failure_cooldown
+        with self._lock:
+            for key in keys:
+                entry = self._cache.get(key)
+                if entry is None:
+                    self._cache[key] = _CacheEntry(repository=None, fetched_at=fetched_at)
+                else:
+                    entry.fetched_at = fetched_at
+
+    def _revalidate(self, key: RepoKey, etag: Optional[str]) -> bool:
+        """
+        Conditionally GET the repository. Returns True if it is unchanged (304);
+        otherwise stores the new ETag and returns False so it is re-fetched.
+
+        Entries fetched over GraphQL have no ETag yet; their first revalidation
+        takes one from a plain GET and only re-fetches if the REST payload
+        disagrees with what is cached.
+        """
+        owner, name = key
+        headers = {"If-None-Match": etag} if etag else {}
+        try:
+            with span("github.revalidate", repo=f"{owner}/{name}"):
+                response = self.session.get(f"{self.api_url}/repos/{owner}/{name}", headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning("GitHub revalidation failed for %s/%s: %s", owner, name, e)
+            # Keep serving what we have rather than failing the BRD
+            self._back_off([key])
+            return True
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return False
+            if response.status_code == 304:
+                entry.fetched_at = time.time()
+                return True
+            if response.status_code == 404:
+                self._cache[key] = _CacheEntry(repository=None, fetched_at=time.time(), etag=response.headers.get("ETag"))
+                return True
+            primed = entry.etag is None and response.ok and _matches_rest(entry.repository, response)
+            entry.etag = response.headers.get("ETag")
+            if primed:
+                entry.fetched_at = time.time()
+                return True
+        return False
+
+    def _fetch_batch(self, keys: List[RepoKey]) -> None:
+        """Fetch a batch of repositories in one aliased GraphQL query and cache the results."""
+        variables = {}
+        selections = []
+        for index, (owner, name) in enumerate(keys):
+            variables[f"owner{index}"] = owner
+            variables[f"name{index}"] = name
+            selections.append(f"r{index}: repository(owner: $owner{index}, name: $name{index}) {{ ...RepositoryFields }}")
+        declarations = ", ".join(f"$owner{i}: String!, $name{i}: String!" for i in range(len(keys)))
+        query = f"query({declarations}) {{\n  " + "\n  ".join(selections) + "\n}\n" + _REPOSITORY_FIELDS
+
+        try:
+            with span("github.graphql", repos=len(keys)):
+                response = self.session.post(
+                    f"{self.api_url}/graphql", json={"query": query, "variables": variables}, timeout=self.timeout
+                )
+            response.raise_for_status()
+            body = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error("GitHub GraphQL batch of %s repositories failed: %s", len(keys), e)
+            raise GitHubServiceError(f"GitHub GraphQL request failed: {e}") from e
+        metrics.increment("github_graphql_requests_total")
+
+        data = body.get("data") or {}
+        for error in body.get("errors") or []:
+            # NOT_FOUND for a single alias still returns the rest of the batch
+            logger.debug("GitHub GraphQL error: %s", error.get("message"))
+        now = time.time()
+        with self._lock:
+            for index, key in enumerate(keys):
+                node = data.get(f"r{index}")
+                previous = self._cache.get(key)
+                self._cache[key] = _CacheEntry(
+                    repository=GitHubRepository.from_graphql(node) if node else None,
+                    fetched_at=now,
+                    etag=previous.etag if previous else None,
+                )
+
+    def cache_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "repositories": len(self._cache),
+                "with_etag": sum(1 for entry in self._cache.values() if entry.etag),
+            }
+
+
+def _matches_rest(repository: Optional[GitHubRepository], response: requests.Response) -> bool:
+    """True if a REST repository payload agrees with the cached GraphQL metadata."""
+    if repository is None:
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    pushed_at = repository.pushed_at.isoformat().replace("+00:00", "Z") if repository.pushed_at else None
+    return (
+        body.get("description") == repository.description
+        and body.get("default_branch") == repository.default_branch
+        and body.get("stargazers_count") == repository.stars
+        and body.get("archived", False) == repository.archived
+        and body.get("pushed_at") == pushed_at
+    )
+
+
+@lru_cache(maxsize=1)
+def get_github_service() -> GitHubService:
+    """Dependency injector for the process-wide GitHubService (its cache is shared)."""
+    return GitHubService(
+        api_url=settings.GITHUB_API_URL,
+        token=settings.GITHUB_TOKEN,
+        ttl_seconds=settings.GITHUB_CACHE_TTL,
+        batch_size=settings.GITHUB_BATCH_SIZE,
+        timeout=settings.GITHUB_TIMEOUT,
+        failure_cooldown=settings.GITHUB_FAILURE_COOLDOWN,
+    )
@@ -0,0 +1,277 @@
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config.core import settings
+from ..config.label_config import LabelConfig
+from ..utils.cancellation import CancellationToken, GenerationCancelledError
+from ..utils.metrics import metrics
+from ..utils.tracing import current_trace
+
+logger = logging.getLogger(__name__)
+
+# Lower rank is served first
+REQUEST_CLASSES = ["interactive", "bulk", "speculative"]
+# Speculative jobs only run on an otherwise idle scheduler and are pre-empted by any other work
+SPECULATIVE = "speculative"
+PRIORITY_LEVELS = LabelConfig.default_config().categories["priority"].values  # Critical, High, Medium, Low
+UNSET_PRIORITY = "None"
+
+
+def priority_rank(priority: Optional[str]) -> float:
+    """Rank a card priority label; unknown or missing priorities sit between Medium and Low."""
+    for rank, level in enumerate(PRIORITY_LEVELS):
+        if priority and priority.strip().lower() == level.lower():
+            return rank
+    return len(PRIORITY_LEVELS) - 1.5
+
+
+def priority_cost(priority: Optional[str]) -> float:
+    """Virtual time a job adds to its user's tag: each step down in priority doubles it."""
+    return 2 ** priority_rank(priority)
+
+
+def _priority_label(priority: Optional[str]) -> str:
+    for level in PRIORITY_LEVELS:
+        if priority and priority.strip().lower() == level.lower():
+            return level
+    return UNSET_PRIORITY
+
+
+@dataclass(order=True)
+class _Job:
+    sort_key: Tuple  # (priority rank, submission order) within the user's queue
+    fn: Callable = field(compare=False)
+    args: Tuple = field(compare=False)
+    kwargs: Dict[str, Any] = field(compare=False)
+    future: Future = field(compare=False)
+    user: str = field(compare=False)
+    priority: str = field(compare=False)
+    request_class: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    cancel_token: Optional[CancellationToken] = field(default=None, compare=False)
+    # The submitter's context, so request-scoped state (e.g. tracing) follows the job
+    context: contextvars.Context = field(default_factory=contextvars.copy_context, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+    unregister: Callable[[], None] = field(default=lambda: None, compare=False)
+
+
+class LLMScheduler:
+    """
+    Orders queued LLM generations by request class (interactive before bulk),
+    then per-user fair share, then card priority within each user's work.
+
+    Speculative jobs start only when nothing else is queued or running, and
+    are cancelled through their token as soon as other work is submitted.
+
+    Fair share uses start-time fair queuing over users: within a class the
+    user with the lowest tag runs their highest-priority job next, and their
+    tag advances by the job's priority_cost. A user with a huge batch, even of
+    Critical cards, is therefore interleaved with everyone else rather than
+    holding the queue until it drains; higher priorities just earn a larger
+    share. A user who was idle restarts at the current virtual time.
+    """
+
+    def __init__(self, max_concurrency: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.max_concurrency = max_concurrency
+        self._clock = clock
+        self._cond = threading.Condition()
+        # Class rank -> user -> that user's queued jobs, a heap by priority
+        self._queues: Dict[int, Dict[str, List[_Job]]] = {rank: {} for rank in range(len(REQUEST_CLASSES))}
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._user_tags: Dict[str, float] = {}
+        self._depth: Dict[Tuple[str, str], int] = {}
+        self._in_flight = 0
+        self._running: List[_Job] = []
+        self._stopped = False
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"llm-scheduler-{i}", daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        priority: Optional[str] = None,
+        request_class: str = "interactive",
+        user: str = "anonymous",
+        cancel_token: Optional[CancellationToken] = None,
+        **kwargs
+    ) -> Future:
+        """Queue `fn(*args, **kwargs)` and return a Future for its result."""
+        if request_class not in REQUEST_CLASSES:
+            raise ValueError(f"Unknown request class: {request_class}")
+        if request_class == SPECULATIVE and cancel_token is None:
+            raise ValueError("Speculative jobs need a cancel token so they can be pre-empted")
+        future: Future = Future()
+        preempted: List[_Job] = []
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("LLM scheduler is stopped")
+            if not self._has_queued(user):
+                # No credit for the time the user was away
+                self._user_tags[user] = max(self._user_tags.get(user, 0.0), self._virtual_time)
+            job = _Job(
+                sort_key=(priority_rank(priority), next(self._seq)),
+                fn=fn, args=args, kwargs=kwargs, future=future, user=user,
+                priority=_priority_label(priority), request_class=request_class,
+                enqueued_at=self._clock(), cancel_token=cancel_token,
+            )
+            heapq.heappush(self._queues[REQUEST_CLASSES.index(request_class)].setdefault(user, []), job)
+            self._adjust_depth(job, +1)
+            self._cond.notify()
+            if request_class != SPECULATIVE:
+                preempted = [running for running in self._running if running.request_class == SPECULATIVE]
+        if cancel_token is not None:
+            job.unregister = cancel_token.register(lambda: self._cancel(job, cancel_token))
+            if job.future.done():
+                # Finished before the callback could be recorded on the job
+                job.unregister()
+        for running in preempted:
+            metrics.increment("llm_jobs_preempted_total")
+            running.cancel_token.cancel("pre-empted")
+        return future
+
+    def idle(self) -> bool:
+        """True when nothing is queued or running."""
+        with self._cond:
+            return self._in_flight == 0 and not any(self._live(queue) for users in self._queues.values() for queue in users.values())
+
+    @staticmethod
+    def _live(queue: List[_Job]) -> bool:
+        """Drop cancelled jobs from the top of a user's queue; True if any job is left."""
+        while queue and queue[0].cancelled:
+            heapq.heappop(queue)
+        return bool(queue)
+
+    def _has_queued(self, user: str) -> bool:
+        return any(self._live(users[user]) for users in self._queues.values() if user in users)
+
+    def _pick(self) -> Optional[_Job]:
+        """Pop the next job to run, or None if nothing may start now."""
+        speculative_rank = REQUEST_CLASSES.index(SPECULATIVE)
+        for rank, users in self._queues.items():
+            waiting = [user for user, queue in users.items() if self._live(queue)]
+            if not waiting:
+                continue
+            if rank == speculative_rank and any(running.request_class != SPECULATIVE for running in self._running):
+                return None
+            user = min(waiting, key=lambda u: (self._user_tags.get(u, self._virtual_time), users[u][0].sort_key[1]))
+            job = heapq.heappop(users[user])
+            start_tag = self._user_tags.get(user, self._virtual_time)
+            self._virtual_time = max(self._virtual_time, start_tag)
+            self._user_tags[user] = start_tag + priority_cost(job.priority)
+            self._prune(users)
+            return job
+        return None
+
+    def _prune(self, users: Dict[str, List[_Job]]) -> None:
+        """Forget empty queues, and tags that no longer hold anyone back (idle users restart at virtual time)."""
+        for user in [user for user, queue in users.items() if not queue]:
+            del users[user]
+        for user in [user for user, tag in self._user_tags.items() if tag <= self._virtual_time]:
+            if not self._has_queued(user):
+                del self._user_tags[user]
+
+    def _adjust_depth(self, job: _Job, delta: int) -> None:
+        key = (job.request_class, job.priority)
+        self._depth[key] = self._depth.get(key, 0) + delta
+        metrics.set_gauge("llm_queue_depth", self._depth[key], request_class=job.request_class, priority=job.priority)
+
+    def _cancel(self, job: _Job, cancel_token: CancellationToken) -> None:
+        """Drop a job that has not started yet; running jobs watch the token themselves."""
+        with self._cond:
+            if job.cancelled or job.future.done() or job.future.running():
+                return
+            job.cancelled = True
+            self._adjust_depth(job, -1)
+        metrics.increment("llm_jobs_cancelled_total", priority=job.priority)
+        job.future.set_exception(GenerationCancelledError(cancel_token.reason or "cancelled"))
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._cond:
+            while True:
+                job = self._pick()
+                if job is not None:
+                    break
+                if self._stopped:
+                    return None
+                self._cond.wait()
+            self._adjust_depth(job, -1)
+            job.future.set_running_or_notify_cancel()
+            self._in_flight += 1
+            self._running.append(job)
+            return job
+
+    def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            wait = self._clock() - job.enqueued_at
+            metrics.observe("llm_queue_wait_seconds", wait, request_class=job.request_class, priority=job.priority)
+            trace = job.context.run(current_trace)
+            if trace is not None:
+                now = time.perf_counter()
+                trace.add_span("llm.queue_wait", now - wait, now, request_class=job.request_class, priority=job.priority)
+            try:
+                job.future.set_result(job.context.run(job.fn, *job.args, **job.kwargs))
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                job.unregister()
+                with self._cond:
+                    self._in_flight -= 1
+                    self._running.remove(job)
+                    if self._in_flight == 0 and not any(users for users in self._queues.values()):
+                        # End of a busy period: fair-share history no longer matters
+                        self._user_tags.clear()
+                        self._virtual_time = 0.0
+                    # Held-back speculative jobs may be runnable now
+                    self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth by class and priority plus wait-time summaries."""
+        with self._cond:
+            depth = {f"{cls}/{prio}": count for (cls, prio), count in self._depth.items() if count}
+            queued_by_user: Dict[str, int] = {}
+            for users in self._queues.values():
+                for user, queue in users.items():
+                    count = sum(1 for job in queue if not job.cancelled)
+                    if count:
+                        queued_by_user[user] = queued_by_user.get(user, 0) + count
+            in_flight = self._in_flight
+        waits = {
+            key: summary for key, summary in metrics.snapshot()["summaries"].items()
+            if key.startswith("llm_queue_wait_seconds")
+        }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": in_flight,
+            "queued": sum(depth.values()),
+            "depth": depth,
+            "queued_by_user": queued_by_user,
+            "wait_seconds": waits,
+        }
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+@lru_cache(maxsize=1)
+def get_llm_scheduler() -> LLMScheduler:
+    """Dependency injector for the process-wide LLMScheduler."""
+    return LLMScheduler(max_concurrency=settings.LLM_MAX_CONCURRENCY)
@@ -1,70 +1,382 @@
 import requests
 import json
+import hashlib
+import re
+import socket
+import time
 from pathlib import Path
-from typing import Dict, Any
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
 import logging
+from requests.adapters import HTTPAdapter
 
 from ..config.core import settings
+from ..utils.cancellation import CancellationToken, GenerationCancelledError
+from ..utils.metrics import metrics
+from ..utils.tracing import traced
+from .brd_sections import incomplete_sections, split_sections
+from .token_budget import TokenBudget, get_token_budget
 
 logger = logging.getLogger(__name__)
 
+class LLMTimeoutError(Exception):
+    pass
+
+class IncompleteRevisionError(Exception):
+    """A partial rewrite came back cut off or without usable sections; generate in full instead."""
+    pass
+
+class _Completion(NamedTuple):
+    content: str
+    completion_tokens: int
+    finish_reason: Optional[str]
+
+# The prompt asks for "## Stakeholders" last, followed only by the open questions; a further
+# complete H1/H2 heading line starts surplus text. Rules and bold text (***Note:***) do not.
+_FINAL_SECTION = re.compile(r"^## Stakeholders\b", re.IGNORECASE | re.MULTILINE)
+_SECTION_BREAK = re.compile(r"^#{1,2} (?![^\n]*question)[^\n]*\n", re.IGNORECASE | re.MULTILINE)
+
+def _truncate(text: str) -> str:
+    limit = settings.LOG_MAX_PAYLOAD_CHARS
+    return text if len(text) <= limit else f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+def _final_section_end(text: str, heading_end: int, search_from: int = 0) -> Optional[int]:
+    """
+    Offset of the first H1/H2 heading after the final section's heading (ending
+    at `heading_end`) that is not an open-questions section, i.e. where a
+    complete BRD ends, or None if the document is still open.
+    """
+    end = _SECTION_BREAK.search(text, max(heading_end, search_from))
+    return end.start() if end else None
+
+def _abort_response(response) -> None:
+    """Tear down the upstream connection so the inference server stops generating."""
+    try:
+        connection = getattr(response.raw, "connection", None)
+        sock = getattr(connection, "sock", None)
+        if sock is not None:
+            sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    response.close()
+
+@lru_cache(maxsize=1)
+def load_prompt_config() -> Dict[str, Any]:
+    """Load prompt configuration from JSON file (once per process)."""
+    config_path = Path(__file__).parent.parent / "config" / "prompt_config.json"
+    try:
+        with open(config_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except Exception as e:
+        logger.error("Error loading prompt configuration: %s", e, exc_info=True)
+        return {}
+
+@lru_cache(maxsize=1)
+def get_llm_session() -> requests.Session:
+    """Keep-alive connections to the LLM host, shared by every LLMService."""
+    session = requests.Session()
+    # Room for every scheduler worker plus availability checks
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.LLM_MAX_CONCURRENCY + 2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 class LLMService:
-    def __init__(self):
+    def __init__(self, token_budget: Optional[TokenBudget] = None, session: Optional[requests.Session] = None):
         self.host = settings.LLM_HOST
         self.model = settings.LLM_MODEL
         self.prompt_config = self.load_prompt_config()
+        if token_budget is None and settings.LLM_ADAPTIVE_MAX_TOKENS:
+            token_budget = get_token_budget()
+        self.token_budget = token_budget
+        self.session = session or get_llm_session()
 
     def load_prompt_config(self):
         """Load prompt configuration from JSON file."""
-        config_path = Path(__file__).parent.parent / "config" / "prompt_config.json"
+        return load_prompt_config()
+
+    def build_payload(self, task_description: str, context: Dict[str, Any] = None, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Build the chat completion request body for a BRD prompt."""
+        # Extract prompt settings from config
+        prompt_settings = self.prompt_config.get("brd", {}).get("requirements", {})
+        user_prompt = prompt_settings.get("user", "You are a business analyst expert at creating detailed BRDs.")
+        temperature = prompt_settings.get("temperature", 0.7)
+
+        # Format user message with context if available
+        user_message = f"{user_prompt}\n\nTask: {task_description}"
+        if context:
+            user_message = f"{user_prompt}\n\nContext: {json.dumps(context, indent=2)}\n\nTask: {task_description}"
+
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": user_message}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens or settings.MAX_TOKENS,
+            "stream": settings.LLM_STREAM
+        }
+
+    def cache_key(self, task_description: str, context: Dict[str, Any] = None) -> str:
+        """Hash of the model, prompt and inputs: equal keys mean equal LLM requests."""
+        payload = self.build_payload(task_description, context)
+        # Transport and budget settings do not change what the BRD should say
+        payload.pop("stream", None)
+        payload.pop("max_tokens", None)
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @traced("llm.generate_brd")
+    def generate_brd(
+        self,
+        task_description: str,
+        context: Dict[str, Any] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> str:
+        """
+        Generate a BRD from a task description using the local LLM.
+        The upstream call is streamed so it can be aborted mid-generation when
+        `cancel_token` fires, and connect, first-token and total timeouts apply.
+        max_tokens comes from the adaptive TokenBudget for the card's type and
+        effort; a completion cut off by it is retried with a larger budget.
+        """
+        with self._request(cancel_token) as started:
+            budget_key = TokenBudget.key(context)
+            max_tokens = self.token_budget.max_tokens(budget_key) if self.token_budget else settings.MAX_TOKENS
+            retries = 0
+            while True:
+                payload = self.build_payload(task_description, context, max_tokens)
+                completion = self._complete(payload, started, cancel_token)
+                if completion.finish_reason != "length":
+                    break
+                metrics.increment("llm_truncations_total")
+                retry_tokens = self.token_budget.retry_budget(max_tokens) if self.token_budget else None
+                if retry_tokens is None or retries >= settings.LLM_LENGTH_RETRIES:
+                    logger.warning("BRD truncated at max_tokens=%s; returning partial output", max_tokens)
+                    break
+                logger.info("BRD truncated at max_tokens=%s; retrying with %s", max_tokens, retry_tokens)
+                retries += 1
+                max_tokens = retry_tokens
+
+            if completion.completion_tokens:
+                metrics.observe("llm_completion_tokens", completion.completion_tokens)
+                if self.token_budget is not None and completion.finish_reason != "length":
+                    self.token_budget.record(budget_key, completion.completion_tokens)
+            return completion.content
+
+    @traced("llm.adapt_brd")
+    def adapt_brd(
+        self,
+        base_brd: str,
+        task_description: str,
+        context: Dict[str, Any] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> str:
+        """
+        Ask the LLM which sections of a near-duplicate card's BRD must change
+        for this card. Returns only the rewritten "## " sections (possibly
+        nothing), which is far shorter than a full generation. Raises
+        IncompleteRevisionError if the reply was cut off or has text that is
+        not a complete section, since merging it would lose content.
+        """
+        prompt = self._revision_prompt("adapt", "Rewrite only the sections of this BRD that no longer fit.\n\n{brd}", brd=base_brd)
+        updates = self._revise(prompt, task_description, context, settings.BRD_DEDUP_ADAPT_MAX_TOKENS, "adapt", cancel_token)
+        _, sections = split_sections(updates)
+        if updates.strip() and (not sections or incomplete_sections(updates, [heading for heading, _ in sections])):
+            metrics.increment("llm_revisions_rejected_total", kind="adapt", reason="incomplete")
+            raise IncompleteRevisionError("Adaptation reply has no complete sections")
+        return updates
+
+    @traced("llm.regenerate_sections")
+    def regenerate_sections(
+        self,
+        current_sections: str,
+        headings: List[str],
+        task_description: Optional[str],
+        context: Dict[str, Any] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> str:
+        """
+        Rewrite just the given "## " sections of a BRD from the card's current
+        inputs. `current_sections` holds their present text, and the caller
+        passes only the fields they depend on (`task_description` may be None),
+        so both prompt and completion are a fraction of a full generation.
+        Raises IncompleteRevisionError unless every heading comes back complete.
+        """
+        prompt = self._revision_prompt(
+            "sections", "Rewrite only these BRD sections: {sections}.\n\n{brd}",
+            sections=", ".join(f"## {heading}" for heading in headings), brd=current_sections,
+        )
+        max_tokens = settings.BRD_SECTION_MAX_TOKENS * len(headings)
+        updates = self._revise(prompt, task_description, context, max_tokens, "sections", cancel_token)
+        missing = incomplete_sections(updates, headings)
+        if missing:
+            metrics.increment("llm_revisions_rejected_total", kind="sections", reason="incomplete")
+            raise IncompleteRevisionError(f"Section rewrite is missing {missing}")
+        return updates
+
+    def _revision_prompt(self, name: str, default: str, **values: str) -> Tuple[str, float]:
+        prompt_settings = self.prompt_config.get("brd", {}).get(name, {})
+        user_prompt = prompt_settings.get("user", default)
+        # str.replace rather than format(): the prompts contain literal braces
+        for placeholder, value in values.items():
+            user_prompt = user_prompt.replace("{" + placeholder + "}", value)
+        return user_prompt, prompt_settings.get("temperature", 0.2)
+
+    def _revise(
+        self,
+        prompt: Tuple[str, float],
+        task_description: Optional[str],
+        context: Optional[Dict[str, Any]],
+        max_tokens: int,
+        kind: str,
+        cancel_token: Optional[CancellationToken]
+    ) -> str:
+        """
+        Run a follow-up request that returns only rewritten "## " sections.
+        Raises IncompleteRevisionError if the reply hit `max_tokens`.
+        """
+        user_prompt, temperature = prompt
+        user_message = f"{user_prompt}\n\nContext: {json.dumps(context or {}, indent=2)}"
+        if task_description is not None:
+            user_message += f"\n\nTask: {task_description}"
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": user_message}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": settings.LLM_STREAM
+        }
+        with self._request(cancel_token) as started:
+            completion = self._complete(payload, started, cancel_token)
+            if completion.completion_tokens:
+                metrics.observe("llm_completion_tokens", completion.completion_tokens, kind=kind)
+        if completion.finish_reason == "length":
+            metrics.increment("llm_revisions_rejected_total", kind=kind, reason="truncated")
+            raise IncompleteRevisionError(f"The {kind} reply was cut off at {max_tokens} tokens")
+        return completion.content
+
+    @contextmanager
+    def _request(self, cancel_token: Optional[CancellationToken]) -> Iterator[float]:
+        """Time one LLM request and turn its failures into our error types and metrics."""
+        started = time.monotonic()
         try:
-            with open(config_path, "r", encoding="utf-8") as file:
-                return json.load(file)
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            yield started
+            metrics.increment("llm_requests_total", outcome="ok")
+
+        except GenerationCancelledError:
+            metrics.increment("llm_requests_total", outcome="cancelled")
+            logger.info("BRD generation cancelled after %.1fs", time.monotonic() - started)
+            raise
+        except LLMTimeoutError as e:
+            metrics.increment("llm_requests_total", outcome="timeout")
+            logger.warning("BRD generation timed out: %s", e)
+            raise
+        except requests.exceptions.Timeout as e:
+            metrics.increment("llm_requests_total", outcome="timeout")
+            phase = "connect" if isinstance(e, requests.exceptions.ConnectTimeout) else "first token"
+            logger.warning("BRD generation timed out waiting for %s: %s", phase, e)
+            raise LLMTimeoutError(f"LLM timed out waiting for {phase}") from e
         except Exception as e:
-            logger.error(f"Error loading prompt configuration: {e}", exc_info=True)
-            return {}
+            if cancel_token is not None and cancel_token.cancelled:
+                # The connection was torn down underneath us by the cancellation
+                metrics.increment("llm_requests_total", outcome="cancelled")
+                raise GenerationCancelledError(cancel_token.reason or "cancelled") from e
+            metrics.increment("llm_requests_total", outcome="error")
+            logger.error("Error generating BRD: %s", e, exc_info=True)
+            raise Exception(f"Error generating BRD: {str(e)}")
+        finally:
+            metrics.observe("llm_request_seconds", time.monotonic() - started)
 
-    def generate_brd(self, task_description: str, context: Dict[str, Any] = None) -> str:
-        """Generate a BRD from a task description using the local LLM."""
+    def _complete(self, payload: Dict[str, Any], started: float, cancel_token: Optional[CancellationToken]) -> _Completion:
+        """Run one chat completion request."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sending payload to LLM: %s", _truncate(json.dumps(payload, indent=2)))
+
+        # Without streaming nothing arrives until generation ends, so the read
+        # timeout has to cover the whole generation.
+        read_timeout = settings.LLM_FIRST_TOKEN_TIMEOUT if settings.LLM_STREAM else settings.LLM_TOTAL_TIMEOUT
+        response = self.session.post(
+            f"{self.host}/v1/chat/completions",
+            json=payload,
+            stream=True,
+            timeout=(settings.LLM_CONNECT_TIMEOUT, read_timeout)
+        )
+        unregister = cancel_token.register(lambda: _abort_response(response)) if cancel_token else lambda: None
         try:
-            # Extract prompt settings from config
-            prompt_settings = self.prompt_config.get("brd", {}).get("requirements", {})
-            user_prompt = prompt_settings.get("user", "You are a business analyst expert at creating detailed BRDs.")
-            temperature = prompt_settings.get("temperature", 0.7)
-
-            # Format user message with context if available
-            user_message = f"{user_prompt}\n\nTask: {task_description}"
-            if context:
-                user_message = f"{user_prompt}\n\nContext: {json.dumps(context, indent=2)}\n\nTask: {task_description}"
-
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "user", "content": user_message}
-                ],
-                "temperature": temperature,
-                "max_tokens": settings.MAX_TOKENS
-            }
-
-            logger.debug("Sending payload to LLM: %s", json.dumps(payload, indent=2))
-
-            response = requests.post(f"{self.host}/v1/chat/completions", json=payload)
-            
-            logger.debug("LLM API Response: %s %s", response.status_code, response.text)
-            
             response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            content_type = response.headers.get("Content-Type")
+            if isinstance(content_type, str) and "text/event-stream" in content_type:
+                return self._read_stream(response, started, cancel_token)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("LLM API Response: %s %s", response.status_code, _truncate(response.text))
+            body = response.json()
+            choice = body["choices"][0]
+            content = choice["message"]["content"]
+            usage = body.get("usage") or {}
+            finish_reason = choice.get("finish_reason")
+            return _Completion(content, usage.get("completion_tokens") or 0, finish_reason)
+        finally:
+            unregister()
+            response.close()
 
-        except Exception as e:
-            logger.error(f"Error generating BRD: {e}", exc_info=True)
-            raise Exception(f"Error generating BRD: {str(e)}")
+    def _read_stream(self, response, started: float, cancel_token: Optional[CancellationToken]) -> _Completion:
+        """
+        Accumulate an OpenAI-style SSE completion stream, enforcing the total timeout.
+        With LLM_EARLY_STOP the connection is closed as soon as the final
+        section is complete, so the server stops generating surplus text.
+        """
+        deadline = started + settings.LLM_TOTAL_TIMEOUT
+        text = ""
+        deltas = 0
+        usage_tokens = 0
+        finish_reason = None
+        heading_end = None
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if time.monotonic() > deadline:
+                raise LLMTimeoutError(f"LLM exceeded total timeout of {settings.LLM_TOTAL_TIMEOUT}s")
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            usage_tokens = (chunk.get("usage") or {}).get("completion_tokens") or usage_tokens
+            if not chunk.get("choices"):
+                # e.g. the trailing usage-only chunk
+                continue
+            choice = chunk["choices"][0]
+            finish_reason = choice.get("finish_reason") or finish_reason
+            delta = choice.get("delta") or choice.get("message") or {}
+            if not delta.get("content"):
+                continue
+            deltas += 1
+            scanned = len(text)
+            text += delta["content"]
+            if settings.LLM_EARLY_STOP:
+                if heading_end is None:
+                    # Back up a little: the heading may have been split across deltas
+                    heading = _FINAL_SECTION.search(text, max(0, scanned - 32))
+                    heading_end = heading.end() if heading else None
+                if heading_end is not None:
+                    # A heading only counts once its line is complete, so rescan from the start of the open line
+                    cutoff = _final_section_end(text, heading_end, text.rfind("\n", 0, scanned) + 1)
+                    if cutoff is not None:
+                        metrics.increment("llm_early_stops_total")
+                        _abort_response(response)
+                        return _Completion(text[:cutoff].rstrip(), usage_tokens or deltas, "stop")
+        # Servers that do not report usage on streams send roughly one token per delta
+        return _Completion(text, usage_tokens or deltas, finish_reason)
 
-    
     def is_available(self) -> bool:
         """Check if the LLM service is available."""
         try:
             # More reliable check for LM Studio compatibility
-            response = requests.get(f"{self.host}/v1/models")
+            response = self.session.get(f"{self.host}/v1/models")
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
@@ -0,0 +1,260 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from fastapi import Header, HTTPException
+from requests.adapters import HTTPAdapter
+
+from .. import PROJECT_ROOT
+from ..cache import get_cache_backend
+from ..config.core import settings
+from ..utils.metrics import metrics
+from ..utils.rate_limiter import TokenBucket
+from .board_cache import BoardCache, get_board_cache
+from .brd_cache import release_tenant_brds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+
+
+class UnknownTenantError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class TrelloCredentials:
+    api_key: str
+    token: str
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable id for caller-supplied credentials that does not reveal the token."""
+        return hashlib.sha256(f"{self.api_key}:{self.token}".encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class TenantContext:
+    """Per-tenant Trello state: credentials, connection pool, call budget and board cache."""
+    tenant_id: str
+    credentials: TrelloCredentials
+    session: requests.Session
+    budget: TokenBucket
+    board_cache: BoardCache
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+    last_used: float = 0.0
+
+    @property
+    def is_default(self) -> bool:
+        return self.tenant_id == DEFAULT_TENANT
+
+    @property
+    def auth_params(self) -> Dict[str, str]:
+        return {"key": self.credentials.api_key, "token": self.credentials.token}
+
+    def touch(self) -> None:
+        """Mark the tenant as in use, so long runs on one service are not evicted."""
+        self.last_used = self.clock()
+
+
+def _load_tenants(path: Optional[str]) -> Tuple[Dict[str, TrelloCredentials], Dict[str, str]]:
+    """Each tenant's Trello credentials, and the secret its callers must present."""
+    if not path:
+        return {}, {}
+    file_path = Path(path) if Path(path).is_absolute() else PROJECT_ROOT / path
+    with open(file_path, "r", encoding="utf-8") as file:
+        entries = json.load(file)
+    missing = [tenant_id for tenant_id, entry in entries.items() if not entry.get("secret")]
+    if missing:
+        raise ValueError(f"Tenants without a secret in {path}: {', '.join(missing)}")
+    credentials = {tenant_id: TrelloCredentials(entry["api_key"], entry["token"]) for tenant_id, entry in entries.items()}
+    return credentials, {tenant_id: entry["secret"] for tenant_id, entry in entries.items()}
+
+
+class TenantRegistry:
+    """
+    Creates tenant contexts on first use and drops those idle for longer than
+    `idle_ttl_seconds`, closing their connection pools. The default tenant
+    (the TRELLO_API_KEY/TRELLO_TOKEN pair) is never evicted; it also owns the
+    shared board cache that the refresher and webhooks work on.
+
+    Every other tenant gets its own "boards:<tenant>" cache namespace, so boards
+    fetched with one tenant's credentials are never served to another.
+    Configured tenants are only selectable with their shared secret.
+    """
+
+    def __init__(
+        self,
+        default_credentials: TrelloCredentials,
+        tenants: Optional[Dict[str, TrelloCredentials]] = None,
+        secrets: Optional[Dict[str, str]] = None,
+        idle_ttl_seconds: float = 900,
+        pool_size: int = 10,
+        calls_per_10s: float = 100,
+        clock=time.monotonic,
+    ):
+        self.default_credentials = default_credentials
+        self.tenants = tenants or {}
+        self.secrets = secrets or {}
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.pool_size = pool_size
+        self.calls_per_10s = calls_per_10s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._contexts: Dict[str, TenantContext] = {}
+        self._last_sweep = clock()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _create(self, tenant_id: str, credentials: TrelloCredentials) -> TenantContext:
+        if tenant_id == DEFAULT_TENANT:
+            board_cache = get_board_cache()
+        else:
+            board_cache = BoardCache(
+                ttl_seconds=settings.BOARD_CACHE_TTL,
+                stale_ttl_seconds=settings.BOARD_CACHE_STALE_TTL,
+                backend=get_cache_backend(),
+                namespace=f"boards:{tenant_id}",
+            )
+        return TenantContext(
+            tenant_id=tenant_id,
+            credentials=credentials,
+            session=self._new_session(),
+            budget=TokenBucket(capacity=self.calls_per_10s, refill_per_second=self.calls_per_10s / 10, clock=self._clock),
+            board_cache=board_cache,
+            clock=self._clock,
+            last_used=self._clock(),
+        )
+
+    def _get(self, tenant_id: str, credentials: TrelloCredentials) -> TenantContext:
+        with self._lock:
+            context = self._contexts.get(tenant_id)
+            if context is None or context.credentials != credentials:
+                if context is not None:
+                    context.session.close()
+                context = self._contexts[tenant_id] = self._create(tenant_id, credentials)
+                metrics.set_gauge("trello_tenants_active", len(self._contexts))
+                logger.info("Created Trello tenant context %s", tenant_id)
+            context.last_used = self._clock()
+        self._maybe_evict()
+        return context
+
+    def default(self) -> TenantContext:
+        return self._get(DEFAULT_TENANT, self.default_credentials)
+
+    def for_tenant(self, tenant_id: str) -> TenantContext:
+        """Context for a tenant listed in TRELLO_TENANTS_FILE."""
+        if tenant_id == DEFAULT_TENANT:
+            return self.default()
+        credentials = self.tenants.get(tenant_id)
+        if credentials is None:
+            raise UnknownTenantError(f"Unknown tenant: {tenant_id}")
+        return self._get(tenant_id, credentials)
+
+    def authenticate(self, tenant_id: str, secret: Optional[str]) -> TenantContext:
+        """Context for a configured tenant, if `secret` is the one it was configured with."""
+        expected = self.secrets.get(tenant_id)
+        if expected is None or secret is None or not hmac.compare_digest(expected.encode("utf-8"), secret.encode("utf-8")):
+            raise UnknownTenantError(f"Unknown tenant or wrong secret: {tenant_id}")
+        return self.for_tenant(tenant_id)
+
+    def for_credentials(self, credentials: TrelloCredentials) -> TenantContext:
+        """Context for credentials supplied by the caller."""
+        if credentials == self.default_credentials:
+            return self.default()
+        return self._get(f"key-{credentials.fingerprint}", credentials)
+
+    def _maybe_evict(self) -> None:
+        # Sweeping is cheap but there is no point doing it on every request
+        if self._clock() - self._last_sweep >= self.idle_ttl_seconds / 4:
+            self.evict_idle()
+
+    def evict_idle(self) -> List[str]:
+        """Drop tenants unused for `idle_ttl_seconds`. Returns their ids."""
+        now = self._clock()
+        with self._lock:
+            self._last_sweep = now
+            idle = [
+                context for tenant_id, context in self._contexts.items()
+                if tenant_id != DEFAULT_TENANT and now - context.last_used >= self.idle_ttl_seconds
+            ]
+            for context in idle:
+                del self._contexts[context.tenant_id]
+            metrics.set_gauge("trello_tenants_active", len(self._contexts))
+        for context in idle:
+            context.session.close()
+            context.board_cache.release()
+            release_tenant_brds(context.tenant_id)
+            metrics.increment("trello_tenant_evictions_total")
+            logger.info("Evicted idle Trello tenant context %s", context.tenant_id)
+        return [context.tenant_id for context in idle]
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            contexts = list(self._contexts.values())
+        return {
+            "active": len(contexts),
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "tenants": {
+                context.tenant_id: {
+                    "idle_seconds": round(now - context.last_used, 1),
+                    "budget_available": round(context.budget.available, 1),
+                }
+                for context in contexts
+            },
+        }
+
+
+@lru_cache(maxsize=1)
+def get_tenant_registry() -> TenantRegistry:
+    """Dependency injector for the process-wide TenantRegistry."""
+    tenants, secrets = _load_tenants(settings.TRELLO_TENANTS_FILE)
+    return TenantRegistry(
+        default_credentials=TrelloCredentials(settings.TRELLO_API_KEY, settings.TRELLO_TOKEN),
+        tenants=tenants,
+        secrets=secrets,
+        idle_ttl_seconds=settings.TRELLO_TENANT_IDLE_TTL,
+        pool_size=settings.TRELLO_POOL_SIZE,
+        # Budgets are per process, but Trello's limit is per token across all the workers
+        calls_per_10s=settings.TRELLO_CALLS_PER_10S / max(1, settings.WEB_CONCURRENCY),
+    )
+
+
+def get_request_tenant(
+    x_trello_key: Optional[str] = Header(None),
+    x_trello_token: Optional[str] = Header(None),
+    x_tenant_id: Optional[str] = Header(None),
+    x_tenant_secret: Optional[str] = Header(None),
+) -> TenantContext:
+    """
+    Resolve the Trello tenant for a request: caller-supplied X-Trello-Key and
+    X-Trello-Token headers, else a configured X-Tenant-Id with its
+    X-Tenant-Secret, else the default.
+    """
+    registry = get_tenant_registry()
+    if x_trello_key or x_trello_token:
+        if not settings.TRELLO_ALLOW_CALLER_CREDENTIALS:
+            raise HTTPException(status_code=403, detail="Caller-supplied Trello credentials are disabled.")
+        if not (x_trello_key and x_trello_token):
+            raise HTTPException(status_code=400, detail="X-Trello-Key and X-Trello-Token must be sent together.")
+        return registry.for_credentials(TrelloCredentials(x_trello_key, x_trello_token))
+    if x_tenant_id:
+        try:
+            return registry.authenticate(x_tenant_id, x_tenant_secret)
+        except UnknownTenantError:
+            raise HTTPException(status_code=401, detail="Unknown tenant or wrong X-Tenant-Secret.")
+    return registry.default()
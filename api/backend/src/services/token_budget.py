@@ -0,0 +1,83 @@
+import math
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from ..config.core import settings
+
+BudgetKey = Tuple[str, str]
+
+
+class TokenBudget:
+    """
+    Sizes `max_tokens` per (card type, effort) from the completion lengths seen
+    so far: the `percentile` of the last `window` completions times `headroom`,
+    clamped to [min_tokens, ceiling_tokens]. Until `min_samples` completions
+    have been recorded for a key the static default is used.
+
+    Some inference servers reserve KV cache per slot for the whole max_tokens,
+    so a tighter budget frees room for more concurrent generations.
+    """
+
+    def __init__(
+        self,
+        default_tokens: int,
+        min_tokens: int = 512,
+        ceiling_tokens: int = 4096,
+        headroom: float = 1.3,
+        percentile: float = 0.95,
+        window: int = 50,
+        min_samples: int = 5,
+    ):
+        self.default_tokens = default_tokens
+        self.min_tokens = min_tokens
+        self.ceiling_tokens = max(ceiling_tokens, default_tokens)
+        self.headroom = headroom
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[BudgetKey, Deque[int]] = {}
+
+    @staticmethod
+    def key(context: Optional[Dict[str, Any]]) -> BudgetKey:
+        context = context or {}
+        return (str(context.get("type") or "unknown").lower(), str(context.get("effort") or "unknown").lower())
+
+    def record(self, key: BudgetKey, completion_tokens: int) -> None:
+        """Record the length of a completion that finished on its own (not truncated)."""
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(completion_tokens)
+
+    def max_tokens(self, key: BudgetKey) -> int:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return self.default_tokens
+        observed = samples[min(len(samples) - 1, math.ceil(self.percentile * len(samples)) - 1)]
+        return max(self.min_tokens, min(self.ceiling_tokens, math.ceil(observed * self.headroom)))
+
+    def retry_budget(self, max_tokens: int) -> Optional[int]:
+        """A larger budget for retrying a truncated completion, or None if already at the ceiling."""
+        if max_tokens >= self.ceiling_tokens:
+            return None
+        return min(self.ceiling_tokens, max(max_tokens * 2, self.default_tokens))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            keys = {key: len(samples) for key, samples in self._samples.items()}
+        return {f"{type_}/{effort}": {"samples": count, "max_tokens": self.max_tokens((type_, effort))}
+                for (type_, effort), count in keys.items()}
+
+
+@lru_cache(maxsize=1)
+def get_token_budget() -> TokenBudget:
+    """Process-wide TokenBudget shared by every LLMService."""
+    return TokenBudget(
+        default_tokens=settings.MAX_TOKENS,
+        min_tokens=settings.LLM_MIN_TOKENS,
+        ceiling_tokens=settings.LLM_MAX_TOKENS_CEILING,
+        headroom=settings.LLM_TOKEN_HEADROOM,
+        min_samples=settings.LLM_TOKEN_MIN_SAMPLES,
+    )
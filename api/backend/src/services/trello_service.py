@@ -1,107 +1,319 @@
+import re
 import requests
 import logging
-from typing import List, Dict, Any, Optional
+from fastapi import Depends
+from typing import List, Dict, Any, Optional, Iterator, Set, Tuple
 from ..config.core import settings
 from ..models.card import TrelloCard
+from ..utils.json_stream import iter_json_array
+from ..utils.metrics import metrics
+from ..utils.tracing import span
+from .card_parser import RawCard, parse_cards
+from .card_store import CardStore, get_card_store
+from .board_cache import BoardCache
+from .board_refresher import BoardRefresher, get_board_refresher
+from .brd_prefetcher import BRDPrefetcher, get_brd_prefetcher
+from .tenants import TenantContext, get_request_tenant, get_tenant_registry
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 EXCLUDED_CARD_NAMES = ["Design & Research", "Done", "[Completed Task]"]
 
+# Credentials in a Trello URL: the token path segment and the key/token query parameters
+_CREDENTIALS_IN_URL = re.compile(r"(tokens/|[?&](?:key|token)=)[^/?&\s]+")
+
+def _redact(text: str) -> str:
+    """Hide Trello credentials in text bound for logs, traces or error messages."""
+    return _CREDENTIALS_IN_URL.sub(r"\1***", text)
+
 class TrelloCardNotFoundError(Exception):
     pass
 
+class TrelloRateLimitError(Exception):
+    pass
+
+class TrelloRequestError(Exception):
+    """A failed Trello call, with the credentials redacted from its message."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
 class TrelloService:
-    def __init__(self):
-        # Log API key and token presence (not the actual values)
-        logger.debug(f"Initializing TrelloService")
-        logger.debug(f"API Key present: {bool(settings.TRELLO_API_KEY)}")
-        logger.debug(f"Token present: {bool(settings.TRELLO_TOKEN)}")
-        
-        self.auth_params = {
-            "key": settings.TRELLO_API_KEY,
-            "token": settings.TRELLO_TOKEN
-        }
+    def __init__(
+        self,
+        card_store: Optional[CardStore] = None,
+        board_cache: Optional[BoardCache] = None,
+        refresher: Optional[BoardRefresher] = None,
+        prefetcher: Optional[BRDPrefetcher] = None,
+        tenant: Optional[TenantContext] = None
+    ):
+        # Without a tenant, calls use the configured TRELLO_API_KEY/TRELLO_TOKEN
+        self.tenant = tenant or get_tenant_registry().default()
+        logger.debug("Initializing TrelloService for tenant %s", self.tenant.tenant_id)
+
+        self.auth_params = self.tenant.auth_params
+        self.session = self.tenant.session
+        self.card_store = card_store
+        self.board_cache = board_cache
+        self.refresher = refresher
+        self.prefetcher = prefetcher
         
-    def _make_request(self, method: str, endpoint: str, params: Dict = None, json: Dict = None) -> Dict:
+    def _send(self, method: str, endpoint: str, params: Dict = None, json: Dict = None, stream: bool = False) -> requests.Response:
         url = f"{settings.TRELLO_BASE_URL}/{endpoint}"
         params = {**self.auth_params, **(params or {})}
         headers = {
             "Accept": "application/json"
         }
         
-        # Log request details (excluding sensitive info)
-        logger.debug(f"Making request to: {url}")
-        logger.debug(f"Method: {method}")
-        logger.debug(f"Headers: {headers}")
-        logger.debug(f"Params keys: {list(params.keys())}")
+        # Log request details (excluding sensitive info); args are only rendered if DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Making request: %s %s (headers: %s, params keys: %s)", method, _redact(url), headers, params.keys())
+
+        self.tenant.touch()
+        if not self.tenant.budget.acquire(timeout=settings.TRELLO_RATE_WAIT):
+            metrics.increment("trello_rate_limited_total")
+            raise TrelloRateLimitError(f"Trello call budget exhausted for tenant {self.tenant.tenant_id}")
         
         try:
-            response = requests.request(
-                method,
-                url,
-                headers=headers,
-                params=params,
-                json=json
-            )
+            with span("trello.request", method=method, endpoint=_redact(endpoint)):
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    stream=stream
+                )
             response.raise_for_status()
-            return response.json()
+            return response
         except requests.exceptions.RequestException as e:
-            if hasattr(e, 'response') and e.response is not None and e.response.status_code == 404:
+            # `from None` throughout: the original exception and its traceback carry the URL with the credentials
+            error_response = getattr(e, 'response', None)
+            status_code = error_response.status_code if error_response is not None else None
+            if status_code == 404:
                 # Re-raise as our custom, more specific exception
-                raise TrelloCardNotFoundError(f"Card not found at endpoint: {url}")
-            logger.error(f"Request failed: {str(e)}")
-            logger.error(f"Response status code: {e.response.status_code if hasattr(e, 'response') and e.response is not None else 'No response'}")
-            logger.error(f"Response body: {e.response.text if hasattr(e, 'response') and e.response is not None else 'No response'}")
-            raise
+                raise TrelloCardNotFoundError(f"Card not found at endpoint: {_redact(url)}") from None
+            logger.error(
+                "Request failed: %s (status: %s, body: %s)", _redact(str(e)),
+                status_code if status_code is not None else 'No response',
+                _redact(error_response.text) if error_response is not None else 'No response'
+            )
+            raise TrelloRequestError(_redact(str(e)), status_code=status_code) from None
     
+    def _make_request(self, method: str, endpoint: str, params: Dict = None, json: Dict = None) -> Dict:
+        return self._send(method, endpoint, params=params, json=json).json()
+
+    def _stream_array(self, endpoint: str, params: Dict = None) -> Iterator[Any]:
+        """GET an endpoint that returns a JSON array and decode its elements one at a time."""
+        response = self._send("GET", endpoint, params=params, stream=True)
+        try:
+            yield from iter_json_array(response.iter_content(chunk_size=settings.TRELLO_STREAM_CHUNK_SIZE))
+        finally:
+            response.close()
+
     def get_boards(self) -> List[Dict[str, Any]]:
         """Get all boards for the authenticated user."""
         logger.info("Fetching boards for authenticated user")
         return self._make_request("GET", "members/me/boards")
     
-    def get_board_cards(self, board_id: str) -> List[TrelloCard]: # Return type is TrelloCard
+    @staticmethod
+    def _is_listed_card(card_data: Dict[str, Any], list_name: str) -> bool:
+        """Whether a raw card should be exposed (open, not a list header, not excluded)."""
+        card_name = card_data["name"]
+        return (
+            not card_data.get("closed", False)
+            and card_name != list_name
+            and card_name not in EXCLUDED_CARD_NAMES
+        )
+
+    def _get_list_map(self, board_id: str) -> Dict[str, str]:
+        lists_data = self._make_request("GET", f"boards/{board_id}/lists", params={"fields": "id,name"})
+        return {lst["id"]: lst["name"] for lst in lists_data}
+
+    def iter_board_cards(self, board_id: str, list_map: Optional[Dict[str, str]] = None) -> Iterator[TrelloCard]:
+        """
+        Stream a board's cards: each card is decoded from the response body,
+        filtered and parsed before the next one is read, so peak memory scales
+        with one card rather than the whole board. Bypasses the caches.
+        """
+        if list_map is None:
+            list_map = self._get_list_map(board_id)
+        for card_data in self._stream_array(f"boards/{board_id}/cards", params={"fields": "all"}):
+            list_name = list_map.get(card_data["idList"], "Unknown List")
+            if self._is_listed_card(card_data, list_name):
+                yield TrelloCard.from_trello_json(card_data, list_name)
+
+    def _get_fresh_cached_cards(self, board_id: str) -> Optional[List[TrelloCard]]:
+        """
+        Cards for a board from the cache if they are fresh, or stale but being
+        revalidated in the background. Returns None when Trello must be asked.
+        """
+        if self.board_cache is None:
+            return None
+        if self.refresher is not None:
+            self.refresher.record_access(board_id)
+        cached = self.board_cache.get_with_age(board_id)
+        if cached is None:
+            return None
+        cached_cards, age = cached
+        if age <= self.board_cache.ttl_seconds:
+            logger.debug("Serving %s cached cards for board: %s", len(cached_cards), board_id)
+            return cached_cards
+        if self.refresher is not None:
+            # Stale-while-revalidate: answer now, refresh in the background
+            self.refresher.revalidate(board_id)
+            logger.debug("Serving stale cards (%.0fs old) for board: %s", age, board_id)
+            return cached_cards
+        return None
+
+    def get_board_cards(
+        self,
+        board_id: str,
+        force_refresh: bool = False,
+        stream: Optional[bool] = None,
+        fields: Optional[Set[str]] = None
+    ) -> List[TrelloCard]: # Return type is TrelloCard
         """
         Get all cards from a specific board, optimizing list lookups.
         This method resolves the N+1 query problem by fetching all lists
         on the board in a single call.
+        With `stream` (default: TRELLO_STREAM_CARDS) the card listing is decoded
+        incrementally instead of being loaded as one JSON document; otherwise
+        large boards are parsed on the process pool (see card_parser).
+        With a `fields` projection (see TrelloCard.parse_fields) a cached board
+        is still served whole, but on a miss only the Trello fields needed for
+        the projection are requested. Such partial cards are not cached.
         """
-        logger.info(f"Fetching cards and lists for board: {board_id}")
+        if not force_refresh:
+            cached_cards = self._get_fresh_cached_cards(board_id)
+            if cached_cards is not None:
+                return cached_cards
+
+        if fields is not None:
+            logger.info("Fetching projected cards (%s) for board: %s", ",".join(sorted(fields)), board_id)
+            return parse_cards(self._fetch_raw_board_cards(board_id, fields=fields))
+
+        logger.info("Fetching cards and lists for board: %s", board_id)
         
+        if settings.TRELLO_STREAM_CARDS if stream is None else stream:
+            # Decode, filter and parse cards one at a time from the response body
+            processed_cards = list(self.iter_board_cards(board_id))
+        else:
+            processed_cards = parse_cards(self._fetch_raw_board_cards(board_id))
+        self._store_board_cards(board_id, processed_cards)
+        return processed_cards
+
+    def _fetch_raw_board_cards(self, board_id: str, fields: Optional[Set[str]] = None) -> List[RawCard]:
+        """Fetch a board's listed cards as unparsed (card JSON, list name) pairs."""
         # 1. Fetch all lists on the board once
-        lists_data = self._make_request("GET", f"boards/{board_id}/lists", params={"fields": "id,name"})
-        list_map = {lst["id"]: lst["name"] for lst in lists_data}
-        
+        list_map = self._get_list_map(board_id)
+
         # 2. Fetch all cards on the board
-        params = {"fields": "all"}
-        cards_data = self._make_request("GET", f"boards/{board_id}/cards", params=params)
-        
-        # 3. Process cards using the in-memory list map, returning full model data
-        processed_cards = []
+        cards_data = self._fetch_board_card_data(board_id, fields)
+
+        # 3. Resolve list names from the in-memory list map and drop hidden cards
+        return self._listed_raw_cards(cards_data, list_map)
+
+    def _fetch_board_card_data(self, board_id: str, fields: Optional[Set[str]] = None, **params) -> List[Dict[str, Any]]:
+        # Only the Trello fields the projection needs (all of them without one)
+        return self._make_request(
+            "GET", f"boards/{board_id}/cards", params={"fields": TrelloCard.trello_fields(fields), **params}
+        )
+
+    def _listed_raw_cards(self, cards_data: List[Dict[str, Any]], list_map: Dict[str, str]) -> List[RawCard]:
+        raw_cards = []
         for card_data in cards_data:
             list_name = list_map.get(card_data["idList"], "Unknown List")
-            card_name = card_data["name"]
-            if (
-                not card_data.get("closed", False)
-                and card_name != list_name
-                and card_name not in EXCLUDED_CARD_NAMES
-            ):
-                card = TrelloCard.from_trello_json(card_data, list_name)
-                processed_cards.append(card)
-        return processed_cards
+            if self._is_listed_card(card_data, list_name):
+                raw_cards.append((card_data, list_name))
+        return raw_cards
+
+    def get_board_cards_page(
+        self,
+        board_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Set[str]] = None
+    ) -> Tuple[List[TrelloCard], Optional[str]]:
+        """
+        One page of a board's cards, newest first, and the cursor for the next
+        page (None on the last page). Cursors are card ids: Trello ids grow with
+        creation time, so "older than the cursor" is stable while cards change.
+        A cached board is paged locally; otherwise only this page is requested
+        from Trello (`limit`/`before`), so the first page does not wait for the
+        whole board. Pages may hold fewer than `limit` cards when some are hidden.
+        """
+        cached_cards = self._get_fresh_cached_cards(board_id)
+        if cached_cards is not None:
+            older = sorted(
+                (card for card in cached_cards if cursor is None or card.id < cursor),
+                key=lambda card: card.id, reverse=True
+            )
+            page = older[:limit]
+            return page, page[-1].id if len(older) > limit else None
+
+        params = {"limit": limit}
+        if cursor:
+            params["before"] = cursor
+        list_map = self._get_list_map(board_id)
+        cards_data = self._fetch_board_card_data(board_id, fields, **params)
+        page = parse_cards(self._listed_raw_cards(cards_data, list_map))
+        page.sort(key=lambda card: card.id, reverse=True)
+        # The cursor comes from the raw page, so hidden cards are skipped over too
+        next_cursor = min(card_data["id"] for card_data in cards_data) if len(cards_data) >= limit else None
+        return page, next_cursor
+
+    def _store_board_cards(self, board_id: str, cards: List[TrelloCard]) -> None:
+        """Mirror a board snapshot into the local card store for search, cache it and queue pre-generation."""
+        if self.card_store is not None:
+            try:
+                self.card_store.replace_board_cards(board_id, cards)
+            except Exception as e:
+                logger.error("Failed to mirror cards for board %s: %s", board_id, e, exc_info=True)
+        if self.board_cache is not None:
+            self.board_cache.put(board_id, cards)
+        if self.prefetcher is not None:
+            try:
+                self.prefetcher.observe_board(board_id, cards)
+            except Exception as e:
+                logger.error("Failed to queue BRD pre-generation for board %s: %s", board_id, e, exc_info=True)
     
-    def get_cards_from_multiple_boards(self, board_ids: List[str]) -> List[Dict[str, Any]]:
-        """Get all cards from a list of board IDs."""
+    def get_cards_from_multiple_boards(self, board_ids: List[str]) -> List[TrelloCard]:
+        """
+        Get all cards from a list of board IDs.
+        Boards not served from the cache are fetched first and parsed in a single
+        batch, so a large multi-board export crosses the parallel parse threshold
+        as a whole rather than board by board.
+        """
+        cached: Dict[str, List[TrelloCard]] = {}
+        raw_by_board: Dict[str, List[RawCard]] = {}
+        for board_id in board_ids:
+            if board_id in cached or board_id in raw_by_board:
+                continue
+            cards = self._get_fresh_cached_cards(board_id)
+            if cards is not None:
+                cached[board_id] = cards
+            else:
+                logger.info("Fetching cards and lists for board: %s", board_id)
+                raw_by_board[board_id] = self._fetch_raw_board_cards(board_id)
+
+        parsed = parse_cards([raw for raws in raw_by_board.values() for raw in raws])
+        offset = 0
+        for board_id, raws in raw_by_board.items():
+            cached[board_id] = parsed[offset:offset + len(raws)]
+            offset += len(raws)
+            self._store_board_cards(board_id, cached[board_id])
+
         all_cards = []
         for board_id in board_ids:
-            cards = self.get_board_cards(board_id)
-            all_cards.extend(cards)
+            all_cards.extend(cached[board_id])
         return all_cards
-    
+
     def get_card_details(self, card_id: str) -> TrelloCard:
         """Get detailed information for a specific card."""
-        logger.info(f"Fetching details for card: {card_id}")
+        logger.info("Fetching details for card: %s", card_id)
         card_data = self._make_request("GET", f"cards/{card_id}", 
                                      params={"fields": "all"})
         # We need the list name, but get_card_details is called for a single card,
@@ -110,6 +322,56 @@ class TrelloService:
         card = TrelloCard.from_trello_json(card_data, list_info.get("name"))
         return card
     
+    def refresh_card(self, card_id: str) -> Optional[TrelloCard]:
+        """
+        Re-fetch and re-parse a single card, then patch it into the board cache
+        and the local card store. Returns None if the card is gone or hidden.
+        """
+        try:
+            card_data = self._make_request("GET", f"cards/{card_id}", params={"fields": "all", "list": "true"})
+        except TrelloCardNotFoundError:
+            self.remove_card(card_id)
+            return None
+
+        list_name = (card_data.get("list") or {}).get("name", "Unknown List")
+        if not self._is_listed_card(card_data, list_name):
+            self.remove_card(card_id)
+            return None
+
+        card = TrelloCard.from_trello_json(card_data, list_name)
+        if self.board_cache is not None:
+            self.board_cache.upsert_card(card)
+        if self.card_store is not None:
+            self.card_store.upsert_cards([card])
+        logger.info("Refreshed card %s on board %s", card_id, card.board_id)
+        return card
+
+    def remove_card(self, card_id: str) -> None:
+        """Drop a card from the board cache and the local card store."""
+        if self.board_cache is not None:
+            self.board_cache.remove_card(card_id)
+        if self.card_store is not None:
+            self.card_store.delete_card(card_id)
+        logger.info("Removed card %s from local caches", card_id)
+
+    def list_webhooks(self) -> List[Dict[str, Any]]:
+        """List the webhooks registered for the current token."""
+        # Trello only offers this per token, in the path; _send redacts it from logs and errors
+        return self._make_request("GET", f"tokens/{self.auth_params['token']}/webhooks")
+
+    def create_webhook(self, board_id: str, callback_url: str) -> Dict[str, Any]:
+        """Register a webhook that pushes the board's actions to `callback_url`."""
+        logger.info("Registering webhook for board %s -> %s", board_id, callback_url)
+        return self._make_request("POST", "webhooks", params={
+            "idModel": board_id,
+            "callbackURL": callback_url,
+            "description": f"K2BRD board {board_id}",
+        })
+
+    def delete_webhook(self, webhook_id: str) -> None:
+        logger.info("Deleting webhook %s", webhook_id)
+        self._make_request("DELETE", f"webhooks/{webhook_id}")
+
     def export_cards_data(self, cards: List[TrelloCard], format: str = "json") -> Any:
         """Export cards in specified format."""
         if format == "json":
@@ -120,6 +382,22 @@ class TrelloService:
         else:
             raise ValueError(f"Unsupported export format: {format}")
 
-def get_trello_service() -> TrelloService:
-    """Dependency injector for TrelloService."""
-    return TrelloService() 
\ No newline at end of file
+def create_trello_service(tenant: Optional[TenantContext] = None) -> TrelloService:
+    """
+    Build a TrelloService for `tenant` (default: the configured credentials).
+    Only the default tenant feeds the shared card store, board refresher and
+    BRD pre-generation; other tenants get their own board cache namespace.
+    """
+    tenant = tenant or get_tenant_registry().default()
+    if not tenant.is_default:
+        return TrelloService(board_cache=tenant.board_cache, tenant=tenant)
+    card_store = get_card_store() if settings.CARD_STORE_ENABLED else None
+    refresher = get_board_refresher() if settings.BOARD_REFRESH_ENABLED else None
+    return TrelloService(
+        card_store=card_store, board_cache=tenant.board_cache, refresher=refresher,
+        prefetcher=get_brd_prefetcher(), tenant=tenant
+    )
+
+def get_trello_service(tenant: TenantContext = Depends(get_request_tenant)) -> TrelloService:
+    """Dependency injector for TrelloService, bound to the calling tenant's credentials."""
+    return create_trello_service(tenant)
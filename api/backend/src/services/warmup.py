@@ -0,0 +1,142 @@
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from ..config.core import settings
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Step = Tuple[str, Callable[[], Any]]
+
+
+class StartupWarmup:
+    """
+    Runs the warm-up steps once, in order, on a background thread, so the
+    server already accepts connections (and answers /health) meanwhile.
+    It is ready once every step has finished or once `timeout` has passed.
+    A failed step is logged and reported, but does not block readiness:
+    warm-up only saves the first requests some latency.
+    """
+
+    def __init__(self, steps: List[Step], timeout: float = 60, clock: Callable[[], float] = time.monotonic):
+        self.steps = steps
+        self.timeout = timeout
+        self._clock = clock
+        self._started_at: Optional[float] = None
+        self._finished = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._results: List[Dict[str, Any]] = []
+
+    def start(self) -> None:
+        self._started_at = self._clock()
+        threading.Thread(target=self.run, name="startup-warmup", daemon=True).start()
+
+    def run(self) -> None:
+        if self._started_at is None:
+            self._started_at = self._clock()
+        for name, step in self.steps:
+            if self._stopped.is_set():
+                break
+            started = time.perf_counter()
+            result: Dict[str, Any] = {"name": name, "ok": True}
+            try:
+                step()
+            except Exception as e:
+                logger.warning("Warm-up step %s failed: %s", name, e)
+                result.update(ok=False, error=str(e))
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            metrics.observe("warmup_step_seconds", result["seconds"], step=name)
+            with self._lock:
+                self._results.append(result)
+        self._finished.set()
+        logger.info("Warm-up finished in %.2fs", self._clock() - self._started_at)
+
+    def stop(self) -> None:
+        """Skip the steps that have not started yet (used on shutdown)."""
+        self._stopped.set()
+
+    @property
+    def timed_out(self) -> bool:
+        return (
+            not self._finished.is_set()
+            and self._started_at is not None
+            and self._clock() - self._started_at >= self.timeout
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self._finished.is_set() or self.timed_out
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            results = list(self._results)
+        return {
+            "ready": self.ready,
+            "finished": self._finished.is_set(),
+            "timed_out": self.timed_out,
+            "elapsed_seconds": round(self._clock() - self._started_at, 3) if self._started_at is not None else None,
+            "steps": results,
+            "pending": [name for name, _ in self.steps[len(results):]],
+        }
+
+
+def preconnect(session: requests.Session, url: str) -> None:
+    """Open (DNS, TCP, TLS) a keep-alive connection in the session's pool without calling an API."""
+    response = session.head(url, timeout=settings.WARMUP_CONNECT_TIMEOUT, allow_redirects=False)
+    response.close()
+
+
+def _warm_llm() -> None:
+    from .llm_service import get_llm_session, load_prompt_config
+    load_prompt_config()
+    preconnect(get_llm_session(), f"{settings.LLM_HOST}/v1/models")
+
+
+def _warm_trello() -> None:
+    from .tenants import get_tenant_registry
+    preconnect(get_tenant_registry().default().session, settings.TRELLO_BASE_URL)
+
+
+def _warm_caches() -> None:
+    from ..cache import get_cache_backend
+    get_cache_backend()
+    if settings.BRD_CACHE_ENABLED:
+        from .brd_cache import get_brd_cache
+        get_brd_cache()
+    if settings.CARD_STORE_ENABLED:
+        from .card_store import get_card_store
+        get_card_store()
+
+
+def _hot_board_ids() -> List[str]:
+    return [board_id.strip() for board_id in settings.WARMUP_BOARD_IDS.split(",") if board_id.strip()]
+
+
+def _prefetch_boards() -> None:
+    from .trello_service import create_trello_service
+    board_ids = _hot_board_ids()
+    trello_service = create_trello_service()
+    with ThreadPoolExecutor(max_workers=max(1, settings.BOARD_REFRESH_CONCURRENCY), thread_name_prefix="warmup-board") as pool:
+        counts = list(pool.map(lambda board_id: len(trello_service.get_board_cards(board_id)), board_ids))
+    logger.info("Pre-fetched %s cards from %s hot board(s)", sum(counts), len(board_ids))
+
+
+def default_steps() -> List[Step]:
+    """LLM connection and prompts, Trello connection, caches, then the configured hot boards."""
+    steps: List[Step] = [
+        ("llm", _warm_llm),
+        ("trello", _warm_trello),
+        ("caches", _warm_caches),
+    ]
+    if _hot_board_ids():
+        steps.append(("hot_boards", _prefetch_boards))
+    return steps
@@ -0,0 +1,91 @@
+import base64
+import hashlib
+import hmac
+import logging
+from typing import Dict, Any, List, Optional
+
+from fastapi import Depends
+
+from ..config.core import settings
+from .trello_service import TrelloService, get_trello_service
+
+logger = logging.getLogger(__name__)
+
+# Actions after which the card should be re-fetched and re-parsed
+CARD_UPDATE_ACTIONS = {
+    "createCard", "copyCard", "updateCard", "moveCardToBoard",
+    "convertToCardFromCheckItem", "addLabelToCard", "removeLabelFromCard",
+    "addMemberToCard", "removeMemberFromCard",
+}
+# Actions after which the card should no longer be served from this board
+CARD_REMOVE_ACTIONS = {"deleteCard", "moveCardFromBoard"}
+
+
+class WebhookSignatureError(Exception):
+    pass
+
+
+class WebhookService:
+    def __init__(self, trello_service: TrelloService):
+        self.trello_service = trello_service
+
+    @staticmethod
+    def compute_signature(body: bytes, callback_url: str, secret: str) -> str:
+        """Trello signs base64(HMAC-SHA1(app secret, body + callback URL))."""
+        digest = hmac.new(secret.encode("utf-8"), body + callback_url.encode("utf-8"), hashlib.sha1).digest()
+        return base64.b64encode(digest).decode("utf-8")
+
+    def verify_signature(self, body: bytes, signature: Optional[str], callback_url: str) -> None:
+        """Raise WebhookSignatureError unless the callback was signed with our app secret."""
+        if not settings.TRELLO_API_SECRET:
+            raise WebhookSignatureError("TRELLO_API_SECRET is not configured; refusing unsigned webhooks.")
+        if not signature:
+            raise WebhookSignatureError("Missing X-Trello-Webhook signature header.")
+        expected = self.compute_signature(body, callback_url, settings.TRELLO_API_SECRET)
+        if not hmac.compare_digest(expected, signature):
+            raise WebhookSignatureError("Webhook signature does not match.")
+
+    def apply_action(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a single Trello webhook action to the local caches.
+        Only the card named in the action is re-fetched; everything else is untouched.
+        """
+        action = payload.get("action") or {}
+        action_type = action.get("type")
+        card_data = (action.get("data") or {}).get("card") or {}
+        card_id = card_data.get("id")
+
+        if not card_id:
+            return {"action": action_type, "status": "ignored"}
+
+        if action_type in CARD_REMOVE_ACTIONS or (action_type == "updateCard" and card_data.get("closed")):
+            self.trello_service.remove_card(card_id)
+            return {"action": action_type, "card_id": card_id, "status": "removed"}
+
+        if action_type in CARD_UPDATE_ACTIONS:
+            card = self.trello_service.refresh_card(card_id)
+            status = "updated" if card is not None else "removed"
+            return {"action": action_type, "card_id": card_id, "status": status}
+
+        return {"action": action_type, "card_id": card_id, "status": "ignored"}
+
+    def register_board(self, board_id: str, callback_url: str) -> Dict[str, Any]:
+        """Register a webhook for a board, reusing an existing one for the same callback."""
+        for webhook in self.trello_service.list_webhooks():
+            if webhook.get("idModel") == board_id and webhook.get("callbackURL") == callback_url:
+                return webhook
+        return self.trello_service.create_webhook(board_id, callback_url)
+
+    def unregister_board(self, board_id: str) -> List[str]:
+        """Delete every webhook registered for a board. Returns the deleted webhook IDs."""
+        deleted = []
+        for webhook in self.trello_service.list_webhooks():
+            if webhook.get("idModel") == board_id:
+                self.trello_service.delete_webhook(webhook["id"])
+                deleted.append(webhook["id"])
+        return deleted
+
+
+def get_webhook_service(trello_service: TrelloService = Depends(get_trello_service)) -> WebhookService:
+    """Dependency injector for WebhookService."""
+    return WebhookService(trello_service)
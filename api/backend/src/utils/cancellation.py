@@ -0,0 +1,59 @@
+import threading
+import logging
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationCancelledError(Exception):
+    pass
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation signal shared between a request handler and the
+    workers doing its job. Callbacks registered on the token run once, on the
+    thread that cancels, so blocking I/O (e.g. an upstream HTTP read) can be
+    aborted immediately instead of at the next check.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.debug("Cancellation callback failed: %s", e)
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run `callback` on cancellation. Returns a function that unregisters it."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise GenerationCancelledError(self.reason or "cancelled")
@@ -0,0 +1,80 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Union
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+def iter_json_array(chunks: Iterable[Union[bytes, str]]) -> Iterator[Any]:
+    """
+    Incrementally decode a top-level JSON array, yielding one element at a time.
+
+    Only the undecoded tail of the input is buffered, so memory stays
+    proportional to the largest single element rather than the whole document.
+    Byte chunks may split multi-byte UTF-8 sequences anywhere.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    source = iter(chunks)
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        try:
+            chunk = next(source)
+        except StopIteration:
+            eof = True
+            buffer = buffer[pos:] + utf8.decode(b"", final=True)
+            pos = 0
+            return False
+        text = utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        # Drop the consumed prefix so the buffer only holds the current element
+        buffer = buffer[pos:] + text
+        pos = 0
+        return True
+
+    def skip_whitespace() -> bool:
+        """Advance past whitespace; returns False at end of input."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if not fill():
+                return False
+
+    if not skip_whitespace() or buffer[pos] != "[":
+        raise JSONStreamError("Expected a JSON array")
+    pos += 1
+
+    while True:
+        if not skip_whitespace():
+            raise JSONStreamError("Unterminated JSON array")
+        char = buffer[pos]
+        if char == "]":
+            return
+        if char == ",":
+            pos += 1
+            continue
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not fill():
+                    raise JSONStreamError("Truncated JSON element")
+                continue
+            # A bare number or literal ending at the buffer edge may continue in the next chunk
+            if not isinstance(value, (dict, list, str)) and end == len(buffer) and fill():
+                continue
+            break
+        pos = end
+        yield value
@@ -2,6 +2,8 @@ import re
 from typing import List
 import unicodedata
 
+from .tracing import traced
+
 def deduplicate_urls(text: str) -> str:
     """Remove duplicate URLs from text while preserving the first occurrence"""
     url_pattern = r'https?://[^\s<>"]+|www\.[^\s<>"]+' 
@@ -16,6 +18,7 @@ def deduplicate_urls(text: str) -> str:
     
     return text.strip() 
 
+@traced("text.clean_text")
 def clean_text(text: str) -> str:
     """
     Cleans a string by removing non-printable characters, weird whitespace,
@@ -0,0 +1,184 @@
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_NO_SPAN = nullcontext()
+
+
+class Trace:
+    """
+    Spans recorded for one request, exported in the Chrome trace-event format
+    (load the file in chrome://tracing or https://ui.perfetto.dev).
+    Spans may be recorded from any thread the request's context reaches.
+    """
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        # Output files share this stem, so their names are known before export
+        self.file_stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.trace_id}"
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self.thread_ids: Set[int] = {threading.get_ident()}
+
+    def _micros(self, perf_time: float) -> float:
+        return round((perf_time - self._origin) * 1e6, 3)
+
+    def add_span(self, name: str, started: float, ended: float, **args) -> None:
+        """Record a completed span; `started`/`ended` are time.perf_counter() values."""
+        thread_id = threading.get_ident()
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": self._micros(started),
+            "dur": round((ended - started) * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": thread_id,
+        }
+        if args:
+            event["args"] = {k: v if isinstance(v, (int, float, bool)) else str(v) for k, v in args.items()}
+        with self._lock:
+            self._events.append(event)
+            self.thread_ids.add(thread_id)
+
+    def attach_thread(self) -> None:
+        """Mark the calling thread as working for this trace (so the profiler samples it)."""
+        self.thread_ids.add(threading.get_ident())
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def export(self, directory: str) -> Path:
+        """Write the trace as a Chrome trace-event JSON file and return its path."""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        trace_file = path / f"{self.file_stem}.trace.json"
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_names.get(tid, str(tid))}}
+            for tid in sorted(self.thread_ids)
+        ]
+        with open(trace_file, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms", "otherData": {"name": self.name}}, file)
+        return trace_file
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    """Make a new trace current for the enclosed block (and the contexts copied from it)."""
+    trace = Trace(name)
+    reset = _current_trace.set(trace)
+    started = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.add_span(name, started, time.perf_counter())
+        _current_trace.reset(reset)
+
+
+@contextmanager
+def _record(trace: Trace, name: str, args: Dict[str, Any]) -> Iterator[None]:
+    trace.attach_thread()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, started, time.perf_counter(), **args)
+
+
+def span(name: str, **args):
+    """
+    Context manager timing the enclosed block as a span of the current trace.
+    Without an active trace this is a single ContextVar lookup.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return _record(trace, name, args)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorator form of span()."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            trace.attach_thread()
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                trace.add_span(name, started, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of a trace's threads at a fixed interval and
+    aggregates them as folded stacks (`frame;frame;frame count`), the input
+    format of flamegraph.pl and speedscope. Threads shared with other requests
+    (e.g. the event loop) are sampled too, so concurrent work can show up.
+    """
+
+    def __init__(self, trace: Trace, interval: float = 0.005):
+        self.trace = trace
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.trace.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def export(self, directory: str) -> Path:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        report = path / f"{self.trace.file_stem}.folded"
+        report.write_text(self.folded() + "\n", encoding="utf-8")
+        return report
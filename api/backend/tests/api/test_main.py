@@ -1,11 +1,18 @@
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock
+from pathlib import Path
+import logging
+import os
+import subprocess
+import sys
 import pytest
+import requests
 
 from src.main import app
 from src.services.trello_service import get_trello_service
 from src.services.llm_service import get_llm_service
 from src.services.brd_service import get_brd_service
+from src.services.card_store import get_card_store
 
 
 def test_health_check(client: TestClient):
@@ -16,6 +23,7 @@ def test_health_check(client: TestClient):
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
+
 def test_get_boards(client: TestClient):
     """Test the endpoint for getting Trello boards."""
     # Arrange: Create a mock service and override the dependency
@@ -25,7 +33,7 @@ def test_get_boards(client: TestClient):
 
     # Act
     response = client.get("/api/v1/trello/boards")
-    
+
     # Assert
     assert response.status_code == 200
     assert response.json() == [{"id": "board1", "name": "Test Board"}]
@@ -34,6 +42,26 @@ def test_get_boards(client: TestClient):
     # Cleanup
     app.dependency_overrides.clear()
 
+
+def test_trello_errors_keep_caller_credentials_out_of_logs(client: TestClient, mocker, caplog):
+    """A rejected caller-supplied token must not reach the logs, even in tracebacks."""
+    response = MagicMock(status_code=401, text="invalid token")
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        "401 Client Error: Unauthorized for url: "
+        "https://api.trello.com/1/members/me/boards?key=CALLERKEY&token=CALLERSECRET",
+        response=response,
+    )
+    mocker.patch("requests.Session.request", return_value=response)
+
+    with caplog.at_level(logging.DEBUG):
+        result = client.get("/api/v1/trello/boards", headers={"X-Trello-Key": "CALLERKEY", "X-Trello-Token": "CALLERSECRET"})
+
+    assert result.status_code == 500
+    logged = "\n".join(logging.Formatter().format(record) for record in caplog.records)
+    assert "Unauthorized" in logged
+    assert "CALLERKEY" not in logged and "CALLERSECRET" not in logged
+
+
 def test_get_board_cards(client: TestClient):
     """Test the endpoint for getting cards from a board."""
     # Arrange
@@ -46,7 +74,7 @@ def test_get_board_cards(client: TestClient):
 
     # Act
     response = client.get(f"/api/v1/trello/boards/{board_id}/cards")
-    
+
     # Assert
     assert response.status_code == 200
     assert len(response.json()) == 1
@@ -55,6 +83,27 @@ def test_get_board_cards(client: TestClient):
     # Cleanup
     app.dependency_overrides.clear()
 
+
+def test_get_board_cards_page_projects_fields(client: TestClient):
+    """Test that the paginated listing only serializes the requested fields."""
+    from src.models.card import TrelloCard
+    mock_trello = MagicMock()
+    mock_trello.get_board_cards_page.return_value = (
+        [TrelloCard(id="card2", name="Card 2", description="long text", priority="High")], "card2"
+    )
+    app.dependency_overrides[get_trello_service] = lambda: mock_trello
+
+    response = client.get("/api/v1/trello/boards/board1/cards/page?limit=1&fields=name,priority")
+    bad = client.get("/api/v1/trello/boards/board1/cards/page?fields=name,secret")
+
+    assert response.status_code == 200
+    assert response.json() == {"cards": [{"id": "card2", "name": "Card 2", "priority": "High"}], "next_cursor": "card2", "limit": 1}
+    mock_trello.get_board_cards_page.assert_called_once_with("board1", 1, cursor=None, fields={"id", "name", "priority"})
+    assert bad.status_code == 400
+
+    app.dependency_overrides.clear()
+
+
 def test_generate_brd_endpoint(client: TestClient):
     """Test the BRD generation endpoint."""
     # Arrange
@@ -68,9 +117,9 @@ def test_generate_brd_endpoint(client: TestClient):
 
     request_payload = {
         "cards": [{
-            "id": "1", 
-            "name": "Test", 
-            "description": "desc", 
+            "id": "1",
+            "name": "Test",
+            "description": "desc",
             "list_name": "list"
         }]
     }
@@ -82,6 +131,88 @@ def test_generate_brd_endpoint(client: TestClient):
     assert response.json() == {"status": "done"}
     mock_llm.is_available.assert_called_once()
     mock_brd.generate_brd_for_cards.assert_called_once()
-    
+
     # Cleanup
-    app.dependency_overrides.clear() 
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+
+def test_search_cards(client: TestClient):
+    """Test the card search endpoint served from the local mirror."""
+    # Arrange
+    mock_store = MagicMock()
+    mock_store.search.return_value = {
+        "total": 1,
+        "results": [{"id": "card1", "name": "Test Card", "description": ""}],
+    }
+    mock_store.get_sync_status.return_value = {"boards": [], "total_cards": 1, "last_synced_at": None}
+    app.dependency_overrides[get_card_store] = lambda: mock_store
+
+    # Act
+    response = client.get("/api/v1/trello/cards/search", params={"q": "test", "priority": "High"})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert response.json()["results"][0]["id"] == "card1"
+    assert mock_store.search.call_args.kwargs["query"] == "test"
+    assert mock_store.search.call_args.kwargs["priority"] == "High"
+
+    # Cleanup
+    app.dependency_overrides.clear()
+
+
+def test_trace_header_writes_trace(client: TestClient, monkeypatch, tmp_path):
+    """With headers allowed, X-Trace: 1 traces the request and names the file in the response."""
+    from src.config.core import settings
+    monkeypatch.setattr(settings, "TRACE_ALLOW_HEADERS", True)
+    monkeypatch.setattr(settings, "TRACE_DIR", str(tmp_path))
+
+    untraced = client.get("/api/v1/health")
+    traced = client.get("/api/v1/health", headers={"X-Trace": "1"})
+
+    assert "x-trace-file" not in untraced.headers
+    assert (tmp_path / traced.headers["x-trace-file"]).exists()
+
+
+def test_trace_dir_keeps_only_newest_files(client: TestClient, monkeypatch, tmp_path):
+    """Traces written with TRACE_ENABLED are capped at TRACE_MAX_FILES, oldest first out."""
+    from src.config.core import settings
+    monkeypatch.setattr(settings, "TRACE_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "TRACE_MAX_FILES", 2)
+
+    names = [client.get("/api/v1/health").headers["x-trace-file"] for _ in range(4)]
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(names[-2:])
+
+
+def test_readiness_waits_for_warmup(client: TestClient):
+    """Test that /ready answers 503 until warm-up finishes while /health is always up."""
+    from src.services.warmup import StartupWarmup
+    previous = app.state.warmup
+    app.state.warmup = StartupWarmup([("step", lambda: None)])
+    try:
+        response = client.get("/api/v1/ready")
+        assert response.status_code == 503
+        assert response.json()["warmup"]["pending"] == ["step"]
+        assert client.get("/api/v1/health").status_code == 200
+
+        app.state.warmup.run()
+        response = client.get("/api/v1/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+    finally:
+        app.state.warmup = previous
+
+
+def test_import_needs_no_configuration():
+    """Test that importing the app reads no settings, so it works before the environment is configured."""
+    required = {"TRELLO_API_KEY", "TRELLO_TOKEN", "GITHUB_TOKEN", "LLM_MODEL"}
+    env = {name: value for name, value in os.environ.items() if name not in required}
+    backend_dir = Path(__file__).resolve().parents[2]
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import src.main"], cwd=backend_dir, env=env, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
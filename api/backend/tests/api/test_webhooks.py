@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+from fastapi.testclient import TestClient
+import pytest
+
+from src.main import app
+from src.config.core import settings
+from src.services.board_cache import BoardCache
+from src.services.card_store import CardStore
+from src.services.trello_service import TrelloService
+from src.services.webhook_service import WebhookService, get_webhook_service
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "trello_webhooks"
+CALLBACK_URL = "https://k2brd.example.com/api/v1/trello/webhooks/callback"
+
+# What Trello returns for `cards/card1` after each recorded action
+CARD_STATES = {
+    "01_create_card.json": {"idList": "list1", "list": {"name": "To Do"}, "desc": ""},
+    "02_update_card_description.json": {"idList": "list1", "list": {"name": "To Do"},
+                                        "desc": "- **Project:** Portal\n- **Effort:** 5"},
+    "03_move_card.json": {"idList": "list2", "list": {"name": "In Progress"},
+                          "desc": "- **Project:** Portal\n- **Effort:** 5"},
+}
+
+@pytest.fixture
+def replay_env(monkeypatch, mocker):
+    """A real TrelloService wired to an in-memory cache and store, with Trello mocked out."""
+    monkeypatch.setattr(settings, "TRELLO_API_SECRET", "app_secret")
+    monkeypatch.setattr(settings, "TRELLO_WEBHOOK_CALLBACK_URL", CALLBACK_URL)
+
+    board_cache = BoardCache(ttl_seconds=300)
+    card_store = CardStore(":memory:")
+    trello_service = TrelloService(card_store=card_store, board_cache=board_cache)
+    mocker.patch.object(trello_service, "_make_request")
+    trello_service._make_request.side_effect = [
+        [{"id": "list1", "name": "To Do"}, {"id": "list2", "name": "In Progress"}],
+        [{"id": "card2", "name": "Quarterly report", "idList": "list1", "idBoard": "board1", "desc": ""}],
+    ]
+    trello_service.get_board_cards("board1")
+
+    app.dependency_overrides[get_webhook_service] = lambda: WebhookService(trello_service)
+    yield trello_service, board_cache, card_store
+    app.dependency_overrides.clear()
+
+def _post_fixture(client: TestClient, body: bytes, secret: str = "app_secret"):
+    signature = WebhookService.compute_signature(body, CALLBACK_URL, secret)
+    return client.post(
+        "/api/v1/trello/webhooks/callback",
+        content=body,
+        headers={"X-Trello-Webhook": signature, "Content-Type": "application/json"},
+    )
+
+def test_replay_recorded_webhooks(client: TestClient, replay_env):
+    """Replay recorded Trello payloads and check the cache and store follow along."""
+    trello_service, board_cache, card_store = replay_env
+
+    for fixture in sorted(FIXTURES_DIR.glob("*.json")):
+        body = fixture.read_bytes()
+        action = json.loads(body)["action"]
+        state = CARD_STATES.get(fixture.name)
+        if state is not None:
+            trello_service._make_request.side_effect = None
+            trello_service._make_request.return_value = {
+                "id": "card1", "name": "Add SSO login", "idBoard": "board1", **state
+            }
+
+        response = _post_fixture(client, body)
+        assert response.status_code == 200, fixture.name
+
+        cached = {card.id: card for card in board_cache.get("board1")}
+        if fixture.name == "01_create_card.json":
+            assert cached["card1"].list_name == "To Do"
+        elif fixture.name == "03_move_card.json":
+            assert cached["card1"].list_name == "In Progress"
+            assert card_store.search(list_name="In Progress")["results"][0].id == "card1"
+        elif fixture.name == "04_archive_card.json":
+            assert "card1" not in cached
+            assert card_store.get_card("card1") is None
+        assert "card2" in cached, f"unrelated card touched by {action['type']}"
+
+def test_rejects_bad_signature(client: TestClient, replay_env):
+    """Test that a payload signed with the wrong secret is rejected."""
+    body = (FIXTURES_DIR / "01_create_card.json").read_bytes()
+    response = _post_fixture(client, body, secret="wrong_secret")
+    assert response.status_code == 401
+
+def test_head_callback(client: TestClient):
+    """Trello verifies the callback URL with a HEAD request on registration."""
+    response = client.head("/api/v1/trello/webhooks/callback")
+    assert response.status_code == 200
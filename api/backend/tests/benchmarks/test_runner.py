@@ -0,0 +1,31 @@
+from benchmarks.fixtures import make_raw_cards
+from benchmarks.runner import compare_results, measure
+
+def _results(**mins):
+    return {"results": {name: {"min": value} for name, value in mins.items()}}
+
+def test_compare_results_flags_regressions():
+    """Only benchmarks slower than baseline * (1 + threshold) are flagged; new ones are ignored."""
+    baseline = _results(parse=1.0, clean=1.0)
+    current = _results(parse=1.3, clean=1.1, new=5.0)
+
+    rows = {row["name"]: row for row in compare_results(baseline, current, threshold=0.25)}
+
+    assert set(rows) == {"parse", "clean"}
+    assert rows["parse"]["regressed"] is True
+    assert rows["clean"]["regressed"] is False
+
+def test_fixtures_are_deterministic():
+    assert make_raw_cards(20, 500) == make_raw_cards(20, 500)
+    assert len(make_raw_cards(1, 10_000)[0]["desc"]) > 10_000
+
+def test_measure_reports_per_call_time():
+    result = measure(lambda: None, repeat=2, min_time=0.001)
+    assert result["repeat"] == 2
+    assert 0 <= result["min"] <= result["median"]
+
+def test_startup_benchmark_runs_in_fresh_interpreter():
+    from benchmarks.suites import startup_benchmarks
+    benchmarks = dict(startup_benchmarks())
+    assert set(benchmarks) == {"startup_import_app", "startup_first_request"}
+    benchmarks["startup_import_app"]()()
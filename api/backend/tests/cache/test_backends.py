@@ -0,0 +1,227 @@
+import time
+from unittest.mock import patch
+import pytest
+from src.cache import MemoryBackend, decode, encode
+from src.cache.redis import RedisBackend, WatchError
+from src.cache.sqlite import SQLiteBackend
+from src.models.card import TrelloCard
+from src.services.board_cache import BoardCache
+
+class FakePipeline:
+    """Commands run at once until multi(); afterwards they are queued for execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.watched = {}
+        self.queued = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.watched = {}
+
+    def watch(self, key):
+        self.watched[key] = self.redis.data.get(key)
+
+    def unwatch(self):
+        self.watched = {}
+
+    def get(self, key):
+        return self.redis.get(key)
+
+    def multi(self):
+        self.queued = []
+
+    def set(self, key, value, px=None):
+        if self.queued is None:
+            self.queued = []
+        self.queued.append((key, value, px))
+
+    def execute(self):
+        if any(self.redis.data.get(key) is not entry for key, entry in self.watched.items()):
+            raise WatchError("watched key changed")
+        for key, value, px in self.queued or []:
+            self.redis.set(key, value, px=px)
+        self.queued = None
+
+class FakeRedis:
+    """Dict-backed stand-in for the few redis-py calls RedisBackend makes."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and time.time() >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, px=None):
+        self.data[key] = (value, time.time() + px / 1000 if px is not None else None)
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def scan_iter(self, match, count=None):
+        return [key.encode() for key in list(self.data) if key.startswith(match.rstrip("*"))]
+
+    def info(self, section):
+        return {"evicted_keys": 0, "expired_keys": 0}
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def clock(mocker):
+    now = [1_000_000.0]
+    mocker.patch("time.time", new=lambda: now[0])
+    return now
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.db"))
+    return RedisBackend(client=FakeRedis(), prefix="test")
+
+def test_encode_compresses_large_values():
+    small = {"id": "c1"}
+    large = {"text": "requirement " * 500}
+    assert decode(encode(small)) == small
+    assert encode(small).startswith(b"j")
+    assert encode(large).startswith(b"z")
+    assert len(encode(large)) < len("requirement " * 500) / 10
+    assert decode(encode(large)) == large
+
+def test_get_set_delete_and_stats(backend):
+    brd = backend.namespace("brd", ttl_seconds=60)
+    assert brd.get("k1") is None
+    brd.set("k1", "## BRD")
+    assert brd.get("k1") == "## BRD"
+    assert "k1" in brd and brd.keys() == ["k1"]
+    assert brd.delete("k1") and brd.get("k1") is None
+
+    stats = backend.stats()
+    assert stats["backend"] == backend.name
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["namespaces"]["brd"] == {"hit": 1, "miss": 2}
+
+def test_get_many_and_set_many(backend):
+    cards = backend.namespace("cards", ttl_seconds=60)
+    cards.set_many({"c1": {"name": "One"}, "c2": {"name": "Two"}})
+    assert cards.get_many(["c2", "missing", "c1"]) == [{"name": "Two"}, None, {"name": "One"}]
+    assert cards.get_many([]) == []
+    assert backend.stats()["namespaces"]["cards"] == {"hit": 2, "miss": 1}
+
+def test_compare_and_set_only_replaces_expected_value(backend):
+    boards = backend.namespace("boards", ttl_seconds=60)
+    assert not boards.compare_and_set("b1", {"card_ids": []}, {"card_ids": ["c1"]})
+    boards.set("b1", {"card_ids": []})
+    assert boards.compare_and_set("b1", {"card_ids": []}, {"card_ids": ["c1"]})
+    # A writer that read before that update must re-read, not overwrite it
+    assert not boards.compare_and_set("b1", {"card_ids": []}, {"card_ids": ["c2"]})
+    assert boards.get("b1") == {"card_ids": ["c1"]}
+
+def test_entries_expire_per_namespace_ttl(backend, clock):
+    short = backend.namespace("boards", ttl_seconds=10)
+    long = backend.namespace("brd", ttl_seconds=1000)
+    short.set("b1", {"cards": []})
+    long.set("b1", "## BRD")
+
+    clock[0] += 11
+    assert short.get("b1") is None
+    assert long.get("b1") == "## BRD"
+    assert short.keys() == []
+
+def test_namespace_size_limit_evicts_oldest(tmp_path):
+    for backend in (MemoryBackend(), SQLiteBackend(str(tmp_path / "cache.db"))):
+        brd = backend.namespace("brd", max_entries=2)
+        other = backend.namespace("boards")
+        other.set("keep", 1)
+        for key in ("a", "b", "c"):
+            brd.set(key, key)
+        assert sorted(brd.keys()) == ["b", "c"]
+        assert other.get("keep") == 1
+        assert backend.stats()["evictions"] == 1
+
+def test_sqlite_backend_is_shared_between_processes(tmp_path):
+    """Two backends on one file behave like two worker processes on one host."""
+    worker_a = BoardCache(ttl_seconds=300, backend=SQLiteBackend(str(tmp_path / "cache.db")))
+    worker_b = BoardCache(ttl_seconds=300, backend=SQLiteBackend(str(tmp_path / "cache.db")))
+    worker_a.put("board1", [TrelloCard(id="c1", name="One", description="d", board_id="board1")])
+
+    cards = worker_b.get("board1")
+    assert [card.id for card in cards] == ["c1"]
+    assert isinstance(cards[0], TrelloCard)
+
+    worker_b.upsert_card(TrelloCard(id="c2", name="Two", description="d", board_id="board1"))
+    assert [card.id for card in worker_a.get("board1")] == ["c1", "c2"]
+
+def test_concurrent_card_updates_from_two_workers_are_kept(tmp_path):
+    """Each worker read the board before the other wrote; neither update may be lost."""
+    worker_a = BoardCache(ttl_seconds=300, backend=SQLiteBackend(str(tmp_path / "cache.db")))
+    worker_b = BoardCache(ttl_seconds=300, backend=SQLiteBackend(str(tmp_path / "cache.db")))
+    worker_a.put("board1", [TrelloCard(id=f"c{i}", name="Old", description="d", board_id="board1") for i in range(1, 3)])
+    stale_index = worker_b._boards.peek("board1")
+
+    worker_a.upsert_card(TrelloCard(id="c1", name="Patched by A", description="d", board_id="board1"))
+    worker_a.upsert_card(TrelloCard(id="c3", name="Added by A", description="d", board_id="board1"))
+    # B's first attempt at indexing c4 still works from the index it read before A added c3
+    real_peek = worker_b._boards.peek
+    reads = []
+    def peek(board_id):
+        reads.append(board_id)
+        return stale_index if len(reads) == 2 else real_peek(board_id)
+    with patch.object(worker_b._boards, "peek", side_effect=peek):
+        worker_b.upsert_card(TrelloCard(id="c4", name="Added by B", description="d", board_id="board1"))
+    assert len(reads) == 3
+    worker_b.upsert_card(TrelloCard(id="c2", name="Patched by B", description="d", board_id="board1"))
+    worker_b.remove_card("c1")
+
+    cards = {card.id: card.name for card in worker_a.get("board1")}
+    assert cards == {"c2": "Patched by B", "c3": "Added by A", "c4": "Added by B"}
+
+def test_card_moved_between_boards():
+    cache = BoardCache(ttl_seconds=300)
+    cache.put("board1", [TrelloCard(id="c1", name="One", description="d", board_id="board1")])
+    cache.put("board2", [])
+    assert cache.upsert_card(TrelloCard(id="c1", name="One", description="d", board_id="board2"))
+    assert cache.get("board1") == []
+    assert [card.id for card in cache.get("board2")] == ["c1"]
+    assert not cache.upsert_card(TrelloCard(id="c9", name="Uncached", description="d", board_id="board3"))
+    assert not cache.remove_card("c9")
+
+def test_board_ids_lists_only_boards():
+    backend = RedisBackend(client=FakeRedis(), prefix="k2brd")
+    default = BoardCache(ttl_seconds=300, backend=backend)
+    tenant = BoardCache(ttl_seconds=300, backend=backend, namespace="boards:acme")
+    default.put("board1", [TrelloCard(id="c1", name="One", description="d", board_id="board1")])
+    tenant.put("board2", [TrelloCard(id="c2", name="Two", description="d", board_id="board2")])
+    assert tenant.board_ids() == ["board2"]
+    assert not any("c1" in board_id or "c2" in board_id for board_id in default.board_ids())
+
+def test_redis_backend_keys_and_expiry():
+    client = FakeRedis()
+    backend = RedisBackend(client=client, prefix="k2brd")
+    backend.namespace("brd", ttl_seconds=1.5).set("k1", "## BRD")
+    value, expires_at = client.data["k2brd:brd:k1"]
+    assert decode(value) == "## BRD"
+    assert expires_at == pytest.approx(time.time() + 1.5, abs=1)
+    assert backend.keys("brd") == ["k1"]
+
+def test_backend_errors_are_misses(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    backend.close()
+    brd = backend.namespace("brd")
+    brd.set("k1", "## BRD")
+    assert brd.get("k1") is None
+    assert backend.stats()["errors"] == 2
@@ -0,0 +1,55 @@
+import io
+import json
+from unittest.mock import MagicMock
+from src.cli.bulk_brd import CHECKPOINT_FILE, load_card_ids, run_bulk
+from src.models.card import TrelloCard
+from src.services.brd_service import BRDService
+from src.services.llm_scheduler import LLMScheduler
+from src.services.llm_service import LLMService
+from src.services.trello_service import TrelloService
+
+def _card(card_id, name):
+    return TrelloCard(id=card_id, name=name, description=f"Description of {name}", priority="High")
+
+def _brd_service(llm_service, scheduler=None):
+    return BRDService(MagicMock(spec=TrelloService), llm_service, scheduler)
+
+def test_run_bulk_writes_markdown_and_resumes(tmp_path):
+    """A failed card is checkpointed as an error and is the only one retried on the next run."""
+    cards = [_card("c1", "Add login"), _card("c2", "Fix export"), _card("c3", "Ship it")]
+    llm_service = MagicMock(spec=LLMService)
+    llm_service.generate_brd.side_effect = ["## BRD 1", Exception("LLM down"), "## BRD 3"]
+
+    summary = run_bulk(cards, _brd_service(llm_service), tmp_path, progress_stream=io.StringIO())
+
+    assert summary == {"total": 3, "skipped": 0, "generated": 2, "failed": 1}
+    markdown = (tmp_path / "c1-add-login.md").read_text()
+    assert markdown.startswith("# Add login") and "## BRD 1" in markdown
+    statuses = [json.loads(line)["status"] for line in (tmp_path / CHECKPOINT_FILE).read_text().splitlines()]
+    assert statuses == ["ok", "error", "ok"]
+
+    llm_service.generate_brd.side_effect = ["## BRD 2"]
+    summary = run_bulk(cards, _brd_service(llm_service), tmp_path, progress_stream=io.StringIO())
+
+    assert summary == {"total": 3, "skipped": 2, "generated": 1, "failed": 0}
+    assert (tmp_path / "c2-fix-export.md").exists()
+
+def test_run_bulk_with_concurrent_scheduler(tmp_path):
+    cards = [_card(f"c{i}", f"Card {i}") for i in range(6)]
+    llm_service = MagicMock(spec=LLMService)
+    llm_service.generate_brd.return_value = "## BRD"
+    scheduler = LLMScheduler(max_concurrency=3)
+    progress = io.StringIO()
+    try:
+        summary = run_bulk(cards, _brd_service(llm_service, scheduler), tmp_path, progress_stream=progress)
+    finally:
+        scheduler.stop()
+
+    assert summary["generated"] == 6
+    assert len(list(tmp_path.glob("*.md"))) == 6
+    assert progress.getvalue().splitlines()[-1].startswith("[6/6]")
+
+def test_load_card_ids(tmp_path):
+    path = tmp_path / "cards.txt"
+    path.write_text("abc123\n# comment\n\nhttps://trello.com/c/def456/12-some-card\nabc123  # duplicate\n")
+    assert load_card_ids(path) == ["abc123", "def456"]
@@ -0,0 +1,31 @@
+import logging
+import queue
+import sys
+from src.config.logging_config import LogSampler, DeferredQueueHandler
+
+def test_log_sampler_rates():
+    """Test that the sampler keeps one in every 1/rate events."""
+    for rate, expected in ((1.0, 100), (0.25, 25), (0, 0)):
+        sampler = LogSampler(rate)
+        assert sum(sampler.sample() for _ in range(100)) == expected
+
+def test_deferred_queue_handler_snapshots_args_but_does_not_format():
+    """Test that the message is merged on the caller's thread, while formatting is left to the listener."""
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    parsed = {"type": None}
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        exc_info = sys.exc_info()
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "parsed: %s", (parsed,), exc_info)
+
+    handler.handle(record)
+    parsed["type"] = "Feature"
+
+    queued = log_queue.get_nowait()
+    assert queued is record
+    assert queued.getMessage() == "parsed: {'type': None}"
+    assert queued.msg == "parsed: {'type': None}" and queued.exc_text is None
+    assert queued.exc_info is exc_info
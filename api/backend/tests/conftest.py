@@ -15,6 +15,10 @@ def set_test_environment(monkeypatch):
     monkeypatch.setenv("CLIENT_ORIGIN", "http://test.com")
     monkeypatch.setenv("PROJECT_NAME", "Test Project")
 
+# Warm-up would open real connections to Trello and the LLM host from every TestClient;
+# tests that need it inject their own steps
+os.environ.setdefault("WARMUP_ENABLED", "false")
+
 # This import must come AFTER the environment is patched
 from src.main import app
 
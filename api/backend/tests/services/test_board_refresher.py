@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import MagicMock
+from src.models.card import TrelloCard
+from src.services.board_cache import BoardCache
+from src.services.board_refresher import BoardRefresher
+from src.services.trello_service import TrelloService
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def board_cache():
+    return BoardCache(ttl_seconds=100, stale_ttl_seconds=500)
+
+@pytest.fixture
+def refresher(board_cache, clock):
+    """Fixture to create a BoardRefresher with a mocked refresh function."""
+    refresher = BoardRefresher(
+        refresh_fn=MagicMock(), board_cache=board_cache, refresh_ahead=0.8,
+        hot_window=60, min_hits=2, concurrency=1, calls_per_minute=4, clock=clock
+    )
+    yield refresher
+    refresher.stop(wait=True)
+
+def test_hot_boards_decay(refresher: BoardRefresher, clock):
+    """Test that boards become hot with repeated access and cool down over time."""
+    refresher.record_access("board1")
+    assert refresher.hot_boards() == []
+
+    refresher.record_access("board1")
+    refresher.record_access("board2")
+    assert refresher.hot_boards() == ["board1"]
+
+    clock.now += 600
+    assert refresher.hot_boards() == []
+
+def test_due_boards_refresh_ahead(refresher: BoardRefresher, board_cache: BoardCache, mocker):
+    """Test that hot boards are due once the refresh-ahead point of their TTL passes."""
+    board_cache.put("board1", [])
+    for _ in range(3):
+        refresher.record_access("board1")
+
+    mocker.patch.object(board_cache, "age", return_value=50)
+    assert refresher.due_boards() == []
+
+    board_cache.age.return_value = 85
+    assert refresher.due_boards() == ["board1"]
+
+def test_revalidate_respects_budget(refresher: BoardRefresher):
+    """Test that background refreshes stop when the Trello call budget is spent."""
+    assert refresher.revalidate("board1") is True
+    assert refresher.revalidate("board2") is True
+    # 4 calls per minute, 2 calls per board refresh
+    assert refresher.revalidate("board3") is False
+
+    refresher.stop(wait=True)
+    assert refresher.refresh_fn.call_count == 2
+    assert refresher.stats()["skipped_budget"] == 1
+
+def test_get_board_cards_serves_stale_while_revalidating(board_cache: BoardCache, mocker):
+    """Test that a stale board is returned immediately and refreshed in the background."""
+    mock_refresher = MagicMock(spec=BoardRefresher)
+    service = TrelloService(board_cache=board_cache, refresher=mock_refresher)
+    mocker.patch.object(service, "_make_request")
+    board_cache.put("board1", [TrelloCard(id="card1", name="Card 1", description="")])
+    mocker.patch.object(board_cache, "get_with_age", return_value=(board_cache.get("board1"), 150))
+
+    cards = service.get_board_cards("board1")
+
+    assert [c.id for c in cards] == ["card1"]
+    service._make_request.assert_not_called()
+    mock_refresher.record_access.assert_called_once_with("board1")
+    mock_refresher.revalidate.assert_called_once_with("board1")
@@ -0,0 +1,80 @@
+import pytest
+from src.services.brd_dedup import BRDDeduplicator, MinHasher, NearDuplicateIndex, shingles, similarity
+
+TEMPLATE = (
+    "Add an export button to the {page} page so that account managers can download the current "
+    "table as a CSV file, respecting the active filters, column order and the user's locale for "
+    "dates and numbers. The export must run in the background for large tables."
+)
+
+
+def test_minhash_estimates_similarity():
+    """Test that near-identical texts score high and unrelated texts score low."""
+    hasher = MinHasher(128)
+    a = hasher.signature(shingles(TEMPLATE.format(page="invoices")))
+    b = hasher.signature(shingles(TEMPLATE.format(page="orders")))
+    c = hasher.signature(shingles("Migrate the nightly reporting job from cron to the workflow scheduler."))
+
+    assert similarity(a, a) == 1.0
+    assert similarity(a, b) > 0.7
+    assert similarity(a, c) < 0.2
+    assert hasher.signature(set()) is None
+    assert MinHasher(128).signature(shingles(TEMPLATE)) == hasher.signature(shingles(TEMPLATE))
+
+
+def test_index_query_and_eviction():
+    """Test that the LSH index finds close signatures and forgets the oldest beyond max_entries."""
+    hasher = MinHasher(64)
+    index = NearDuplicateIndex(64, 16, max_entries=2)
+    index.add("k1", hasher.signature(shingles(TEMPLATE.format(page="invoices"))), "c1")
+    index.add("k2", hasher.signature(shingles("Something entirely different about onboarding emails")), "c2")
+
+    matches = index.query(hasher.signature(shingles(TEMPLATE.format(page="orders"))), 0.7)
+    assert [(key, value) for key, value, _ in matches] == [("k1", "c1")]
+
+    index.add("k3", hasher.signature(shingles("Third unrelated card about audit logging")), "c3")
+    assert len(index) == 2
+    assert index.query(hasher.signature(shingles(TEMPLATE.format(page="invoices"))), 0.7) == []
+
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(64, 10)
+
+
+def test_plan_groups_batch_and_past_results():
+    """Test that the first card of a group is generated and the others derive from it or from a past result."""
+    dedup = BRDDeduplicator(threshold=0.7)
+    sig = lambda page: dedup.signature(TEMPLATE.format(page=page), {"priority": "High"})
+    other = dedup.signature("Rotate the database credentials every 90 days", {})
+
+    plan = dedup.plan(
+        [("k1", "c1", sig("invoices")), ("k2", "c2", other), ("k3", "c3", sig("orders")), ("k1", "c4", sig("invoices")), ("k5", "c5", None)],
+        is_available=lambda key: False,
+    )
+
+    assert plan[0] is None and plan[1] is None and plan[4] is None
+    assert (plan[2].source_index, plan[2].source_card_id, plan[2].reuse) == (0, "c1", False)
+    # Identical inputs share a cache key and are reused verbatim
+    assert (plan[3].source_index, plan[3].reuse) == (0, True)
+
+    dedup.remember("k1", "c1", sig("invoices"))
+    later = dedup.plan([("k9", "c9", sig("orders"))], is_available=lambda key: key == "k1")
+    assert (later[0].source_index, later[0].source_key) == (None, "k1")
+    # A past BRD that is no longer cached cannot be used
+    assert dedup.plan([("k9", "c9", sig("orders"))], is_available=lambda key: False) == [None]
+
+    dedup.record_derived(reused=False)
+    stats = dedup.stats()
+    assert (stats["clusters"], stats["past_matches"], stats["adapted"], stats["indexed"]) == (2, 1, 1, 1)
+
+
+def test_past_results_are_matched_only_within_their_tenant():
+    """Test that one tenant's past BRD is never offered as the source of another tenant's card."""
+    dedup = BRDDeduplicator(threshold=0.7)
+    sig = lambda page: dedup.signature(TEMPLATE.format(page=page), {"priority": "High"})
+    dedup.remember("k1", "acme-card", sig("invoices"), tenant_id="acme")
+
+    # Even with the same cache key available in its own cache, the default tenant gets no match
+    assert dedup.plan([("k1", "c9", sig("invoices"))], is_available=lambda key: True) == [None]
+    assert dedup.plan([("k9", "c9", sig("orders"))], is_available=lambda key: True, tenant_id="beta") == [None]
+    match = dedup.plan([("k9", "c9", sig("orders"))], is_available=lambda key: True, tenant_id="acme")[0]
+    assert (match.source_key, match.source_card_id) == ("k1", "acme-card")
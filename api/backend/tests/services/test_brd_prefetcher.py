@@ -0,0 +1,64 @@
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from src.models.card import TrelloCard
+from src.services.brd_prefetcher import BRDPrefetcher
+from src.services.llm_scheduler import LLMScheduler
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+def _card(card_id, priority, hours_ago):
+    return TrelloCard(
+        id=card_id, name=card_id, description="", priority=priority,
+        last_activity=NOW - timedelta(hours=hours_ago) if hours_ago is not None else None
+    )
+
+@pytest.fixture
+def scheduler():
+    scheduler = LLMScheduler(max_concurrency=1)
+    yield scheduler
+    scheduler.stop()
+
+def _prefetcher(scheduler, generate_fn, is_cached_fn=lambda card: False, **kwargs):
+    return BRDPrefetcher(
+        generate_fn=generate_fn, is_cached_fn=is_cached_fn, scheduler=scheduler,
+        priorities=["Critical", "High"], recent_hours=24, clock=lambda: NOW, **kwargs
+    )
+
+def test_candidates_are_recent_high_priority_cards(scheduler):
+    """Test that only recently active Critical/High cards are picked, most important first."""
+    cards = [
+        _card("high-old", "High", 48),
+        _card("medium-new", "Medium", 1),
+        _card("high-new", "High", 2),
+        _card("critical-new", "Critical", 5),
+        _card("high-no-activity", "High", None),
+        _card("high-newest", "High", 1),
+    ]
+    prefetcher = _prefetcher(scheduler, MagicMock(), max_per_board=2)
+
+    assert [card.id for card in prefetcher.candidates(cards)] == ["critical-new", "high-newest"]
+
+def test_observe_board_generates_in_background(scheduler):
+    """Test that candidates are generated speculatively and cached or pending cards are skipped."""
+    done = threading.Event()
+    generated = []
+    def generate(card, cancel_token):
+        generated.append(card.id)
+        if len(generated) == 2:
+            done.set()
+    cards = [_card("a", "High", 1), _card("b", "Critical", 1), _card("cached", "High", 1)]
+    prefetcher = _prefetcher(scheduler, generate, is_cached_fn=lambda card: card.id == "cached")
+
+    assert prefetcher.observe_board("board1", cards).result(timeout=5) == 2
+    assert done.wait(5)
+
+    assert generated == ["b", "a"]
+    # Completion callbacks run just after the job returns
+    deadline = time.monotonic() + 5
+    while prefetcher.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = prefetcher.stats()
+    assert (stats["generated"], stats["already_cached"], stats["pending"]) == (2, 1, 0)
@@ -0,0 +1,30 @@
+from src.services.brd_sections import affected_sections, changed_fields, incomplete_sections, merge_sections, split_sections
+
+
+def test_merge_sections():
+    """Test that updated sections replace their originals in place and new ones are appended."""
+    base = "# BRD\n\n## Overview\nOld overview\n\n## Requirements\n1. Keep me\n\n## Timeline\nQ1\n"
+    updates = "## overview\nNew overview\n\n## Risks\nNone\n"
+
+    merged = merge_sections(base, updates)
+
+    assert merged == "# BRD\n\n## Overview\nNew overview\n\n## Requirements\n1. Keep me\n\n## Timeline\nQ1\n\n## Risks\nNone"
+    assert merge_sections(base, "") == base.rstrip()
+    assert [heading for heading, _ in split_sections(merged)[1]] == ["Overview", "Requirements", "Timeline", "Risks"]
+
+
+def test_incomplete_sections():
+    """Test that headings missing from a reply, or present but empty, are reported."""
+    reply = "## overview\nNew overview\n\n## Timeline\n\n"
+
+    assert incomplete_sections(reply, ["Overview", "Timeline", "Stakeholders"]) == ["Timeline", "Stakeholders"]
+    assert incomplete_sections(reply, ["Overview"]) == []
+
+
+def test_section_dependencies():
+    """Test that a changed input maps to the sections written from it."""
+    changed = changed_fields({"description": "d", "effort": "2d", "priority": "High"}, {"description": "d", "effort": "3d"})
+
+    assert changed == {"effort", "priority"}
+    assert affected_sections(["Overview", "Requirements", "Timeline", "Stakeholders"], changed) == ["Overview", "Timeline"]
+    assert affected_sections(["Open Questions"], {"stakeholders"}) == []
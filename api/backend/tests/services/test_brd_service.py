@@ -1,9 +1,13 @@
+import threading
+import time
 import pytest
 from unittest.mock import MagicMock
 from src.services.brd_service import BRDService
 from src.services.trello_service import TrelloService
 from src.services.llm_service import LLMService
 from src.models.card import TrelloCard
+from src.utils.cancellation import CancellationToken, GenerationCancelledError
+from src.services.llm_scheduler import LLMScheduler
 
 @pytest.fixture
 def mock_trello_service():
@@ -57,4 +61,246 @@ def test_generate_brd_for_cards_with_empty_list(brd_service: BRDService, mock_ll
     
     # Assert that the result is an empty list
     assert len(results) == 0
-    assert results == [] 
\ No newline at end of file
+    assert results == [] 
+def test_generate_brd_for_cards_cancelled(brd_service: BRDService, mock_llm_service):
+    """Test that remaining cards are skipped once the request is cancelled."""
+    token = CancellationToken()
+    cards = [TrelloCard(id=str(i), name=f"Card {i}", description="A task") for i in range(3)]
+
+    def generate(description, context, cancel_token=None):
+        cancel_token.cancel("client disconnected")
+        return "Generated BRD text."
+    mock_llm_service.generate_brd.side_effect = generate
+
+    with pytest.raises(GenerationCancelledError):
+        brd_service.generate_brd_for_cards(cards, cancel_token=token)
+
+    mock_llm_service.generate_brd.assert_called_once()
+
+def test_generate_brd_for_cards_with_scheduler(mock_trello_service, mock_llm_service):
+    """Test that scheduled generation serves priorities first but keeps result order."""
+    scheduler = LLMScheduler(max_concurrency=1)
+    service = BRDService(mock_trello_service, mock_llm_service, scheduler)
+    cards = [
+        TrelloCard(id="1", name="Low", description="low task", priority="Low"),
+        TrelloCard(id="2", name="Critical", description="critical task", priority="Critical"),
+    ]
+    release = threading.Event()
+    blocker = scheduler.submit(release.wait, 5)
+    generated = []
+
+    def generate(description, context, cancel_token=None):
+        generated.append(description)
+        return f"BRD for {description}"
+    mock_llm_service.generate_brd.side_effect = generate
+
+    results = []
+    worker = threading.Thread(target=lambda: results.extend(service.generate_brd_for_cards(cards)), daemon=True)
+    worker.start()
+    deadline = time.monotonic() + 5
+    try:
+        while scheduler.stats()["queued"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.stats()["queued"] == 2, "cards were never queued behind the blocker"
+    finally:
+        release.set()
+        worker.join(5)
+        scheduler.stop()
+
+    assert not worker.is_alive()
+    assert generated == ["critical task", "low task"]
+    assert [r["card"]["id"] for r in results] == ["1", "2"]
+
+def test_generate_brd_uses_result_cache(mock_trello_service):
+    """Test that an unchanged card is served from the BRD cache instead of the LLM."""
+    from src.services.brd_cache import BRDCache
+    llm_service = LLMService()
+    llm_service.generate_brd = MagicMock(return_value="## BRD")
+    service = BRDService(mock_trello_service, llm_service, brd_cache=BRDCache())
+    card = TrelloCard(id="c1", name="Card", description="Same text", priority="High")
+
+    assert not service.is_cached(card)
+    first = service.generate_brd_for_cards([card])
+    assert service.is_cached(card)
+    second = service.generate_brd_for_cards([card])
+
+    assert first == second
+    llm_service.generate_brd.assert_called_once()
+
+    service.generate_brd_for_cards([card.model_copy(update={"description": "Edited text"})])
+    assert llm_service.generate_brd.call_count == 2
+
+def test_generate_brd_adds_repository_context(mock_trello_service, mock_llm_service):
+    """Test that repository metadata is looked up once per batch and added to the LLM context."""
+    from src.models.repository import GitHubRepository
+    from src.services.github_service import GitHubService
+    repo = GitHubRepository(name_with_owner="acme/api", url="https://github.com/acme/api",
+                            description="Public API", default_branch="main", languages=["Python"], open_issues=4, stars=9)
+    github_service = MagicMock(spec=GitHubService)
+    github_service.get_repository.return_value = repo
+    mock_llm_service.generate_brd.return_value = "## BRD"
+    service = BRDService(mock_trello_service, mock_llm_service, github_service=github_service)
+    cards = [
+        TrelloCard(id="c1", name="One", description="d", github_repo="https://github.com/acme/api"),
+        TrelloCard(id="c2", name="Two", description="d"),
+    ]
+
+    service.generate_brd_for_cards(cards)
+
+    github_service.get_repositories.assert_called_once_with(["https://github.com/acme/api"])
+    first_context = mock_llm_service.generate_brd.call_args_list[0].args[1]
+    second_context = mock_llm_service.generate_brd.call_args_list[1].args[1]
+    assert first_context["github_repo"] == {
+        "name": "acme/api", "description": "Public API", "default_branch": "main",
+        "languages": ["Python"],
+    }
+    assert "github_repo" not in second_context
+
+def test_repository_churn_and_lookup_failures_keep_the_cache_key(mock_trello_service):
+    """Test that issue counts and a failed lookup do not change a card's BRD cache key."""
+    from src.models.repository import GitHubRepository
+    from src.services.github_service import GitHubService, GitHubServiceError
+    repo = GitHubRepository(name_with_owner="acme/api", url="https://github.com/acme/api", description="Public API", open_issues=4)
+    github_service = MagicMock(spec=GitHubService)
+    github_service.get_repository.return_value = repo
+    github_service.cached_repository.return_value = repo
+    service = BRDService(mock_trello_service, LLMService(), github_service=github_service)
+    card = TrelloCard(id="c1", name="One", description="d", github_repo="https://github.com/acme/api")
+
+    def key():
+        return service.llm_service.cache_key(*service.build_llm_inputs(card, service._repository_for(card)))
+
+    before = key()
+    github_service.get_repository.return_value = repo.model_copy(update={"open_issues": 5, "stars": 10})
+    assert key() == before
+    github_service.get_repository.side_effect = GitHubServiceError("GitHub down")
+    assert key() == before
+
+def test_generate_brd_derives_near_duplicates(mock_trello_service):
+    """Test that near-duplicate cards get one full generation and are adapted or reused from it."""
+    from src.services.brd_cache import BRDCache
+    from src.services.brd_dedup import BRDDeduplicator
+    text = ("Add an export button to the {} page so that account managers can download the current table as "
+            "a CSV file, respecting the active filters, column order and the user's locale for dates and numbers.")
+    llm_service = LLMService()
+    llm_service.generate_brd = MagicMock(return_value="## Overview\nInvoices export\n\n## Timeline\nQ1")
+    llm_service.adapt_brd = MagicMock(return_value="## Overview\nOrders export")
+    cards = [
+        TrelloCard(id="c1", name="Invoices", description=text.format("invoices"), priority="High"),
+        TrelloCard(id="c2", name="Orders", description=text.format("orders"), priority="High"),
+        TrelloCard(id="c3", name="Invoices copy", description=text.format("invoices"), priority="High"),
+    ]
+
+    for scheduler in (None, LLMScheduler(max_concurrency=2)):
+        llm_service.generate_brd.reset_mock()
+        llm_service.adapt_brd.reset_mock()
+        service = BRDService(mock_trello_service, llm_service, scheduler, brd_cache=BRDCache(),
+                             deduplicator=BRDDeduplicator(threshold=0.7))
+
+        results = service.generate_brd_for_cards(cards)
+
+        llm_service.generate_brd.assert_called_once()
+        llm_service.adapt_brd.assert_called_once()
+        assert results[0]["brd"] == "## Overview\nInvoices export\n\n## Timeline\nQ1"
+        assert results[1]["brd"] == "## Overview\nOrders export\n\n## Timeline\nQ1"
+        assert results[1]["derived_from"]["mode"] == "adapted"
+        assert results[2]["derived_from"] == {"card_id": "c1", "similarity": 1.0, "mode": "reused"}
+        # Derived BRDs land in the result cache like any other
+        assert service.is_cached(cards[1])
+        if scheduler is not None:
+            scheduler.stop()
+
+def test_derived_brd_falls_back_to_full_generation(mock_trello_service):
+    """Test that a failed adaptation still produces the card's BRD by generating it in full."""
+    from src.services.brd_cache import BRDCache
+    from src.services.brd_dedup import BRDDeduplicator
+    llm_service = LLMService()
+    llm_service.generate_brd = MagicMock(return_value="## Overview\nText")
+    llm_service.adapt_brd = MagicMock(side_effect=RuntimeError("LLM down"))
+    description = "Send a weekly digest email to every project owner listing overdue cards and blocked items"
+    cards = [
+        TrelloCard(id="c1", name="One", description=description + " for marketing"),
+        TrelloCard(id="c2", name="Two", description=description + " for sales"),
+    ]
+    service = BRDService(mock_trello_service, llm_service, brd_cache=BRDCache(), deduplicator=BRDDeduplicator(threshold=0.5))
+
+    results = service.generate_brd_for_cards(cards)
+
+    assert llm_service.generate_brd.call_count == 2
+    assert "derived_from" not in results[1]
+
+def test_card_edit_rewrites_only_affected_sections(mock_trello_service):
+    """Test that changing a card's stakeholders rewrites only the Stakeholders section."""
+    from src.services.brd_cache import BRDCache, BRDSectionStore
+    llm_service = LLMService()
+    llm_service.generate_brd = MagicMock(
+        return_value="## Overview\nExport\n\n## Requirements\n1. CSV\n\n## Stakeholders\n- Ann – PM"
+    )
+    llm_service.regenerate_sections = MagicMock(return_value="## Stakeholders\n- Ann – PM\n- Bob – Finance")
+    service = BRDService(mock_trello_service, llm_service, brd_cache=BRDCache(), section_store=BRDSectionStore())
+    card = TrelloCard(id="c1", name="Export", description="Export invoices", priority="High", stakeholders=["Ann"])
+
+    service.generate_brd_for_cards([card])
+    edited = card.model_copy(update={"stakeholders": ["Ann", "Bob"]})
+    result = service.generate_brd_for_cards([edited])[0]
+
+    llm_service.generate_brd.assert_called_once()
+    current, headings, description, context = llm_service.regenerate_sections.call_args.args
+    assert (current, headings, description, context) == (
+        "## Stakeholders\n- Ann – PM", ["Stakeholders"], None, {"stakeholders": ["Ann", "Bob"]}
+    )
+    assert result["brd"] == "## Overview\nExport\n\n## Requirements\n1. CSV\n\n## Stakeholders\n- Ann – PM\n- Bob – Finance"
+    assert service.is_cached(edited)
+
+    # When every section is affected the BRD is generated in full
+    service.generate_brd_for_cards([edited.model_copy(update={"description": "Export orders", "stakeholders": ["Cy"]})])
+    assert llm_service.generate_brd.call_count == 2
+    llm_service.regenerate_sections.assert_called_once()
+
+def test_incomplete_section_rewrite_falls_back_to_full_generation(mock_trello_service):
+    """Test that a rejected section rewrite is not merged and the BRD is generated in full."""
+    from src.services.brd_cache import BRDCache, BRDSectionStore
+    from src.services.llm_service import IncompleteRevisionError
+    llm_service = LLMService()
+    llm_service.generate_brd = MagicMock(side_effect=[
+        "## Overview\nExport\n\n## Stakeholders\n- Ann",
+        "## Overview\nExport\n\n## Stakeholders\n- Ann\n- Bob",
+    ])
+    llm_service.regenerate_sections = MagicMock(side_effect=IncompleteRevisionError("cut off"))
+    service = BRDService(mock_trello_service, llm_service, brd_cache=BRDCache(), section_store=BRDSectionStore())
+    card = TrelloCard(id="c1", name="Export", description="Export invoices", stakeholders=["Ann"])
+
+    service.generate_brd_for_cards([card])
+    result = service.generate_brd_for_cards([card.model_copy(update={"stakeholders": ["Ann", "Bob"]})])[0]
+
+    llm_service.regenerate_sections.assert_called_once()
+    assert llm_service.generate_brd.call_count == 2
+    assert result["brd"] == "## Overview\nExport\n\n## Stakeholders\n- Ann\n- Bob"
+
+
+def test_brd_state_is_scoped_to_the_tenant(mocker):
+    """Test that another tenant's BRD service neither sees the default tenant's BRDs nor uses GITHUB_TOKEN."""
+    from src.cache import MemoryBackend
+    from src.config.core import settings
+    from src.services.brd_cache import BRDCache, BRDSectionStore
+    from src.services.brd_service import get_brd_service
+    from src.services.tenants import TenantRegistry, TrelloCredentials
+    # One backend for every tenant, as with a shared cache
+    backend = MemoryBackend()
+    mocker.patch("src.services.brd_cache.get_cache_backend", return_value=backend)
+    mocker.patch("src.services.brd_service.get_brd_cache", return_value=BRDCache(backend=backend))
+    mocker.patch("src.services.brd_service.get_brd_section_store", return_value=BRDSectionStore(backend=backend))
+    mocker.patch.object(settings, "BRD_CACHE_ENABLED", True)
+    mocker.patch.object(settings, "BRD_INCREMENTAL_ENABLED", True)
+    mocker.patch.object(settings, "GITHUB_ENRICH_ENABLED", True)
+    registry = TenantRegistry(TrelloCredentials("default-key", "default-token"), {"acme": TrelloCredentials("k", "t")})
+    default = get_brd_service(TrelloService(tenant=registry.default()), LLMService(), None)
+    acme = get_brd_service(TrelloService(tenant=registry.for_tenant("acme")), LLMService(), None)
+    card = TrelloCard(id="c1", name="One", description="Export invoices")
+    key = default.llm_service.cache_key(*default.build_llm_inputs(card))
+    default.brd_cache.put(key, "## Overview\nDefault tenant's BRD")
+    default.section_store.put(card.id, key, "Export invoices", {}, "## Overview\nDefault tenant's BRD")
+
+    assert default.is_cached(card) and not acme.is_cached(card)
+    assert acme.section_store.get(card.id) is None
+    assert default.github_service is not None and acme.github_service is None
@@ -0,0 +1,48 @@
+import pytest
+from src.config.core import settings
+from src.services import card_parser
+from src.services.card_parser import parse_cards, shutdown_parse_pool
+
+def _raw_cards(count):
+    return [
+        (
+            {
+                "id": f"card{i}",
+                "name": f"Card {i}",
+                "idList": "list1",
+                "idBoard": "board1",
+                "desc": f"**Project:** Project {i % 3}\n**Stakeholders:** Team {i}\n\nBody of card {i}",
+                "labels": [{"name": "High"}] if i % 2 else [],
+            },
+            "To Do",
+        )
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    monkeypatch.setattr(settings, "PARSE_POOL_WORKERS", 2)
+    monkeypatch.setattr(settings, "PARSE_POOL_CHUNK_SIZE", 7)
+    yield
+    shutdown_parse_pool()
+
+def test_parallel_parse_matches_in_process(small_pool):
+    """Sharded parsing returns the same cards, in the same order, as the in-process path."""
+    raw_cards = _raw_cards(50)
+
+    serial = parse_cards(raw_cards, parallel=False)
+    parallel = parse_cards(raw_cards, parallel=True)
+
+    assert [card.model_dump() for card in parallel] == [card.model_dump() for card in serial]
+
+def test_parse_cards_threshold(monkeypatch, mocker):
+    """Only batches at or above the threshold go to the pool."""
+    monkeypatch.setattr(settings, "PARSE_POOL_THRESHOLD", 10)
+    get_pool = mocker.patch.object(card_parser, "get_parse_pool")
+
+    assert len(parse_cards(_raw_cards(9))) == 9
+    get_pool.assert_not_called()
+
+    get_pool.return_value.map.side_effect = lambda fn, chunks: map(fn, chunks)
+    assert len(parse_cards(_raw_cards(10))) == 10
+    get_pool.assert_called_once()
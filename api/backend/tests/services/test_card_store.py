@@ -0,0 +1,65 @@
+import pytest
+from datetime import datetime
+from src.services.card_store import CardStore
+from src.models.card import TrelloCard
+
+@pytest.fixture
+def card_store():
+    """Fixture to create an in-memory CardStore."""
+    return CardStore(":memory:")
+
+@pytest.fixture
+def sample_cards():
+    """Fixture with a small board worth of parsed cards."""
+    return [
+        TrelloCard(id="1", name="Login page", description="Build the OAuth login flow",
+                   list_name="To Do", project="Portal", priority="High", type="Feature",
+                   stakeholders=["Alice", "Bob"], due_date=datetime(2025, 3, 1)),
+        TrelloCard(id="2", name="Fix crash", description="App crashes on logout",
+                   list_name="In Progress", project="Portal", priority="Critical", type="Bug",
+                   stakeholders=["Carol"]),
+        TrelloCard(id="3", name="Quarterly report", description="Compile metrics",
+                   list_name="To Do", project="Finance", priority="Low", type="Task",
+                   due_date=datetime(2025, 6, 1)),
+    ]
+
+def test_replace_board_cards_and_search(card_store: CardStore, sample_cards):
+    """Test that mirrored cards can be found through full-text search."""
+    card_store.replace_board_cards("board1", sample_cards)
+
+    found = card_store.search(query="oauth")
+    assert found["total"] == 1
+    assert found["results"][0].id == "1"
+    assert found["results"][0].board_id == "board1"
+
+    # Prefix match on the last term and stakeholder indexing
+    assert [c.id for c in card_store.search(query="caro")["results"]] == ["2"]
+
+def test_search_filters(card_store: CardStore, sample_cards):
+    """Test the structured filters on the mirror."""
+    card_store.replace_board_cards("board1", sample_cards)
+
+    assert card_store.search(project="portal")["total"] == 2
+    assert [c.id for c in card_store.search(priority="Critical")["results"]] == ["2"]
+    assert [c.id for c in card_store.search(list_name="To Do", type="Task")["results"]] == ["3"]
+    assert [c.id for c in card_store.search(due_before=datetime(2025, 4, 1))["results"]] == ["1"]
+
+def test_replace_board_cards_removes_stale(card_store: CardStore, sample_cards):
+    """Test that a new snapshot drops cards no longer on the board."""
+    card_store.replace_board_cards("board1", sample_cards)
+    card_store.replace_board_cards("board1", sample_cards[:1])
+
+    assert card_store.search()["total"] == 1
+    assert card_store.search(query="crash")["total"] == 0
+
+def test_sync_status(card_store: CardStore, sample_cards):
+    """Test that sync status reports per-board freshness."""
+    assert card_store.get_sync_status()["last_synced_at"] is None
+
+    card_store.replace_board_cards("board1", sample_cards)
+    status = card_store.get_sync_status()
+
+    assert status["total_cards"] == 3
+    assert status["boards"][0]["board_id"] == "board1"
+    assert status["boards"][0]["card_count"] == 3
+    assert status["boards"][0]["age_seconds"] >= 0
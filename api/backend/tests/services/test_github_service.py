@@ -0,0 +1,175 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.services.github_service import GitHubService, GitHubServiceError, parse_repo_url
+
+class StandInGitHub:
+    """Minimal local GitHub: GraphQL repository lookups and ETag-aware REST repos."""
+
+    def __init__(self):
+        self.repos = {
+            ("acme", "api"): {"description": "Public API", "version": 1},
+            ("acme", "web"): {"description": "Web app", "version": 1},
+        }
+        self.graphql_queries = []
+        self.rest_requests = []
+
+    def etag(self, key):
+        return f'"{key[0]}-{key[1]}-v{self.repos[key]["version"]}"'
+
+    def node(self, key):
+        repo = self.repos[key]
+        return {
+            "nameWithOwner": f"{key[0]}/{key[1]}",
+            "url": f"https://github.com/{key[0]}/{key[1]}",
+            "description": repo["description"],
+            "defaultBranchRef": {"name": "main"},
+            "languages": {"nodes": [{"name": "Python"}, {"name": "TypeScript"}]},
+            "issues": {"totalCount": 7},
+            "stargazerCount": 3,
+            "isArchived": False,
+            "pushedAt": "2024-05-01T00:00:00Z",
+        }
+
+    def handler(self):
+        github = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=None, headers=None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                variables = request["variables"]
+                github.graphql_queries.append(variables)
+                data, errors = {}, []
+                for index in range(len(variables) // 2):
+                    key = (variables[f"owner{index}"], variables[f"name{index}"])
+                    if key in github.repos:
+                        data[f"r{index}"] = github.node(key)
+                    else:
+                        data[f"r{index}"] = None
+                        errors.append({"type": "NOT_FOUND", "message": f"Could not resolve {key}"})
+                self._send(200, {"data": data, "errors": errors} if errors else {"data": data})
+
+            def do_GET(self):
+                _, _, owner, name = self.path.split("/")
+                key = (owner, name)
+                github.rest_requests.append((key, self.headers.get("If-None-Match")))
+                if key not in github.repos:
+                    return self._send(404, {"message": "Not Found"})
+                etag = github.etag(key)
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, headers={"ETag": etag})
+                node = github.node(key)
+                self._send(200, {
+                    "full_name": node["nameWithOwner"],
+                    "description": node["description"],
+                    "default_branch": "main",
+                    "stargazers_count": node["stargazerCount"],
+                    "archived": node["isArchived"],
+                    "pushed_at": node["pushedAt"],
+                }, headers={"ETag": etag})
+
+        return Handler
+
+@pytest.fixture
+def github():
+    stand_in = StandInGitHub()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stand_in.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stand_in.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield stand_in
+    server.shutdown()
+    server.server_close()
+
+def test_parse_repo_url():
+    assert parse_repo_url("https://github.com/Acme/API.git") == ("acme", "api")
+    assert parse_repo_url("see https://github.com/acme/web/tree/main/src, thanks") == ("acme", "web")
+    assert parse_repo_url("https://gitlab.com/acme/api") is None
+    assert parse_repo_url(None) is None
+
+def test_batches_and_deduplicates_lookups(github):
+    """Repositories shared by cards are fetched once, all in a single GraphQL query."""
+    service = GitHubService(api_url=github.url, token="t")
+    urls = [
+        "https://github.com/acme/api",
+        "https://github.com/Acme/api.git",
+        "https://github.com/acme/web",
+        "https://github.com/acme/gone",
+        "https://example.com/not-github",
+    ]
+
+    repos = service.get_repositories(urls)
+
+    assert len(github.graphql_queries) == 1
+    assert len(github.graphql_queries[0]) == 6  # three unique repos, owner + name each
+    assert repos["https://github.com/acme/api"].description == "Public API"
+    assert repos["https://github.com/Acme/api.git"] is repos["https://github.com/acme/api"]
+    assert repos["https://github.com/acme/web"].languages == ["Python", "TypeScript"]
+    assert repos["https://github.com/acme/gone"] is None
+    assert "https://example.com/not-github" not in repos
+
+    # Fresh cache entries (including "not found") cost nothing
+    service.get_repositories(urls)
+    assert len(github.graphql_queries) == 1 and not github.rest_requests
+
+def test_stale_entries_revalidate_with_etag(github):
+    """Unchanged repositories are confirmed by a 304; only changed ones are re-queried."""
+    service = GitHubService(api_url=github.url, token="t", ttl_seconds=-1)
+    url = "https://github.com/acme/api"
+    service.get_repository(url)
+
+    # First revalidation takes the ETag from a plain GET; the payload matches, so no re-query
+    service.get_repository(url)
+    assert github.rest_requests[-1] == (("acme", "api"), None)
+    assert len(github.graphql_queries) == 1
+
+    service.get_repository(url)
+    assert github.rest_requests[-1] == (("acme", "api"), '"acme-api-v1"')
+    assert len(github.graphql_queries) == 1
+
+    github.repos[("acme", "api")].update(description="Public API v2", version=2)
+    assert service.get_repository(url).description == "Public API v2"
+    assert len(github.graphql_queries) == 2
+
+def test_failed_lookups_are_not_retried_during_cooldown():
+    """An unreachable GitHub costs one request per cooldown, not one per lookup."""
+    service = GitHubService(api_url="http://127.0.0.1:9", token="t", timeout=1)
+    urls = ["https://github.com/acme/api", "https://github.com/acme/web"]
+
+    with pytest.raises(GitHubServiceError):
+        service.get_repositories(urls)
+    calls = []
+    service.session.post = lambda *args, **kwargs: calls.append(args)
+
+    assert service.get_repositories(urls) == {url: None for url in urls}
+    assert service.get_repository(urls[0]) is None
+    assert calls == []
+    assert service.cached_repository(urls[0]) is None
+
+def test_failed_revalidation_keeps_entry_until_cooldown(github):
+    """A stale entry whose revalidation fails keeps serving and is not re-checked on every lookup."""
+    service = GitHubService(api_url=github.url, token="t", ttl_seconds=3600)
+    url = "https://github.com/acme/api"
+    service.get_repository(url)
+    service._cache[("acme", "api")].fetched_at -= 7200
+    service.api_url = "http://127.0.0.1:9"
+
+    assert service.get_repository(url).description == "Public API"
+    service.api_url = github.url
+    assert service.get_repository(url).description == "Public API"
+    assert not github.rest_requests
+    assert service.cached_repository("https://github.com/Acme/API.git").description == "Public API"
@@ -0,0 +1,138 @@
+import threading
+import pytest
+from src.services.llm_scheduler import LLMScheduler, priority_rank
+from src.utils.cancellation import CancellationToken, GenerationCancelledError
+
+@pytest.fixture
+def scheduler():
+    """Fixture to create a single-slot LLMScheduler."""
+    scheduler = LLMScheduler(max_concurrency=1)
+    yield scheduler
+    scheduler.stop()
+
+def _block(scheduler: LLMScheduler):
+    """Occupy the only slot until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+    def hold():
+        started.set()
+        release.wait(5)
+    future = scheduler.submit(hold, user="blocker")
+    started.wait(5)
+    return release, future
+
+def test_priority_rank():
+    """Test that priority labels rank Critical first and unknowns before Low."""
+    assert priority_rank("Critical") < priority_rank("high") < priority_rank("Medium")
+    assert priority_rank("Medium") < priority_rank(None) < priority_rank("Low")
+
+def test_orders_by_class_then_priority(scheduler: LLMScheduler):
+    """Test that interactive work precedes bulk work and higher priorities go first."""
+    release, _ = _block(scheduler)
+    order = []
+    jobs = [
+        ("bulk", "Critical", "bulk-critical"),
+        ("interactive", "Low", "interactive-low"),
+        ("interactive", "Critical", "interactive-critical"),
+        ("interactive", "High", "interactive-high"),
+    ]
+    futures = [
+        scheduler.submit(order.append, name, priority=priority, request_class=request_class)
+        for request_class, priority, name in jobs
+    ]
+    assert scheduler.stats()["queued"] == 4
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == ["interactive-critical", "interactive-high", "interactive-low", "bulk-critical"]
+
+def test_fair_share_between_users(scheduler: LLMScheduler):
+    """Test that one user's large batch is interleaved with another user's work."""
+    release, _ = _block(scheduler)
+    order = []
+    futures = [scheduler.submit(order.append, f"a{i}", user="alice", priority="High") for i in range(4)]
+    futures += [scheduler.submit(order.append, f"b{i}", user="bob", priority="High") for i in range(2)]
+    assert scheduler.stats()["queued_by_user"] == {"alice": 4, "bob": 2}
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+def test_high_priority_batch_does_not_starve_other_users(scheduler: LLMScheduler):
+    """Test that fair share applies before priority, so one user's Critical batch cannot starve another's Low card."""
+    release, _ = _block(scheduler)
+    order = []
+    futures = [scheduler.submit(order.append, f"a{i}", user="alice", priority="Critical") for i in range(6)]
+    futures.append(scheduler.submit(order.append, "b0", user="bob", priority="Low"))
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    # Low costs 8x Critical in virtual time, so bob waits behind a bounded share of alice's batch
+    assert order.index("b0") < len(order) - 1
+    assert order.index("b0") <= 1
+
+def test_finished_jobs_release_scheduler_state(scheduler: LLMScheduler):
+    """Test that idle users' tags are pruned and cancel callbacks are unregistered once jobs finish."""
+    token = CancellationToken()
+    for i in range(3):
+        scheduler.submit(lambda: None, user=f"user{i}", cancel_token=token).result(timeout=5)
+    scheduler.submit(lambda: None, user="last").result(timeout=5)
+
+    assert token._callbacks == []
+    assert scheduler._user_tags == {}
+
+def test_cancel_queued_job(scheduler: LLMScheduler):
+    """Test that cancelling a token drops its queued jobs without running them."""
+    release, _ = _block(scheduler)
+    token = CancellationToken()
+    ran = []
+    future = scheduler.submit(ran.append, "x", cancel_token=token)
+
+    token.cancel("client disconnected")
+    release.set()
+
+    with pytest.raises(GenerationCancelledError):
+        future.result(timeout=5)
+    assert scheduler.submit(lambda: "after").result(timeout=5) == "after"
+    assert ran == []
+    assert scheduler.stats()["queued"] == 0
+
+def test_speculative_jobs_wait_for_idle(scheduler: LLMScheduler):
+    """Test that a speculative job does not start while other work is running."""
+    release, blocker = _block(scheduler)
+    token = CancellationToken()
+    speculative = scheduler.submit(lambda: "done", request_class="speculative", cancel_token=token)
+
+    assert not speculative.done()
+    assert scheduler.idle() is False
+    release.set()
+    assert speculative.result(timeout=5) == "done"
+
+def test_speculative_job_preempted_by_interactive(scheduler: LLMScheduler):
+    """Test that submitting interactive work cancels a running speculative job."""
+    token = CancellationToken()
+    started, cancelled = threading.Event(), threading.Event()
+    token.register(cancelled.set)
+    def speculate():
+        started.set()
+        cancelled.wait(5)
+        token.raise_if_cancelled()
+    speculative = scheduler.submit(speculate, request_class="speculative", cancel_token=token)
+    started.wait(5)
+
+    interactive = scheduler.submit(lambda: "answer")
+
+    with pytest.raises(GenerationCancelledError):
+        speculative.result(timeout=5)
+    assert token.reason == "pre-empted"
+    assert interactive.result(timeout=5) == "answer"
+
+def test_speculative_job_requires_token(scheduler: LLMScheduler):
+    with pytest.raises(ValueError):
+        scheduler.submit(lambda: None, request_class="speculative")
@@ -1,16 +1,23 @@
 import pytest
+import requests
 from unittest.mock import patch
-from src.services.llm_service import LLMService
+from src.config.core import settings
+from src.services.llm_service import IncompleteRevisionError, LLMService, LLMTimeoutError
+from src.services.token_budget import TokenBudget
+from src.utils.cancellation import CancellationToken, GenerationCancelledError
+from src.utils.metrics import metrics
+
 
 @pytest.fixture
 def llm_service():
     """Fixture to create an LLMService instance."""
     return LLMService()
 
-@patch('src.services.llm_service.requests')
-def test_generate_brd(mock_requests, llm_service: LLMService):
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_generate_brd(mock_post, llm_service: LLMService):
     """Test the successful generation of a BRD."""
-    mock_response = mock_requests.post.return_value
+    mock_response = mock_post.return_value
     mock_response.status_code = 200
     mock_response.json.return_value = {
         "choices": [{"message": {"content": "This is a generated BRD."}}]
@@ -20,20 +27,200 @@ def test_generate_brd(mock_requests, llm_service: LLMService):
     brd = llm_service.generate_brd("Test task", {})
 
     assert brd == "This is a generated BRD."
-    mock_requests.post.assert_called_once()
+    mock_post.assert_called_once()
 
-@patch('src.services.llm_service.requests')
-def test_is_available_success(mock_requests, llm_service: LLMService):
+
+@patch('src.services.llm_service.requests.Session.get')
+def test_is_available_success(mock_get, llm_service: LLMService):
     """Test the is_available check when the service is up."""
-    mock_response = mock_requests.get.return_value
+    mock_response = mock_get.return_value
     mock_response.status_code = 200
 
     assert llm_service.is_available() is True
-    mock_requests.get.assert_called_once_with(f"{llm_service.host}/v1/models")
+    mock_get.assert_called_once_with(f"{llm_service.host}/v1/models")
+
 
-@patch('src.services.llm_service.requests')
-def test_is_available_failure(mock_requests, llm_service: LLMService):
+@patch('src.services.llm_service.requests.Session.get')
+def test_is_available_failure(mock_get, llm_service: LLMService):
     """Test the is_available check when the service is down."""
-    mock_requests.get.side_effect = Exception("Connection error")
+    mock_get.side_effect = requests.exceptions.ConnectionError("Connection error")
+
+    assert llm_service.is_available() is False
+
+
+def _sse_response(mock_post, chunks):
+    """Configure a mocked streaming chat completion response."""
+    mock_response = mock_post.return_value
+    mock_response.headers = {"Content-Type": "text/event-stream"}
+    mock_response.raise_for_status.return_value = None
+    lines = [f'data: {{"choices": [{{"delta": {{"content": "{c}"}}}}]}}' for c in chunks] + ["data: [DONE]"]
+    mock_response.iter_lines.return_value = iter(lines)
+    return mock_response
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_generate_brd_streaming(mock_post, llm_service: LLMService):
+    """Test that a streamed completion is reassembled and timeouts are passed upstream."""
+    _sse_response(mock_post, ["## Overview", "\\n- Item"])
+
+    brd = llm_service.generate_brd("Test task", {})
+
+    assert brd == "## Overview\n- Item"
+    kwargs = mock_post.call_args.kwargs
+    assert kwargs["stream"] is True
+    assert kwargs["json"]["stream"] is True
+    assert kwargs["timeout"] == (settings.LLM_CONNECT_TIMEOUT, settings.LLM_FIRST_TOKEN_TIMEOUT)
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_generate_brd_already_cancelled(mock_post, llm_service: LLMService):
+    """Test that a cancelled token prevents the upstream call entirely."""
+    token = CancellationToken()
+    token.cancel("client disconnected")
+
+    with pytest.raises(GenerationCancelledError):
+        llm_service.generate_brd("Test task", {}, cancel_token=token)
+    mock_post.assert_not_called()
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_generate_brd_cancelled_mid_stream(mock_post, llm_service: LLMService):
+    """Test that cancelling during a stream aborts the upstream response."""
+    token = CancellationToken()
+    mock_response = _sse_response(mock_post, [])
+
+    def lines():
+        yield 'data: {"choices": [{"delta": {"content": "partial"}}]}'
+        token.cancel("client disconnected")
+        yield 'data: {"choices": [{"delta": {"content": "never read"}}]}'
+    mock_response.iter_lines.return_value = lines()
+    before = metrics.get_counter("llm_requests_total", outcome="cancelled")
+
+    with pytest.raises(GenerationCancelledError):
+        llm_service.generate_brd("Test task", {}, cancel_token=token)
+
+    assert mock_response.close.called
+    assert metrics.get_counter("llm_requests_total", outcome="cancelled") == before + 1
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_generate_brd_timeout(mock_post, llm_service: LLMService):
+    """Test that an upstream read timeout surfaces as LLMTimeoutError and is counted."""
+    mock_post.side_effect = requests.exceptions.ReadTimeout("no first token")
+    before = metrics.get_counter("llm_requests_total", outcome="timeout")
+
+    with pytest.raises(LLMTimeoutError):
+        llm_service.generate_brd("Test task", {})
+
+    assert metrics.get_counter("llm_requests_total", outcome="timeout") == before + 1
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_generate_brd_stops_after_final_section(mock_post, llm_service: LLMService):
+    """Test that the stream keeps the open questions after Stakeholders and is abandoned at the next heading."""
+    mock_response = _sse_response(mock_post, [])
+    read = []
+    chunks = [
+        "## Overview\\n- A\\n", "## Stake", "holders\\n- Ann - PM\\n", "\\n***Note:*** roles TBD\\n---\\n",
+        "\\n## Open", " Questions\\n- when?\\n", "\\n## Appen", "dix\\n", "surplus",
+    ]
+    def lines():
+        for chunk in chunks:
+            read.append(chunk)
+            yield f'data: {{"choices": [{{"delta": {{"content": "{chunk}"}}}}]}}'
+    mock_response.iter_lines.return_value = lines()
+
+    brd = llm_service.generate_brd("Test task", {})
+
+    assert brd == "## Overview\n- A\n## Stakeholders\n- Ann - PM\n\n***Note:*** roles TBD\n---\n\n## Open Questions\n- when?"
+    assert len(read) == 8
+    assert mock_response.close.called
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_generate_brd_does_not_trim_complete_response(mock_post, llm_service: LLMService):
+    """Test that a non-streamed completion is returned whole: it has been generated already, so cutting saves nothing."""
+    content = "## Overview\n- A\n\n## Stakeholders\n- **Ann** - PM\n\n***Note:*** TBD\n\n## Open Questions\n- when?\n\n# Appendix\nx"
+    mock_post.return_value.headers = {"Content-Type": "application/json"}
+    mock_post.return_value.raise_for_status.return_value = None
+    mock_post.return_value.json.return_value = {"choices": [{"message": {"content": content}, "finish_reason": "stop"}]}
+
+    assert llm_service.generate_brd("Test task", {}) == content
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_generate_brd_retries_truncated_output(mock_post):
+    """Test that a completion cut off at max_tokens is retried with a larger budget and learned from."""
+    budget = TokenBudget(default_tokens=1000, ceiling_tokens=4000, min_samples=1)
+    llm_service = LLMService(token_budget=budget)
+    responses = [
+        {"choices": [{"message": {"content": "## Overview"}, "finish_reason": "length"}], "usage": {"completion_tokens": 1000}},
+        {"choices": [{"message": {"content": "## Overview\n## Stakeholders"}, "finish_reason": "stop"}], "usage": {"completion_tokens": 1500}},
+    ]
+    mock_post.return_value.headers = {"Content-Type": "application/json"}
+    mock_post.return_value.json.side_effect = responses
+
+    brd = llm_service.generate_brd("Test task", {"type": "Feature", "effort": "M"})
+
+    assert brd == "## Overview\n## Stakeholders"
+    assert [c.kwargs["json"]["max_tokens"] for c in mock_post.call_args_list] == [1000, 2000]
+    assert budget.max_tokens(("feature", "m")) == 1950
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_adapt_brd(mock_post, llm_service: LLMService):
+    """Test that adaptation sends the existing BRD with a short token budget and returns the changed sections."""
+    mock_post.return_value.headers = {"Content-Type": "application/json"}
+    mock_post.return_value.raise_for_status.return_value = None
+    mock_post.return_value.json.return_value = {"choices": [{"message": {"content": "## Timeline\nQ2"}}]}
+
+    updates = llm_service.adapt_brd("## Overview\nExisting\n\n## Timeline\nQ1", "Task", {"priority": "High"})
+
+    assert updates == "## Timeline\nQ2"
+    payload = mock_post.call_args.kwargs["json"]
+    assert payload["max_tokens"] == settings.BRD_DEDUP_ADAPT_MAX_TOKENS
+    assert "## Overview\nExisting" in payload["messages"][0]["content"]
+    assert payload["messages"][0]["content"].endswith("Task: Task")
+
+
+@pytest.mark.parametrize("choice", [
+    {"message": {"content": "## Timeline\nQ2 with a long expl"}, "finish_reason": "length"},
+    {"message": {"content": "Only Q2 changes."}, "finish_reason": "stop"},
+    {"message": {"content": "## Timeline\n"}, "finish_reason": "stop"},
+])
+@patch('src.services.llm_service.requests.Session.post')
+def test_adapt_brd_rejects_incomplete_reply(mock_post, llm_service: LLMService, choice):
+    """Test that a cut-off or section-less adaptation is rejected rather than merged."""
+    mock_post.return_value.headers = {"Content-Type": "application/json"}
+    mock_post.return_value.raise_for_status.return_value = None
+    mock_post.return_value.json.return_value = {"choices": [choice]}
+
+    with pytest.raises(IncompleteRevisionError):
+        llm_service.adapt_brd("## Overview\nExisting\n\n## Timeline\nQ1", "Task", {})
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_regenerate_sections(mock_post, llm_service: LLMService):
+    """Test that a section rewrite names the sections, sizes max_tokens per section and can omit the task text."""
+    mock_post.return_value.headers = {"Content-Type": "application/json"}
+    mock_post.return_value.raise_for_status.return_value = None
+    mock_post.return_value.json.return_value = {"choices": [{"message": {"content": "## Stakeholders\n- Bob"}}]}
+
+    updates = llm_service.regenerate_sections("## Stakeholders\n- Ann", ["Stakeholders"], None, {"stakeholders": ["Bob"]})
+
+    assert updates == "## Stakeholders\n- Bob"
+    payload = mock_post.call_args.kwargs["json"]
+    assert payload["max_tokens"] == settings.BRD_SECTION_MAX_TOKENS
+    content = payload["messages"][0]["content"]
+    assert "## Stakeholders\n- Ann" in content and "Task:" not in content
+
+
+@patch('src.services.llm_service.requests.Session.post')
+def test_regenerate_sections_requires_every_heading(mock_post, llm_service: LLMService):
+    """Test that a section rewrite missing one of the requested headings is rejected."""
+    mock_post.return_value.headers = {"Content-Type": "application/json"}
+    mock_post.return_value.raise_for_status.return_value = None
+    mock_post.return_value.json.return_value = {"choices": [{"message": {"content": "## Overview\nNew"}}]}
 
-    assert llm_service.is_available() is False 
\ No newline at end of file
+    with pytest.raises(IncompleteRevisionError, match="Timeline"):
+        llm_service.regenerate_sections("## Overview\nOld\n\n## Timeline\nQ1", ["Overview", "Timeline"], "Task", {})
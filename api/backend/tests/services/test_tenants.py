@@ -0,0 +1,113 @@
+import json
+import pytest
+from fastapi import HTTPException
+from src.config.core import settings
+from src.models.card import TrelloCard
+from src.services import tenants
+from src.services.tenants import TenantRegistry, TrelloCredentials, get_request_tenant
+from src.services.trello_service import TrelloRateLimitError, create_trello_service
+
+DEFAULT = TrelloCredentials("default-key", "default-token")
+
+@pytest.fixture
+def clock():
+    return [0.0]
+
+@pytest.fixture
+def registry(clock):
+    return TenantRegistry(
+        default_credentials=DEFAULT,
+        tenants={"acme": TrelloCredentials("acme-key", "acme-token")},
+        secrets={"acme": "acme-secret"},
+        idle_ttl_seconds=100,
+        calls_per_10s=2,
+        clock=lambda: clock[0],
+    )
+
+def test_tenants_are_isolated(registry: TenantRegistry):
+    """Each tenant gets its own connection pool, call budget and board cache namespace."""
+    default = registry.default()
+    acme = registry.for_tenant("acme")
+    caller = registry.for_credentials(TrelloCredentials("their-key", "their-token"))
+
+    assert acme.auth_params == {"key": "acme-key", "token": "acme-token"}
+    assert len({id(default.session), id(acme.session), id(caller.session)}) == 3
+    assert acme.budget is not caller.budget
+    assert caller.tenant_id.startswith("key-") and "their-token" not in caller.tenant_id
+    assert registry.for_credentials(TrelloCredentials("their-key", "their-token")) is caller
+    assert registry.for_credentials(DEFAULT) is default
+
+    card = TrelloCard(id="c1", name="Acme card", description="d", board_id="board1")
+    acme.board_cache.put("board1", [card])
+    assert caller.board_cache.get("board1") is None
+    assert default.board_cache.get("board1") is None
+
+def test_idle_tenants_are_evicted(registry: TenantRegistry, clock):
+    acme = registry.for_tenant("acme")
+    acme.board_cache.put("board1", [TrelloCard(id="c1", name="Card", description="d")])
+    registry.default()
+
+    clock[0] = 60
+    caller = registry.for_credentials(TrelloCredentials("their-key", "their-token"))
+    clock[0] = 120
+    caller.touch()
+
+    assert registry.evict_idle() == [acme.tenant_id]
+    assert set(registry.stats()["tenants"]) == {"default", caller.tenant_id}
+    # A returning tenant starts from scratch
+    assert registry.for_tenant("acme") is not acme
+    assert registry.for_tenant("acme").board_cache.get("board1") is None
+
+def test_unknown_tenant_is_rejected(registry: TenantRegistry):
+    with pytest.raises(tenants.UnknownTenantError):
+        registry.for_tenant("nobody")
+
+def test_tenants_file_needs_a_secret_per_tenant(tmp_path):
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps({"acme": {"api_key": "k", "token": "t", "secret": "s"}, "beta": {"api_key": "k", "token": "t"}}))
+    with pytest.raises(ValueError, match="beta"):
+        tenants._load_tenants(str(path))
+
+    path.write_text(json.dumps({"acme": {"api_key": "k", "token": "t", "secret": "s"}}))
+    assert tenants._load_tenants(str(path)) == ({"acme": TrelloCredentials("k", "t")}, {"acme": "s"})
+
+def test_budget_is_split_between_workers(mocker):
+    """Each worker process gets its share of Trello's per-token limit."""
+    mocker.patch.object(settings, "TRELLO_CALLS_PER_10S", 100)
+    mocker.patch.object(settings, "WEB_CONCURRENCY", 4)
+    tenants.get_tenant_registry.cache_clear()
+    try:
+        assert tenants.get_tenant_registry().default().budget.capacity == 25
+    finally:
+        tenants.get_tenant_registry.cache_clear()
+
+def test_request_tenant_from_headers(registry: TenantRegistry, mocker):
+    mocker.patch.object(tenants, "get_tenant_registry", return_value=registry)
+
+    assert get_request_tenant(None, None, None, None).is_default
+    assert get_request_tenant(None, None, "acme", "acme-secret").tenant_id == "acme"
+    assert get_request_tenant("k", "t", "acme", None).credentials == TrelloCredentials("k", "t")
+    for tenant_id, secret in (("nobody", "acme-secret"), ("acme", None), ("acme", "wrong"), ("default", "")):
+        with pytest.raises(HTTPException) as rejected:
+            get_request_tenant(None, None, tenant_id, secret)
+        assert rejected.value.status_code == 401
+    with pytest.raises(HTTPException) as partial:
+        get_request_tenant("k", None, None, None)
+    assert partial.value.status_code == 400
+
+def test_tenant_service_uses_its_own_budget_and_credentials(registry: TenantRegistry, mocker):
+    """Non-default tenants skip the shared store and refresher, and fail fast once their budget is spent."""
+    mocker.patch.object(settings, "TRELLO_RATE_WAIT", 0)
+    acme = registry.for_tenant("acme")
+    service = create_trello_service(acme)
+    request = mocker.patch.object(acme.session, "request")
+    request.return_value.json.return_value = []
+
+    assert service.card_store is None and service.refresher is None
+    assert service.board_cache is acme.board_cache
+    service.get_boards()
+    service.get_boards()
+    assert request.call_args.kwargs["params"] == {"key": "acme-key", "token": "acme-token"}
+    with pytest.raises(TrelloRateLimitError):
+        service.get_boards()
+    assert request.call_count == 2
@@ -0,0 +1,33 @@
+from src.services.token_budget import TokenBudget
+
+def test_default_until_enough_samples():
+    """Test that the static default applies until min_samples completions are seen."""
+    budget = TokenBudget(default_tokens=2500, min_samples=3)
+    key = TokenBudget.key({"type": "Bug", "effort": "S"})
+    budget.record(key, 400)
+    budget.record(key, 500)
+
+    assert budget.max_tokens(key) == 2500
+
+def test_budget_follows_observed_lengths_with_headroom():
+    """Test that the budget is a high percentile of observed lengths plus headroom, clamped."""
+    budget = TokenBudget(default_tokens=2500, min_tokens=512, ceiling_tokens=4096, headroom=1.5, min_samples=3)
+    short, long_ = ("bug", "s"), ("feature", "xl")
+    for tokens in (300, 350, 400):
+        budget.record(short, tokens)
+    for tokens in (3000, 3500, 3900):
+        budget.record(long_, tokens)
+
+    assert budget.max_tokens(short) == 600
+    assert budget.max_tokens(long_) == 4096
+    assert budget.max_tokens(("chore", "m")) == 2500
+
+def test_retry_budget():
+    budget = TokenBudget(default_tokens=2500, ceiling_tokens=4096)
+    assert budget.retry_budget(600) == 2500
+    assert budget.retry_budget(2500) == 4096
+    assert budget.retry_budget(4096) is None
+
+def test_key_normalises_missing_values():
+    assert TokenBudget.key(None) == ("unknown", "unknown")
+    assert TokenBudget.key({"type": "Feature"}) == ("feature", "unknown")
@@ -1,7 +1,13 @@
+import json
 import pytest
+import requests
 from unittest.mock import MagicMock
-from src.services.trello_service import TrelloService
+from src.services.trello_service import TrelloService, TrelloCardNotFoundError
+from src.services.tenants import TenantRegistry, TrelloCredentials
 from src.models.card import TrelloCard
+from src.services.board_cache import BoardCache
+from src.services import card_parser
+
 
 @pytest.fixture
 def trello_service(mocker):
@@ -10,6 +16,7 @@ def trello_service(mocker):
     mocker.patch.object(service, '_make_request')
     return service
 
+
 def test_get_boards(trello_service: TrelloService):
     """Test fetching Trello boards."""
     mock_boards = [{"id": "board1", "name": "Board 1"}]
@@ -20,13 +27,14 @@ def test_get_boards(trello_service: TrelloService):
     trello_service._make_request.assert_called_once_with("GET", "members/me/boards")
     assert boards == mock_boards
 
+
 def test_get_board_cards_n_plus_1_fix(trello_service: TrelloService):
     """Test that get_board_cards makes one call for lists and one for cards."""
     board_id = "board1"
-    
+
     mock_lists = [{"id": "list1", "name": "To Do"}]
     mock_cards_data = [{"id": "card1", "name": "Card 1", "idList": "list1", "desc": ""}]
-    
+
     # Set up the mock to return different values for different calls
     trello_service._make_request.side_effect = [mock_lists, mock_cards_data]
 
@@ -35,8 +43,153 @@ def test_get_board_cards_n_plus_1_fix(trello_service: TrelloService):
     assert trello_service._make_request.call_count == 2
     trello_service._make_request.assert_any_call("GET", f"boards/{board_id}/lists", params={"fields": "id,name"})
     trello_service._make_request.assert_any_call("GET", f"boards/{board_id}/cards", params={"fields": "all"})
-    
+
     assert len(cards) == 1
     assert isinstance(cards[0], TrelloCard)
     assert cards[0].name == "Card 1"
-    assert cards[0].list_name == "To Do" 
\ No newline at end of file
+    assert cards[0].list_name == "To Do"
+
+
+def test_get_board_cards_uses_board_cache(trello_service: TrelloService):
+    """Test that a cached board is served without calling Trello again."""
+    trello_service.board_cache = BoardCache(ttl_seconds=300)
+    trello_service._make_request.side_effect = [
+        [{"id": "list1", "name": "To Do"}],
+        [{"id": "card1", "name": "Card 1", "idList": "list1", "desc": ""}],
+    ]
+
+    first = trello_service.get_board_cards("board1")
+    second = trello_service.get_board_cards("board1")
+
+    assert trello_service._make_request.call_count == 2
+    assert [c.id for c in second] == [c.id for c in first]
+
+
+def test_refresh_card_patches_cache(trello_service: TrelloService):
+    """Test that refreshing one card re-parses it and patches the cached board."""
+    trello_service.board_cache = BoardCache(ttl_seconds=300)
+    trello_service.board_cache.put("board1", [
+        TrelloCard(id="card1", name="Old name", description="", board_id="board1"),
+        TrelloCard(id="card2", name="Other", description="", board_id="board1"),
+    ])
+    trello_service._make_request.return_value = {
+        "id": "card1", "name": "New name", "idBoard": "board1", "desc": "", "list": {"name": "Doing"}
+    }
+
+    card = trello_service.refresh_card("card1")
+
+    trello_service._make_request.assert_called_once_with("GET", "cards/card1", params={"fields": "all", "list": "true"})
+    cached = {c.id: c for c in trello_service.board_cache.get("board1")}
+    assert card.name == "New name"
+    assert cached["card1"].name == "New name"
+    assert cached["card1"].list_name == "Doing"
+    assert cached["card2"].name == "Other"
+
+
+def test_get_board_cards_streaming(trello_service: TrelloService, mocker):
+    """Test that the streaming mode decodes, filters and parses cards from response chunks."""
+    cards_json = json.dumps([
+        {"id": "card1", "name": "Café rollout", "idList": "list1", "desc": ""},
+        {"id": "card2", "name": "Old", "idList": "list1", "desc": "", "closed": True},
+        {"id": "card3", "name": "Done", "idList": "list1", "desc": ""},
+        {"id": "card4", "name": "Card 4", "idList": "list2", "desc": ""},
+    ]).encode("utf-8")
+    mock_request = mocker.patch.object(trello_service.session, "request")
+    mock_request.return_value.iter_content.return_value = [cards_json[i:i + 7] for i in range(0, len(cards_json), 7)]
+    trello_service._make_request.return_value = [{"id": "list1", "name": "To Do"}, {"id": "list2", "name": "Doing"}]
+
+    cards = trello_service.get_board_cards("board1", stream=True)
+
+    assert [c.id for c in cards] == ["card1", "card4"]
+    assert cards[0].name == "Café rollout"
+    assert cards[1].list_name == "Doing"
+    assert mock_request.call_args.kwargs["stream"] is True
+    mock_request.return_value.close.assert_called_once()
+
+
+def test_get_cards_from_multiple_boards_parses_in_one_batch(trello_service: TrelloService, mocker):
+    """Uncached boards are fetched first, then parsed together and split back per board."""
+    trello_service.board_cache = BoardCache(ttl_seconds=60)
+    trello_service.board_cache.put("board1", [TrelloCard.from_trello_json({"id": "cached", "name": "Cached", "desc": ""}, "To Do")])
+    trello_service._make_request.side_effect = [
+        [{"id": "list2", "name": "Doing"}],
+        [{"id": "card2", "name": "Card 2", "idList": "list2", "desc": ""}],
+        [{"id": "list3", "name": "Done Soon"}],
+        [{"id": "card3", "name": "Card 3", "idList": "list3", "desc": ""}],
+    ]
+    parse_cards = mocker.patch("src.services.trello_service.parse_cards", wraps=card_parser.parse_cards)
+
+    cards = trello_service.get_cards_from_multiple_boards(["board2", "board1", "board3"])
+
+    assert [card.id for card in cards] == ["card2", "cached", "card3"]
+    parse_cards.assert_called_once()
+    assert [card.id for card in trello_service.board_cache.get("board3")] == ["card3"]
+
+
+def test_get_board_cards_projection_pushes_fields_down(trello_service: TrelloService):
+    """A projection only asks Trello for the fields it needs, and the partial cards are not cached."""
+    trello_service.board_cache = BoardCache(ttl_seconds=60)
+    trello_service._make_request.side_effect = [
+        [{"id": "list1", "name": "To Do"}],
+        [{"id": "card1", "name": "Card 1", "idList": "list1", "labels": [{"name": "Priority: High"}]}],
+    ]
+
+    cards = trello_service.get_board_cards("board1", fields=TrelloCard.parse_fields("name,priority"))
+
+    trello_service._make_request.assert_any_call("GET", "boards/board1/cards", params={"fields": "closed,idList,labels,name"})
+    assert cards[0].priority == "High"
+    assert trello_service.board_cache.get("board1") is None
+
+
+def test_get_board_cards_page_from_trello(trello_service: TrelloService):
+    """Pages are requested with limit/before; the cursor is the oldest raw card, hidden or not."""
+    trello_service._make_request.side_effect = [
+        [{"id": "list1", "name": "To Do"}],
+        [
+            {"id": "0003", "name": "Three", "idList": "list1"},
+            {"id": "0002", "name": "Closed", "idList": "list1", "closed": True},
+            {"id": "0004", "name": "Four", "idList": "list1"},
+        ],
+    ]
+
+    cards, next_cursor = trello_service.get_board_cards_page("board1", 3, cursor="0005", fields={"id", "name"})
+
+    trello_service._make_request.assert_any_call(
+        "GET", "boards/board1/cards", params={"fields": "closed,idList,name", "limit": 3, "before": "0005"}
+    )
+    assert [card.id for card in cards] == ["0004", "0003"]
+    assert next_cursor == "0002"
+
+
+def test_get_board_cards_page_from_cache(trello_service: TrelloService):
+    trello_service.board_cache = BoardCache(ttl_seconds=60)
+    trello_service.board_cache.put("board1", [TrelloCard(id=f"000{i}", name=f"Card {i}", description="") for i in range(1, 6)])
+
+    first, cursor = trello_service.get_board_cards_page("board1", 2)
+    second, cursor = trello_service.get_board_cards_page("board1", 2, cursor=cursor)
+    last, end = trello_service.get_board_cards_page("board1", 2, cursor=cursor)
+
+    assert [card.id for card in first + second + last] == ["0005", "0004", "0003", "0002", "0001"]
+    assert end is None
+    trello_service._make_request.assert_not_called()
+
+
+def test_list_webhooks_keeps_token_out_of_errors(mocker):
+    """The token travels in the URL path for this endpoint but never reaches logs or error messages."""
+    service = TrelloService(tenant=TenantRegistry(TrelloCredentials("secret-key", "secret-token")).default())
+    token = "secret-token"
+    response = MagicMock(status_code=404)
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        f"404 for /tokens/{token}/webhooks?key=secret-key&token={token}", response=response
+    )
+    request = mocker.patch.object(service.session, "request", return_value=response)
+    debug = mocker.patch("src.services.trello_service.logger.debug")
+    mocker.patch("src.services.trello_service.logger.isEnabledFor", return_value=True)
+
+    with pytest.raises(TrelloCardNotFoundError) as error:
+        service.list_webhooks()
+
+    assert f"tokens/{token}/webhooks" in request.call_args.args[1]
+    assert token not in str(error.value)
+    assert token not in str(debug.call_args)
+    assert "tokens/***/webhooks" in str(error.value)
@@ -0,0 +1,42 @@
+from src.services.warmup import StartupWarmup
+
+
+def test_warmup_runs_steps_and_reports_failures():
+    """Test that steps run in order, a failing step is reported, and warm-up still becomes ready."""
+    calls = []
+
+    def fail():
+        raise RuntimeError("no route to host")
+
+    warmup = StartupWarmup([("first", lambda: calls.append("first")), ("broken", fail), ("last", lambda: calls.append("last"))])
+    assert not warmup.ready
+
+    warmup.run()
+
+    assert calls == ["first", "last"]
+    stats = warmup.stats()
+    assert stats["ready"] and stats["finished"] and stats["pending"] == []
+    assert [(step["name"], step["ok"]) for step in stats["steps"]] == [("first", True), ("broken", False), ("last", True)]
+    assert stats["steps"][1]["error"] == "no route to host"
+
+
+def test_warmup_ready_after_timeout():
+    """Test that a slow warm-up stops gating readiness once its timeout has passed."""
+    now = [0.0]
+    warmup = StartupWarmup([("slow", lambda: None)], timeout=30, clock=lambda: now[0])
+    warmup._started_at = now[0]
+
+    assert not warmup.ready
+    now[0] = 31
+    assert warmup.ready and warmup.timed_out
+    assert warmup.stats()["pending"] == ["slow"]
+
+
+def test_warmup_stop_skips_remaining_steps():
+    calls = []
+    warmup = StartupWarmup([("one", lambda: (calls.append("one"), warmup.stop())), ("two", lambda: calls.append("two"))])
+
+    warmup.run()
+
+    assert calls == ["one"]
+    assert warmup.ready
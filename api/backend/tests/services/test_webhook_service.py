@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import MagicMock
+from src.config.core import settings
+from src.services.trello_service import TrelloService
+from src.services.webhook_service import WebhookService, WebhookSignatureError
+
+CALLBACK_URL = "https://k2brd.example.com/api/v1/trello/webhooks/callback"
+
+@pytest.fixture
+def mock_trello_service():
+    """Fixture to create mock trello service."""
+    return MagicMock(spec=TrelloService)
+
+@pytest.fixture
+def webhook_service(mock_trello_service, monkeypatch):
+    """Fixture to create a WebhookService with a configured app secret."""
+    monkeypatch.setattr(settings, "TRELLO_API_SECRET", "app_secret")
+    return WebhookService(mock_trello_service)
+
+def test_verify_signature(webhook_service: WebhookService):
+    """Test that a correctly signed body is accepted and a tampered one rejected."""
+    body = b'{"action": {"type": "createCard"}}'
+    signature = WebhookService.compute_signature(body, CALLBACK_URL, "app_secret")
+
+    webhook_service.verify_signature(body, signature, CALLBACK_URL)
+
+    with pytest.raises(WebhookSignatureError):
+        webhook_service.verify_signature(body + b" ", signature, CALLBACK_URL)
+    with pytest.raises(WebhookSignatureError):
+        webhook_service.verify_signature(body, None, CALLBACK_URL)
+
+def test_verify_signature_without_secret(webhook_service: WebhookService, monkeypatch):
+    """Test that webhooks are refused when no app secret is configured."""
+    monkeypatch.setattr(settings, "TRELLO_API_SECRET", None)
+    with pytest.raises(WebhookSignatureError):
+        webhook_service.verify_signature(b"{}", "anything", CALLBACK_URL)
+
+@pytest.mark.parametrize(
+    "action, expected_call",
+    [
+        ({"type": "createCard", "data": {"card": {"id": "c1"}}}, "refresh_card"),
+        ({"type": "updateCard", "data": {"card": {"id": "c1", "idList": "l2"}}}, "refresh_card"),
+        ({"type": "updateCard", "data": {"card": {"id": "c1", "closed": True}}}, "remove_card"),
+        ({"type": "deleteCard", "data": {"card": {"id": "c1"}}}, "remove_card"),
+        ({"type": "commentCard", "data": {"card": {"id": "c1"}}}, None),
+        ({"type": "updateBoard", "data": {"board": {"id": "b1"}}}, None),
+    ],
+    ids=["create", "update", "archive", "delete", "comment_ignored", "no_card_ignored"]
+)
+def test_apply_action(webhook_service: WebhookService, mock_trello_service, action, expected_call):
+    """Test that only the affected card is refreshed or removed."""
+    webhook_service.apply_action({"action": action})
+
+    for method in ("refresh_card", "remove_card"):
+        if method == expected_call:
+            getattr(mock_trello_service, method).assert_called_once_with("c1")
+        else:
+            getattr(mock_trello_service, method).assert_not_called()
+
+def test_register_and_unregister_board(webhook_service: WebhookService, mock_trello_service):
+    """Test that registration is idempotent and unregistration removes every board webhook."""
+    mock_trello_service.list_webhooks.return_value = [
+        {"id": "wh1", "idModel": "board1", "callbackURL": CALLBACK_URL},
+        {"id": "wh2", "idModel": "board2", "callbackURL": CALLBACK_URL},
+    ]
+
+    assert webhook_service.register_board("board1", CALLBACK_URL)["id"] == "wh1"
+    mock_trello_service.create_webhook.assert_not_called()
+
+    webhook_service.register_board("board3", CALLBACK_URL)
+    mock_trello_service.create_webhook.assert_called_once_with("board3", CALLBACK_URL)
+
+    assert webhook_service.unregister_board("board2") == ["wh2"]
+    mock_trello_service.delete_webhook.assert_called_once_with("wh2")
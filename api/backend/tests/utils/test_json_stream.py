@@ -0,0 +1,31 @@
+import json
+import pytest
+from src.utils.json_stream import iter_json_array, JSONStreamError
+
+DOCUMENT = [{"name": "Café", "labels": [{"name": "Priority: High"}]}, 12345, "text", True, None, {}]
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+def test_iter_json_array_any_chunking(chunk_size):
+    """Test that elements decode identically however the bytes are split."""
+    raw = json.dumps(DOCUMENT).encode("utf-8")
+    chunks = [raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size)]
+
+    assert list(iter_json_array(chunks)) == DOCUMENT
+
+def test_iter_json_array_is_lazy():
+    """Test that elements are yielded before the rest of the input is read."""
+    consumed = []
+    def chunks():
+        for part in ['[{"id": 1}', ', {"id": 2}', "]"]:
+            consumed.append(part)
+            yield part
+
+    stream = iter_json_array(chunks())
+    assert next(stream) == {"id": 1}
+    assert len(consumed) < 3
+
+@pytest.mark.parametrize("raw", ['{"not": "an array"}', '[{"id": 1}, {"id"', '[1, 2'])
+def test_iter_json_array_errors(raw):
+    """Test that non-arrays and truncated input raise JSONStreamError."""
+    with pytest.raises(JSONStreamError):
+        list(iter_json_array([raw]))
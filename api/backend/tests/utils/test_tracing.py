@@ -0,0 +1,51 @@
+import json
+import time
+from src.services.llm_scheduler import LLMScheduler
+from src.utils.tracing import SamplingProfiler, current_trace, span, start_trace, traced
+
+@traced("test.work")
+def _work():
+    with span("test.inner", size=3):
+        return current_trace()
+
+def test_spans_are_noops_without_a_trace():
+    assert _work() is None
+    with span("test.outside"):
+        pass
+
+def test_spans_recorded_and_exported(tmp_path):
+    """Spans land in the active trace and export as Chrome trace-event JSON."""
+    with start_trace("request") as trace:
+        assert _work() is trace
+
+    path = trace.export(str(tmp_path))
+    events = json.loads(path.read_text())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert set(spans) == {"request", "test.work", "test.inner"}
+    assert spans["test.inner"]["args"] == {"size": 3}
+    assert spans["test.work"]["dur"] >= spans["test.inner"]["dur"]
+
+def test_trace_follows_jobs_onto_scheduler_workers():
+    """Jobs run in the submitter's context, so their spans join the request's trace."""
+    scheduler = LLMScheduler(max_concurrency=1)
+    try:
+        with start_trace("request") as trace:
+            assert scheduler.submit(_work).result(timeout=5) is trace
+        names = [event["name"] for event in trace.events]
+        assert "llm.queue_wait" in names and "test.work" in names
+    finally:
+        scheduler.stop()
+
+def test_sampling_profiler_collects_folded_stacks():
+    def busy_loop():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    with start_trace("request") as trace:
+        profiler = SamplingProfiler(trace, interval=0.002).start()
+        busy_loop()
+        profiler.stop()
+
+    assert profiler.samples
+    assert "busy_loop" in profiler.folded()
@@ -34,7 +34,7 @@ class BRDGenerator {
             try {
                 const cardIds = JSON.parse(storedCardIds);
                 if (cardIds && cardIds.length > 0) {
-                    const response = await fetch(`${API_BASE_URL}/api/v1/cards`, { // Use the /api/v1/cards endpoint
+                    const response = await fetch(`${API_BASE_URL}/api/v1/trello/cards`, { // Use the /api/v1/trello/cards endpoint
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
                         body: JSON.stringify({ card_ids: cardIds }),
@@ -83,7 +83,7 @@ document.addEventListener('DOMContentLoaded', function() {
             appState.setLoading(true);
             window.logViewer.addLog('Fetching boards...');
             try {
-                const response = await fetch(`${API_BASE_URL}/api/v1/boards`);
+                const response = await fetch(`${API_BASE_URL}/api/v1/trello/boards`);
                 if (!response.ok) throw new Error('Failed to fetch boards');
                 const boards = await response.json();
                 appState.setBoards(boards);
@@ -120,7 +120,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 // Create array of fetch promises for parallel execution
                 const fetchPromises = [];
                 for (const boardId of appState.selectedBoardIds) {
-                    const fetchPromise = fetch(`${API_BASE_URL}/api/v1/boards/${boardId}/cards`)
+                    const fetchPromise = fetch(`${API_BASE_URL}/api/v1/trello/boards/${boardId}/cards`)
                         .then(response => {
                             if (!response.ok) {
                                 console.error(`Failed to fetch cards for board ${boardId}`);